@@ -1,45 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.database import get_db
-from app.schemas.user import UserCreate, User, Token
+from app.core.hashing import password_hasher
+from app.core.http_cache import make_etag, etag_matches, not_modified
+from app.models.user import User as UserModel
+from app.schemas.user import UserCreate, User, Token, SessionListResponse
 from app.services.user_service import UserService
-from app.core.auth import get_current_active_user
+from app.core.auth import get_current_active_user, security
+from app.core.security import decode_access_token
 from app.core.redis import redis_service
+from app.services.presence_service import PresenceService
+from app.services.revocation_service import RevocationService
+from app.services.session_service import SessionService
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
+def _open_session(db: Session, user: UserModel, request: Request, new_password_hash: str = None) -> str:
+    """Finish a login: upgrade the password hash if needed and store the session."""
+    if new_password_hash:
+        UserService.update_password_hash(db, user, new_password_hash)
+    
+    access_token = UserService.create_access_token_for_user(user)
+    
+    # Store session in Redis
+    SessionService.create_session(
+        user.id, decode_access_token(access_token),
+        request.headers.get("user-agent"), request.client.host if request.client else None
+    )
+    PresenceService.heartbeat(user.id, force=True)
+    
+    return access_token
+
+
+# Register and login are async so bcrypt waits in the hashing pool, not in a
+# request thread; their database and Redis work still runs in the threadpool.
 @router.post("/register", response_model=User)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
-    return UserService.create_user(db, user_data)
+    hashed_password = await password_hasher.hash(user_data.password)
+    return await run_in_threadpool(UserService.create_user, db, user_data, hashed_password)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """Login and get access token."""
-    user = UserService.authenticate_user(db, form_data.username, form_data.password)
-    if not user:
+    user = await run_in_threadpool(UserService.get_user_by_username, db, form_data.username)
+    is_valid, new_password_hash = False, None
+    if user:
+        is_valid, new_password_hash = await password_hasher.verify_and_update(
+            form_data.password, user.hashed_password
+        )
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = UserService.create_access_token_for_user(user)
-    
-    # Store session in Redis
-    redis_service.set_session(user.id, access_token, expires=3600)  # 1 hour
-    redis_service.set_user_online(user.id, expires=300)  # 5 minutes
-    
+    access_token = await run_in_threadpool(_open_session, db, user, request, new_password_hash)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=User)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+def get_current_user_info(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user)
+):
     """Get current user information."""
-    return current_user 
\ No newline at end of file
+    etag = make_etag(
+        "me", current_user.id, current_user.username, current_user.email,
+        current_user.is_active, current_user.created_at, current_user.updated_at
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    
+    response.headers.update(headers)
+    return current_user
+
+
+@router.post("/logout")
+def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Revoke the current access token."""
+    claims = decode_access_token(credentials.credentials)
+    if not RevocationService.revoke_token(claims):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not revoke token, please try again"
+        )
+    
+    if claims.get("jti"):
+        redis_service.delete_session(current_user.id, claims["jti"])
+    return {"logged_out": True}
+
+
+@router.post("/revoke-all")
+def revoke_all_tokens(current_user: User = Depends(get_current_active_user)):
+    """Revoke every access token of the current user, logging out all devices."""
+    sessions = SessionService.revoke_all_sessions(current_user.id)
+    return {"revoked": True, "sessions": sessions}
+
+
+@router.get("/sessions", response_model=SessionListResponse)
+def list_sessions(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List the current user's active sessions."""
+    claims = decode_access_token(credentials.credentials)
+    return {"sessions": SessionService.list_sessions(current_user.id, claims.get("jti"))}
+
+
+@router.delete("/sessions/{session_id}")
+def revoke_session(session_id: str, current_user: User = Depends(get_current_active_user)):
+    """Revoke one of the current user's sessions."""
+    SessionService.revoke_session(current_user.id, session_id)
+    return {"revoked": True}
\ No newline at end of file
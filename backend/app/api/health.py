@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from app.core.responses import TrustedJSONResponse
+from app.services.health_service import HealthService
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def liveness():
+    """Liveness probe: answers as long as the worker's event loop does."""
+    return HealthService.liveness()
+
+
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: 503 while the database or Redis is failing or too slow."""
+    ready, report = await HealthService.readiness()
+    return TrustedJSONResponse(report, status_code=200 if ready else 503)
@@ -1,16 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.core.database import get_db
-from app.core.auth import get_current_active_user
+from app.core.auth import get_current_active_user, authenticate_websocket
+from app.core.responses import TrustedJSONResponse
 from app.core.config import settings
+from app.core.http_cache import make_etag, etag_matches, settled_http_date, not_modified_since, not_modified
+from app.core.redis import redis_service
 from app.models.user import User
-from app.schemas.post import PostResponse, TimelineResponse, PostUpdate
+from app.schemas.post import PostResponse, TimelineResponse, PostUpdate, CursorTimelineResponse
+from app.services.live_count_service import live_count_hub
 from app.services.post_service import PostService
+from app.services.response_cache_service import ResponseCacheService
+from app.services.view_service import ViewService, anonymous_viewer_id
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 
+def _timeline_etag(generation: int, page: int, per_page: int, total: int, posts: list) -> str:
+    """ETag of a timeline page without serializing it.
+    
+    The generation changes whenever a post is created, edited or deleted, so
+    the only other inputs are the page cursor and each post's counters. Users
+    seeing the same page get the same ETag and share its cached body. View
+    counts are left out: they are estimates that change with every reader
+    (the request itself records an impression), so they would never match.
+    """
+    return make_etag(
+        "timeline", generation, page, per_page, total,
+        [(post["id"], post["likes_count"], post["shares_count"], post["is_liked"]) for post in posts]
+    )
+
+
 @router.post("/", response_model=PostResponse)
 def create_post(
     image: UploadFile = File(...),
@@ -35,22 +57,110 @@ def create_post(
 
 @router.get("/timeline", response_model=TimelineResponse)
 def get_timeline(
+    request: Request,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get timeline of posts."""
+    """Get the home feed of followed users' posts (global timeline if following nobody)."""
     skip = (page - 1) * per_page
-    posts = PostService.get_timeline(db, current_user.id, skip, per_page)
-    total = PostService.get_total_posts_count(db)
+    posts, total = PostService.get_timeline(db, current_user.id, skip, per_page)
     
-    return {
+    content = {
         "posts": posts,
         "total": total,
         "page": page,
         "per_page": per_page
     }
+    headers = {"Cache-Control": "private, no-cache"}
+    # Without Redis there is no generation to detect edits, so no ETag is sent
+    generation = redis_service.get_timeline_generation()
+    if generation is None:
+        # Pages come from _build_timeline in PostResponse shape, so validation is skipped
+        return TrustedJSONResponse(content, headers=headers)
+    
+    headers["ETag"] = _timeline_etag(generation, page, per_page, total, posts)
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    return ResponseCacheService.respond(request, headers["ETag"], content, headers)
+
+
+@router.get("/trending", response_model=TimelineResponse)
+def get_trending(
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get trending posts ranked by time-decayed likes and shares."""
+    skip = (page - 1) * per_page
+    posts, total = PostService.get_trending(db, current_user.id, skip, per_page)
+    
+    return TrustedJSONResponse({
+        "posts": posts,
+        "total": total,
+        "page": page,
+        "per_page": per_page
+    })
+
+
+@router.get("/search", response_model=CursorTimelineResponse)
+def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Search post captions, best matches first."""
+    posts, next_cursor = PostService.search_posts(db, current_user.id, q, cursor, limit)
+    
+    return TrustedJSONResponse({
+        "posts": posts,
+        "next_cursor": next_cursor
+    })
+
+
+@router.websocket("/live")
+async def live_counts(websocket: WebSocket, token: str = Query(...)):
+    """Push like and share counts of watched posts, batched about once a second.
+    
+    Browsers cannot set headers on WebSockets, so the access token is passed
+    as a query parameter. Clients send {"subscribe": [ids]} or
+    {"unsubscribe": [ids]} and receive {"type": "counts", "posts": {id: counts}}.
+    """
+    user = await run_in_threadpool(authenticate_websocket, token)
+    if user is None:
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    live_count_hub.connect(websocket)
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+                subscribe = [int(post_id) for post_id in message.get("subscribe", [])]
+                unsubscribe = [int(post_id) for post_id in message.get("unsubscribe", [])]
+            except (ValueError, TypeError, AttributeError):
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": 'Expected {"subscribe": [ids]} or {"unsubscribe": [ids]}'
+                })
+                continue
+            
+            live_count_hub.unsubscribe(websocket, unsubscribe)
+            added = live_count_hub.subscribe(websocket, subscribe)
+            if len(added) < len(set(subscribe)):
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": f"At most {settings.LIVE_COUNTS_MAX_POSTS} posts can be watched"
+                })
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_count_hub.disconnect(websocket)
 
 
 @router.post("/{post_id}/like")
@@ -104,24 +214,38 @@ def update_post(
 @router.get("/{post_id}/public")
 def get_public_post(
     post_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Get a public post view (no authentication required)."""
-    post = PostService.get_post_by_id(db, post_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    post, last_modified = PostService.get_public_post(post_id)
     
-    user = db.query(User).filter(User.id == post.user_id).first()
+    viewer = anonymous_viewer_id(
+        request.client.host if request.client else None,
+        request.headers.get("user-agent")
+    )
+    ViewService.record_impressions([post_id], viewer)
     
-    return {
-        "id": post.id,
-        "username": user.username,
-        "image_url": f"/uploads/{post.image_path}",
-        "caption": post.caption,
-        "likes_count": post.likes_count,
-        "shares_count": post.shares_count,
-        "created_at": post.created_at
-    }
+    # Views are estimates, so like the timeline they do not change the validators
+    headers = {"ETag": make_etag("public_post", post), "Cache-Control": "public, no-cache"}
+    settled_date = settled_http_date(last_modified)
+    if settled_date:
+        headers["Last-Modified"] = settled_date
+    if etag_matches(request, headers["ETag"]) or not_modified_since(request, last_modified):
+        return not_modified(headers)
+    
+    views = ViewService.get_views(db, [post_id])[post_id]
+    
+    return TrustedJSONResponse({
+        "id": post["id"],
+        "username": post["username"],
+        "image_url": post["image_url"],
+        "caption": post["caption"],
+        "likes_count": post["likes_count"],
+        "shares_count": post["shares_count"],
+        "views": views,
+        "created_at": post["created_at"]
+    }, headers=headers)
 
 
 @router.delete("/{post_id}")
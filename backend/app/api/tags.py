@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.core.responses import TrustedJSONResponse
+from app.models.user import User
+from app.schemas.post import CursorTimelineResponse
+from app.schemas.tag import TopTagsResponse
+from app.services.post_service import PostService
+from app.services.tag_service import TagService
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+
+@router.get("/top", response_model=TopTagsResponse)
+def get_top_tags(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Get the most used hashtags and emoji tags."""
+    top_tags = TagService.get_top_tags(db, limit)
+    return {"tags": [{"tag": tag, "posts_count": count} for tag, count in top_tags]}
+
+
+@router.get("/{tag}/posts", response_model=CursorTimelineResponse)
+def get_tag_posts(
+    tag: str,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the newest posts with a tag."""
+    posts, next_cursor = PostService.get_tag_posts(db, current_user.id, tag, cursor, limit)
+    
+    return TrustedJSONResponse({
+        "posts": posts,
+        "next_cursor": next_cursor
+    })
\ No newline at end of file
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.core.auth import get_current_active_user
+from app.models.user import User
+from app.schemas.user import OnlineStatusResponse, OnlineCountResponse
+from app.services.feed_service import FeedService
+from app.services.presence_service import PresenceService
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("/online", response_model=OnlineStatusResponse)
+def get_online_status(
+    ids: List[int] = Query(..., max_length=100),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Check which of the given users are online."""
+    return {"online": PresenceService.get_online_status(ids)}
+
+
+@router.get("/online/count", response_model=OnlineCountResponse)
+def get_online_count(current_user: User = Depends(get_current_active_user)):
+    """Count users online right now."""
+    return {"online": PresenceService.count_online()}
+
+
+@router.post("/{user_id}/follow")
+def follow_user(
+    user_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Follow a user."""
+    changed = FeedService.follow_user(db, current_user.id, user_id)
+    return {"following": True, "changed": changed}
+
+
+@router.delete("/{user_id}/follow")
+def unfollow_user(
+    user_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Unfollow a user."""
+    changed = FeedService.unfollow_user(db, current_user.id, user_id)
+    return {"following": False, "changed": changed}
\ No newline at end of file
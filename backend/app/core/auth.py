@@ -1,9 +1,13 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.core.security import decode_access_token
 from app.models.user import User
+from app.services.presence_service import PresenceService
+from app.services.revocation_service import RevocationService
 
 security = HTTPBearer()
 
@@ -13,8 +17,13 @@ def get_current_user(
     db: Session = Depends(get_db)
 ) -> User:
     """Get the current authenticated user."""
-    token = credentials.credentials
-    username = verify_token(token)
+    return authenticate_token(db, credentials.credentials)
+
+
+def authenticate_token(db: Session, token: str) -> User:
+    """Get the user an access token belongs to, or raise 401."""
+    claims = decode_access_token(token)
+    username = claims.get("sub") if claims else None
     if not username:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,9 +39,37 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    revoked = RevocationService.is_revoked(claims, user.id)
+    if revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if revoked is None and not settings.REVOCATION_FAIL_OPEN:
+        # A revoked token must not get in just because Redis is down
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token revocation cannot be checked, try again later",
+            headers={"Retry-After": str(int(settings.REDIS_BREAKER_RESET_SECONDS))},
+        )
+    
+    PresenceService.heartbeat(user.id)
     return user
 
 
+def authenticate_websocket(token: str) -> Optional[User]:
+    """Get the active user of a WebSocket's token, without holding a session for the connection."""
+    db = SessionLocal()
+    try:
+        user = authenticate_token(db, token)
+        return user if user.is_active else None
+    except HTTPException:
+        return None
+    finally:
+        db.close()
+
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get the current active user."""
     if not current_user.is_active:
@@ -0,0 +1,120 @@
+import json
+from datetime import date, datetime
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# msgpack extension types for values JSON has no type for
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+
+
+class CacheCodec:
+    """Serializes cache values to bytes.
+    
+    Every codec except the legacy json one prefixes its payload with a one
+    byte tag naming the codec and format version. JSON text never starts
+    with a control byte, so untagged entries written before codecs existed
+    are still decoded as JSON.
+    """
+    
+    name = ""
+    tag = b""
+    
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+    
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(CacheCodec):
+    """The original format: untagged JSON with datetimes as strings."""
+    
+    name = "json"
+    
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode()
+    
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(CacheCodec):
+    """orjson, which writes datetimes natively as ISO 8601 strings."""
+    
+    name = "orjson"
+    tag = b"\x01"
+    
+    def encode(self, value: Any) -> bytes:
+        return self.tag + orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data[1:])
+
+
+def _msgpack_default(value: Any):
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    return str(value)
+
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+class MsgpackCodec(CacheCodec):
+    """msgpack, which round-trips datetimes (naive or aware) as datetime objects."""
+    
+    name = "msgpack"
+    tag = b"\x02"
+    
+    def encode(self, value: Any) -> bytes:
+        return self.tag + msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+    
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data[1:], ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+
+
+_CODECS: Dict[str, CacheCodec] = {"json": JsonCodec()}
+if orjson is not None:
+    _CODECS["orjson"] = OrjsonCodec()
+if msgpack is not None:
+    _CODECS["msgpack"] = MsgpackCodec()
+_CODECS_BY_TAG = {codec.tag: codec for codec in _CODECS.values() if codec.tag}
+
+
+def available_codecs() -> list:
+    """Names of the codecs whose libraries are installed."""
+    return list(_CODECS)
+
+
+def get_codec(name: str) -> CacheCodec:
+    """Get a codec by name, falling back to json if its library is not installed."""
+    codec = _CODECS.get(name)
+    if codec is None:
+        print(f"Cache codec {name} is not available, using json")
+        return _CODECS["json"]
+    return codec
+
+
+def decode_cached(data: bytes) -> Any:
+    """Decode a cache entry with the codec that wrote it."""
+    codec = _CODECS_BY_TAG.get(data[:1])
+    if codec is None:
+        return _CODECS["json"].decode(data)
+    return codec.decode(data)
\ No newline at end of file
@@ -0,0 +1,60 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Fail fast after repeated errors instead of waiting on a dead dependency.
+    
+    After failure_threshold consecutive failures the breaker opens and calls
+    are rejected immediately. Once reset_timeout seconds have passed a single
+    probe call is let through (half-open): success closes the breaker again,
+    failure re-opens it for another reset_timeout.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Ready to let a probe through on the next call
+                return self.HALF_OPEN
+            return self._state
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected."""
+        return self.state != self.CLOSED
+    
+    def allow_request(self) -> bool:
+        """Check whether a call may go through, claiming the probe when half-open."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                return True
+            # Open, or half-open with a probe already in flight
+            return False
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
\ No newline at end of file
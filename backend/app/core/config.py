@@ -16,6 +16,13 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Cost of new hashes; older hashes are upgraded on login
+    PASSWORD_HASH_WORKERS: int = 2  # Processes hashing passwords, 0 hashes in the request thread
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Hashes running or queued before logins get a 429
+    REVOCATION_BLOOM_CAPACITY: int = 100000  # Revocations the local filter holds at its error rate
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001  # Share of valid tokens that still need a Redis check
+    REVOCATION_REFRESH_SECONDS: int = 300  # Rebuild the filter so expired revocations drop out
+    REVOCATION_FAIL_OPEN: bool = False  # True accepts tokens that cannot be checked while Redis is down
     
     # File upload settings
     UPLOAD_DIR: str = "uploads"
@@ -32,6 +39,82 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379"
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # Seconds to wait for a reply
+    REDIS_CONNECT_TIMEOUT: float = 0.5
+    REDIS_BATCH_SOCKET_TIMEOUT: float = 60.0  # Reply timeout of the command line tools' bulk commands
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures before failing fast
+    REDIS_BREAKER_RESET_SECONDS: float = 10.0  # Time before probing Redis again
+    REDIS_COUNTER_LAYOUT: str = "hash"  # "hash" (post:{id}) or "bucketed" (postc:{id // size})
+    REDIS_COUNTER_BUCKET_SIZE: int = 64  # Posts per bucket; 2x this must fit hash-max-listpack-entries
+    CACHE_CODEC: str = "orjson"  # "json", "orjson" or "msgpack"; entries of any codec stay readable
+    
+    # Home feed settings
+    FEED_MAX_LENGTH: int = 800  # Posts kept per precomputed feed
+    FEED_TTL_SECONDS: int = 7 * 24 * 3600  # Feeds of inactive users expire
+    FEED_CELEBRITY_THRESHOLD: int = 10000  # Followers above which posts are pulled on read
+    FEED_FANOUT_BATCH_SIZE: int = 1000
+    FEED_SOURCES_TTL_SECONDS: int = 300  # Followed celebrities are rechecked after this
+    
+    # Trending settings
+    TRENDING_MAX_SIZE: int = 1000  # Posts kept in the trending set after trimming
+    TRENDING_DECAY_SECONDS: int = 45000  # Age that costs as much as 10x the engagement
+    TRENDING_SHARE_WEIGHT: int = 2  # A share counts as this many likes
+    TRENDING_TRIM_INTERVAL_SECONDS: int = 60
+    
+    # Search settings
+    SEARCH_CACHE_TTL_SECONDS: int = 30
+    
+    # Tag settings
+    TAG_INDEX_MAX_LENGTH: int = 10000  # Newest posts per tag kept in Redis
+    
+    # View counting settings
+    VIEW_COUNTER_SHARDS: int = 16  # Raw impression counters are spread over this many hashes
+    VIEW_HLL_TTL_SECONDS: int = 90 * 24 * 3600  # Unique viewer sketches of unviewed posts expire
+    VIEW_FLUSH_INTERVAL_SECONDS: int = 60
+    VIEW_FLUSH_BATCH_SIZE: int = 1000
+    
+    # Presence settings
+    PRESENCE_TIMEOUT_SECONDS: int = 300  # Users seen within this window count as online
+    PRESENCE_REFRESH_SECONDS: int = 60  # Minimum time between heartbeats of a user per worker
+    PRESENCE_TRIM_INTERVAL_SECONDS: int = 60
+    
+    # Compression settings
+    COMPRESSION_MINIMUM_SIZE: int = 500  # Smaller bodies are sent uncompressed
+    COMPRESSION_CONTENT_TYPES: list = ["application/json", "text/", "application/javascript", "image/svg+xml"]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # Used when the brotli package is installed
+    RESPONSE_CACHE_TTL_SECONDS: int = 30  # Rendered timeline pages and their compressed bytes
+    
+    # Hot read cache settings
+    HOT_CACHE_TTL_SECONDS: int = 5  # Global timeline pages and public posts are fresh this long
+    HOT_CACHE_STALE_SECONDS: int = 30  # then served stale while one request refreshes them
+    HOT_CACHE_LOCK_SECONDS: int = 10  # Longest a worker holds the rebuild lock of a key
+    HOT_CACHE_WAIT_SECONDS: float = 2.0  # Time to wait for another worker's rebuild before loading anyway
+    
+    # Live count settings
+    LIVE_COUNTS_FLUSH_SECONDS: float = 1.0  # Count changes are batched into one frame per interval
+    LIVE_COUNTS_MAX_POSTS: int = 200  # Posts one connection may watch
+    LIVE_COUNTS_SEND_TIMEOUT: float = 5.0  # Connections that cannot take a frame this fast are dropped
+    
+    # Health check settings
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 0.5  # Slower dependencies count as down
+    HEALTH_CACHE_SECONDS: float = 1.0  # Probes within this window share one check
+    HEALTH_REQUIRE_REDIS: bool = True  # False keeps serving from SQL while Redis is down
+    
+    # Metrics settings
+    METRICS_ENABLED: bool = False  # Serve /metrics in the Prometheus text format, unauthenticated
+    
+    # Profiling settings (the middleware is only installed if a secret or sample rate is set)
+    PROFILING_SECRET: str = ""  # Signs X-Profile tokens, see python -m app.core.profiling
+    PROFILING_SAMPLE_RATE: float = 0.0  # Share of requests profiled without a token
+    PROFILING_INTERVAL_SECONDS: float = 0.005  # Time between stack samples
+    PROFILING_FORMAT: str = "collapsed"  # "collapsed" (flamegraph.pl) or "speedscope"
+    PROFILING_OUTPUT_DIR: str = "profiles"
+    
+    # Counter reconciliation settings
+    RECONCILE_INTERVAL_SECONDS: int = 3600  # 0 disables the background job
+    RECONCILE_CHUNK_SIZE: int = 1000
+    RECONCILE_MAX_WRITES_PER_SECOND: int = 500
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,90 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_and_update_password
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool so logins cannot starve request threads.
+    
+    At most max_pending hashes are running or queued at once; beyond that
+    callers get a 429 right away instead of waiting behind the backlog.
+    """
+    
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    @property
+    def pending(self) -> int:
+        return self._pending
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, since forking a process that runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    def _reserve(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many logins in progress, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+    
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+    
+    async def _run(self, func, *args):
+        self._reserve()
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(func, *args)
+            try:
+                return await asyncio.wrap_future(self._get_executor().submit(func, *args))
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for the next caller
+                self.shutdown(wait=False)
+                raise
+        finally:
+            self._release()
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password in the pool."""
+        return await self._run(get_password_hash, password)
+    
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password in the pool, returning a new hash if its cost changed."""
+        return await self._run(verify_and_update_password, password, hashed_password)
+    
+    def start(self) -> None:
+        """Start the worker processes ahead of the first login."""
+        if self.workers > 0:
+            executor = self._get_executor()
+            for _ in range(self.workers):
+                executor.submit(int)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
\ No newline at end of file
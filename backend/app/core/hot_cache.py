@@ -0,0 +1,115 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.redis import redis_service
+
+# Result of a background refresh that left the rebuild to another worker
+_SKIPPED = object()
+
+
+class HotCache:
+    """Redis cache for hot reads with request coalescing and stale-while-revalidate.
+    
+    Entries are fresh for ttl seconds and then served stale for stale_ttl more
+    while one request refreshes them in the background. On a miss only one
+    thread per process runs the loader (the others wait on its future) and
+    only one process, holding a Redis lock, rebuilds a key while the other
+    workers poll for its result. Loaders run outside the request, so they
+    must open their own database session.
+    """
+    
+    def __init__(self, ttl: int, stale_ttl: int, lock_timeout: int, wait_timeout: float, poll_interval: float = 0.02):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Get a cached value, loading it at most once across requests if missing."""
+        if not redis_service.available:
+            record_cache("hot", "miss")
+            return self._coalesce(key, loader)
+        
+        entry = redis_service.get_cache(f"hot:{key}")
+        if entry is None:
+            record_cache("hot", "miss")
+            return self._coalesce(key, loader)
+        if entry["fresh_until"] < time.time():
+            record_cache("hot", "stale")
+            self._refresh_in_background(key, loader)
+        else:
+            record_cache("hot", "hit")
+        return entry["value"]
+    
+    def _coalesce(self, key: str, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        
+        if not leader:
+            value = future.result()
+            # The refresh in flight found another worker rebuilding the key
+            return loader() if value is _SKIPPED else value
+        return self._lead(key, loader, future, wait_for_others=True)
+    
+    def _refresh_in_background(self, key: str, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._inflight:
+                return
+            future = self._inflight[key] = Future()
+        threading.Thread(
+            target=self._lead, args=(key, loader, future, False), name=f"hot-cache-{key}", daemon=True
+        ).start()
+    
+    def _lead(self, key: str, loader: Callable[[], Any], future: Future, wait_for_others: bool) -> Any:
+        try:
+            value = self._load_across_workers(key, loader, wait_for_others)
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Background refreshes keep serving the stale entry instead
+            if wait_for_others:
+                raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+    
+    def _load_across_workers(self, key: str, loader: Callable[[], Any], wait_for_others: bool) -> Any:
+        token = redis_service.acquire_lock(f"hot:{key}", self.lock_timeout)
+        if token is None and redis_service.available:
+            if not wait_for_others:
+                return _SKIPPED
+            # Another worker is rebuilding the key, so wait for its entry
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                entry = redis_service.get_cache(f"hot:{key}")
+                if entry is not None and entry["fresh_until"] >= time.time():
+                    return entry["value"]
+        
+        try:
+            value = loader()
+            redis_service.set_cache(
+                f"hot:{key}", {"value": value, "fresh_until": time.time() + self.ttl}, self.ttl + self.stale_ttl
+            )
+            return value
+        finally:
+            if token is not None:
+                redis_service.release_lock(f"hot:{key}", token)
+
+
+hot_cache = HotCache(
+    ttl=settings.HOT_CACHE_TTL_SECONDS,
+    stale_ttl=settings.HOT_CACHE_STALE_SECONDS,
+    lock_timeout=settings.HOT_CACHE_LOCK_SECONDS,
+    wait_timeout=settings.HOT_CACHE_WAIT_SECONDS
+)
\ No newline at end of file
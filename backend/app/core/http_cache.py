@@ -0,0 +1,73 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the values a response was rendered from."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime for Last-Modified; naive values are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def settled_http_date(value: datetime) -> Optional[str]:
+    """Last-Modified value for value, or None while value is in the current second.
+    
+    HTTP dates have whole-second precision, so a date sent during its own
+    second would also validate changes made later in that second.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    if value.replace(microsecond=0).timestamp() + 1 > datetime.now(timezone.utc).timestamp():
+        return None
+    return http_date(value)
+
+
+def not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """Whether If-Modified-Since is at or after last_modified.
+    
+    If-None-Match takes precedence, so the date is ignored when it is present.
+    """
+    header = request.headers.get("if-modified-since")
+    if not header or "if-none-match" in request.headers:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(headers: Optional[dict] = None) -> Response:
+    """A bodyless 304 carrying the validators of the cached representation."""
+    return Response(status_code=304, headers=headers)
\ No newline at end of file
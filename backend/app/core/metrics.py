@@ -0,0 +1,340 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """A metric family with a fixed set of label names, kept per process."""
+    
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+    
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+    
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in values]
+
+
+class Gauge(_Metric):
+    """A gauge read at scrape time from a function returning {label values: value}."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Dict[tuple, float]], labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+    
+    def _samples(self) -> List[str]:
+        try:
+            values = self._collect()
+        except Exception:
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label values: counts per bucket (last one is +Inf), sum
+        self._series: Dict[tuple, list] = {}
+    
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="{}"'.format("+Inf" if bound == float("inf") else repr(float(bound)))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+    
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+))
+HTTP_SQL_QUERIES = registry.register(Histogram(
+    "http_request_sql_queries", "SQL statements run per request.", ("route",), CALL_COUNT_BUCKETS
+))
+HTTP_SQL_TIME = registry.register(Histogram(
+    "http_request_sql_duration_seconds", "Time spent in SQL per request.", ("route",)
+))
+HTTP_REDIS_COMMANDS = registry.register(Histogram(
+    "http_request_redis_commands", "Redis round trips per request.", ("route",), CALL_COUNT_BUCKETS
+))
+HTTP_REDIS_TIME = registry.register(Histogram(
+    "http_request_redis_duration_seconds", "Time spent waiting on Redis per request.", ("route",)
+))
+DB_QUERIES = registry.register(Counter("db_queries_total", "SQL statements run."))
+DB_QUERY_LATENCY = registry.register(Histogram("db_query_duration_seconds", "SQL statement latency."))
+REDIS_COMMANDS = registry.register(Counter(
+    "redis_commands_total", "Redis round trips by command (PIPELINE for pipelines).", ("command",)
+))
+REDIS_LATENCY = registry.register(Histogram("redis_command_duration_seconds", "Redis round trip latency."))
+CACHE_REQUESTS = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result.", ("cache", "result")
+))
+RECONCILE_RUNS = registry.register(Counter(
+    "reconcile_runs_total", "Counter reconciliation passes run by this worker.", ("dry_run",)
+))
+RECONCILE_REPORT = registry.register(Counter(
+    "reconcile_report_total", "Rows checked, drift found and repairs made by counter reconciliation.", ("field",)
+))
+
+
+def _cache_hit_ratios() -> Dict[tuple, float]:
+    totals: Dict[str, List[float]] = {}
+    with CACHE_REQUESTS._lock:
+        values = list(CACHE_REQUESTS._values.items())
+    for (cache, result), value in values:
+        hits_and_total = totals.setdefault(cache, [0, 0])
+        # Stale entries are still served from the cache
+        if result in ("hit", "stale"):
+            hits_and_total[0] += value
+        hits_and_total[1] += value
+    return {(cache,): hits / total for cache, (hits, total) in totals.items() if total}
+
+
+registry.register(Gauge("cache_hit_ratio", "Share of cache lookups served from the cache.", _cache_hit_ratios, ("cache",)))
+
+
+def _threadpool_stats() -> Dict[tuple, float]:
+    # Only readable from the event loop, which is where /metrics renders
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {("busy",): limiter.borrowed_tokens, ("size",): limiter.total_tokens}
+
+
+registry.register(Gauge(
+    "threadpool_threads", "Threads running sync endpoints and other blocking work.", _threadpool_stats, ("state",)
+))
+
+
+class RequestStats:
+    """SQL and Redis work done while handling one request."""
+    
+    __slots__ = ("sql_queries", "sql_seconds", "redis_commands", "redis_seconds", "trace")
+    
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.redis_commands = 0
+        self.redis_seconds = 0.0
+        # (kind, detail, finished_at, seconds) of each call, only while profiling
+        self.trace: Optional[list] = None
+
+
+# Set by MetricsMiddleware; copied into the threads sync endpoints run in
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def record_sql(seconds: float, statement: str = "") -> None:
+    DB_QUERIES.inc()
+    DB_QUERY_LATENCY.observe(seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.sql_queries += 1
+        stats.sql_seconds += seconds
+        if stats.trace is not None:
+            stats.trace.append(("sql", statement, time.perf_counter(), seconds))
+
+
+def record_redis(command: str, seconds: float) -> None:
+    REDIS_COMMANDS.inc(command)
+    REDIS_LATENCY.observe(seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.redis_commands += 1
+        stats.redis_seconds += seconds
+        if stats.trace is not None:
+            stats.trace.append(("redis", command, time.perf_counter(), seconds))
+
+
+def record_cache(cache: str, result: str) -> None:
+    """Count a cache lookup; result is "hit", "stale" or "miss"."""
+    CACHE_REQUESTS.inc(cache, result)
+
+
+def record_reconcile(report: dict, dry_run: bool) -> None:
+    """Add a reconciliation pass's DriftReport.as_dict() to the exported totals."""
+    RECONCILE_RUNS.inc(str(dry_run).lower())
+    for field, amount in report.items():
+        if amount:
+            RECONCILE_REPORT.inc(field, amount=amount)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every SQL statement run through an engine."""
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info["query_started_at"].pop()
+        record_sql(time.perf_counter() - started_at, statement)
+    
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # Failed statements never reach after_cursor_execute, so drop their start time
+        started = context.connection.info.get("query_started_at") if context.connection is not None else None
+        if started:
+            started.pop()
+    
+    registry.register(Gauge(
+        "db_pool_connections", "SQLAlchemy pool connections by state.",
+        lambda: {(state,): value for state, value in db_pool_stats(engine).items()}, ("state",)
+    ))
+
+
+def instrument_redis_pool(connection_pool) -> None:
+    """Expose the saturation of a redis-py connection pool."""
+    registry.register(Gauge(
+        "redis_pool_connections", "Redis pool connections by state.",
+        lambda: {(state,): value for state, value in redis_pool_stats(connection_pool).items()}, ("state",)
+    ))
+
+
+def db_pool_stats(engine: Engine) -> Dict[str, int]:
+    """Connections of an engine's pool by state."""
+    pool = engine.pool
+    stats = {"checked_out": pool.checkedout()} if hasattr(pool, "checkedout") else {}
+    if hasattr(pool, "size"):
+        stats["size"] = pool.size()
+        stats["overflow"] = max(pool.overflow(), 0)
+        # Connections a request can still get before waiting on the pool
+        stats["available"] = pool.size() + max(pool._max_overflow, 0) - pool.checkedout()
+    return stats
+
+
+def redis_pool_stats(connection_pool) -> Dict[str, int]:
+    """Connections of a redis-py connection pool by state."""
+    return {
+        "in_use": len(connection_pool._in_use_connections),
+        "idle": len(connection_pool._available_connections),
+        "max": connection_pool.max_connections
+    }
+
+
+class MetricsMiddleware:
+    """Record latency, status and SQL/Redis work per route.
+    
+    Routes are labelled by their path template, so /posts/{post_id} is one
+    series however many posts there are; anything unrouted is "unmatched".
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        started_at = time.perf_counter()
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            _request_stats.reset(token)
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_LATENCY.observe(elapsed, method, route)
+            HTTP_SQL_QUERIES.observe(stats.sql_queries, route)
+            HTTP_SQL_TIME.observe(stats.sql_seconds, route)
+            HTTP_REDIS_COMMANDS.observe(stats.redis_commands, route)
+            HTTP_REDIS_TIME.observe(stats.redis_seconds, route)
\ No newline at end of file
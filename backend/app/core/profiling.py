@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import current_request_stats
+
+PROFILE_HEADER = "x-profile"
+
+# Innermost functions of threads that are waiting rather than working
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "thread.py")
+
+
+def make_profile_token(secret: str, ttl_seconds: int) -> str:
+    """Token for the X-Profile header that profiles any request until it expires."""
+    expires = int(time.time()) + ttl_seconds
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(secret: str, token: str) -> bool:
+    expires, _, signature = token.partition(".")
+    if not secret or not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class StackSampler:
+    """Statistical profiler sampling the stacks of busy threads from a background thread.
+    
+    Python cannot tell which thread works for which request, so stacks of
+    every busy thread in the worker are recorded, prefixed with the thread
+    name; concurrent requests on the same worker show up in the profile too.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[tuple(reversed(stack))] += 1
+
+
+def collapsed_stacks(samples: Counter) -> str:
+    """Brendan Gregg's collapsed format, as read by flamegraph.pl and speedscope."""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in samples.most_common())
+
+
+def speedscope_profile(samples: Counter, name: str, interval: float) -> dict:
+    """A speedscope "sampled" profile with sample weights in seconds."""
+    frames: List[dict] = []
+    frame_index: Dict[str, int] = {}
+    stacks, weights = [], []
+    for stack, count in samples.items():
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame})
+            indexes.append(frame_index[frame])
+        stacks.append(indexes)
+        weights.append(count * interval)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": stacks,
+            "weights": weights
+        }],
+        "name": name,
+        "exporter": "vistagram"
+    }
+
+
+def _write_profile(profile_id: str, request: dict, samples: Counter, trace: List[Tuple], started_at: float) -> None:
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+    base = os.path.join(settings.PROFILING_OUTPUT_DIR, profile_id)
+    if settings.PROFILING_FORMAT == "speedscope":
+        name = f"{request['method']} {request['path']}"
+        with open(f"{base}.speedscope.json", "w") as f:
+            json.dump(speedscope_profile(samples, name, settings.PROFILING_INTERVAL_SECONDS), f)
+    else:
+        with open(f"{base}.collapsed.txt", "w") as f:
+            f.write(collapsed_stacks(samples))
+    
+    calls = [
+        {
+            "type": kind,
+            "detail": detail,
+            "start_ms": round((finished_at - seconds - started_at) * 1000, 3),
+            "duration_ms": round(seconds * 1000, 3)
+        }
+        for kind, detail, finished_at, seconds in trace
+    ]
+    with open(f"{base}.trace.json", "w") as f:
+        json.dump({**request, "samples": sum(samples.values()), "calls": calls}, f, indent=2)
+
+
+class ProfilingMiddleware:
+    """Profile requests carrying a valid X-Profile token, or a random sample of them.
+    
+    Each profiled request gets an X-Profile-Id response header naming the
+    stack and trace files written to PROFILING_OUTPUT_DIR. The middleware is
+    only installed when profiling is configured, so it costs nothing when off.
+    It must sit inside MetricsMiddleware, which collects the SQL/Redis trace.
+    """
+    
+    def __init__(self, app: ASGIApp, secret: str = "", sample_rate: float = 0.0, interval: float = 0.005):
+        self.app = app
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval
+    
+    def _should_profile(self, scope: Scope) -> bool:
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        if token is not None and verify_profile_token(self.secret, token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = "{}-{}".format(time.strftime("%Y%m%dT%H%M%S"), uuid.uuid4().hex[:8])
+        stats = current_request_stats()
+        trace: List[Tuple] = []
+        if stats is not None:
+            stats.trace = trace
+        status_code = 500
+        
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+        
+        sampler = StackSampler(self.interval)
+        started_at = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - started_at
+            if stats is not None:
+                stats.trace = None
+            request = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(elapsed * 1000, 3)
+            }
+            try:
+                await run_in_threadpool(_write_profile, profile_id, request, sampler.samples, trace, started_at)
+            except Exception as e:
+                print(f"Could not write profile {profile_id}: {e}")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Create an X-Profile header value for PROFILING_SECRET")
+    parser.add_argument("--ttl", type=int, default=600, help="seconds the token stays valid")
+    args = parser.parse_args(argv)
+    if not settings.PROFILING_SECRET:
+        print("PROFILING_SECRET is not set")
+        return 1
+    print(f"X-Profile: {make_profile_token(settings.PROFILING_SECRET, args.ttl)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
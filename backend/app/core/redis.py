@@ -1,7 +1,168 @@
 import redis
-import json
+import random
+import time
+import uuid
+from redis.client import NEVER_DECODE, Pipeline
 from typing import Any, Optional
+from app.core.cache_codec import get_codec, decode_cached
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
+from app.core.metrics import record_redis
+
+# Feeds that have expired (or were never read) are left alone so the next read
+# rebuilds them completely instead of seeing only the newest fan-out entries.
+_PUSH_TO_FEEDS_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('ZADD', key, ARGV[2], ARGV[1])
+        redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(ARGV[3]) + 1))
+    end
+end
+return #KEYS
+"""
+
+# Tag indexes and the top-tags counter are only maintained once they have been
+# built from SQL, so a missing key always means "rebuild" rather than "partial".
+# KEYS are tag:{name} sets, ARGV is post_id, delta, max_length, then tag names.
+_UPDATE_TAGS_SCRIPT = """
+local track_top = redis.call('EXISTS', 'tags:top') == 1
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        if tonumber(ARGV[2]) > 0 then
+            redis.call('ZADD', key, ARGV[1], ARGV[1])
+            redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(ARGV[3]) + 1))
+        else
+            redis.call('ZREM', key, ARGV[1])
+        end
+    end
+    if track_top then
+        redis.call('ZINCRBY', 'tags:top', ARGV[2], ARGV[3 + i])
+    end
+end
+if track_top then
+    redis.call('ZREMRANGEBYSCORE', 'tags:top', '-inf', 0)
+end
+return #KEYS
+"""
+
+
+# Repairs only apply if the counter still holds the value the reconciler read,
+# so increments that race with a repair are never overwritten.
+_COMPARE_AND_SET_FIELD_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if (current or '') == ARGV[2] then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Counters are added to the target rather than copied, so increments that
+# already landed in the new layout during a migration are kept.
+# KEYS are the source and target hashes, ARGV the source then target fields.
+_MOVE_COUNTERS_SCRIPT = """
+local moved = 0
+for i = 1, 2 do
+    local value = redis.call('HGET', KEYS[1], ARGV[i])
+    if value then
+        redis.call('HINCRBY', KEYS[2], ARGV[i + 2], value)
+        redis.call('HDEL', KEYS[1], ARGV[i])
+        moved = 1
+    end
+end
+return moved
+"""
+
+# Counters that reach zero are removed so flushed posts leave no fields behind.
+_DECREMENT_FIELD_SCRIPT = """
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], -tonumber(ARGV[2]))
+if value <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return value
+"""
+
+# Adding a coding later must not extend the life of the raw body, so the TTL
+# is only set on a new hash. Does what EXPIRE NX does without needing Redis 7.
+# ARGV is the TTL, then coding and body pairs.
+_CACHE_VARIANTS_SCRIPT = """
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+if redis.call('TTL', KEYS[1]) == -1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+COUNTER_LAYOUTS = ("hash", "bucketed")
+
+
+def post_counter_fields(post_id: int, layout: str = None, bucket_size: int = None) -> tuple:
+    """Get the (key, likes_field, shares_field) holding a post's counters.
+    
+    The bucketed layout packs the counters of bucket_size consecutive posts
+    into one postc:{bucket} hash. Kept under hash-max-listpack-entries, Redis
+    stores it as a compact listpack instead of paying key overhead per post.
+    """
+    layout = layout or settings.REDIS_COUNTER_LAYOUT
+    if layout == "bucketed":
+        bucket_size = bucket_size or settings.REDIS_COUNTER_BUCKET_SIZE
+        return f"postc:{post_id // bucket_size}", f"{post_id}:l", f"{post_id}:s"
+    return f"post:{post_id}", "likes", "shares"
+
+
+class CircuitOpenError(redis.ConnectionError):
+    """Raised instead of contacting Redis while the circuit breaker is open."""
+
+
+def _guarded_call(breaker: CircuitBreaker, command: str, func, *args, **kwargs):
+    """Run a Redis call through the circuit breaker, timing it for metrics."""
+    if not breaker.allow_request():
+        raise CircuitOpenError("Redis circuit breaker is open")
+    started_at = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except (redis.ConnectionError, redis.TimeoutError):
+        breaker.record_failure()
+        raise
+    except Exception:
+        # Redis answered (e.g. with an error reply), so it is reachable
+        breaker.record_success()
+        raise
+    finally:
+        record_redis(command, time.perf_counter() - started_at)
+    breaker.record_success()
+    return result
+
+
+class _GuardedPipeline(Pipeline):
+    breaker: CircuitBreaker = None
+    
+    def execute(self, raise_on_error=True):
+        return _guarded_call(self.breaker, "PIPELINE", super().execute, raise_on_error)
+
+
+class _GuardedRedis(redis.Redis):
+    """Redis client whose commands and pipelines go through a circuit breaker."""
+    
+    breaker: CircuitBreaker = None
+    
+    def execute_command(self, *args, **options):
+        return _guarded_call(self.breaker, str(args[0]).upper(), super().execute_command, *args, **options)
+    
+    def pipeline(self, transaction=True, shard_hint=None) -> Pipeline:
+        pipe = _GuardedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+        pipe.breaker = self.breaker
+        return pipe
 
 
 class RedisService:
@@ -17,18 +178,60 @@ class RedisService:
     
     def __init__(self):
         if self._redis_client is None:
-            self._redis_client = redis.from_url(
+            self._breaker = CircuitBreaker(
+                failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.REDIS_BREAKER_RESET_SECONDS
+            )
+            self._redis_client = _GuardedRedis.from_url(
                 settings.REDIS_URL,
                 db=settings.REDIS_DB,
                 password=settings.REDIS_PASSWORD,
-                decode_responses=True
+                decode_responses=True,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT
             )
+            self._redis_client.breaker = self._breaker
+            self._codec = get_codec(settings.CACHE_CODEC)
     
     @property
     def client(self):
         """Get Redis client instance."""
         return self._redis_client
     
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """Circuit breaker guarding the Redis client."""
+        return self._breaker
+    
+    @property
+    def available(self) -> bool:
+        """Whether Redis is being called: the circuit breaker is closed, or
+        half-open so the next call probes whether Redis is back.
+        
+        Callers with a database fallback should use it instead of relying
+        on Redis defaults while Redis is down.
+        """
+        return self._breaker.state != CircuitBreaker.OPEN
+    
+    def use_batch_client(self) -> None:
+        """Switch to a client for command line tools, without the circuit breaker.
+        
+        Their bulk pipelines can take longer than REDIS_SOCKET_TIMEOUT, which
+        is tuned for requests, so they wait up to REDIS_BATCH_SOCKET_TIMEOUT.
+        """
+        self._redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_BATCH_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT
+        )
+    
+    def _get_bytes(self, key: str) -> Optional[bytes]:
+        """GET a value without decoding it to text, for binary cache codecs."""
+        return self._redis_client.execute_command("GET", key, **{NEVER_DECODE: True})
+    
     def ping(self) -> bool:
         """Test Redis connection."""
         try:
@@ -37,52 +240,144 @@ class RedisService:
             return False
     
     # Session Management
-    def set_session(self, user_id: int, token: str, expires: int = 3600) -> bool:
-        """Store user session with expiration."""
+    def set_session(self, user_id: int, session_id: str, data: dict, expires_at: float) -> bool:
+        """Store a session hash until expires_at and index it under its user."""
         try:
-            self._redis_client.setex(f"session:{user_id}", expires, token)
-            self._redis_client.sadd(f"active_sessions:{user_id}", token)
+            index_key = f"user_sessions:{user_id}"
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.hset(f"session:{session_id}", mapping={**data, "user_id": user_id, "expires_at": expires_at})
+            pipe.expireat(f"session:{session_id}", int(expires_at) + 1)
+            pipe.zadd(index_key, {session_id: expires_at})
+            # Sessions all live as long as a token, so the newest one expires last
+            pipe.expireat(index_key, int(expires_at) + 1)
+            # Unbounded token set of the previous session layout
+            pipe.delete(f"active_sessions:{user_id}")
+            pipe.execute()
             return True
         except Exception:
             return False
     
-    def get_session(self, user_id: int) -> Optional[str]:
-        """Get user session token."""
+    def get_session(self, session_id: str) -> Optional[dict]:
+        """Get a session hash, or None if it expired or was deleted."""
+        try:
+            return self._redis_client.hgetall(f"session:{session_id}") or None
+        except Exception:
+            return None
+    
+    def get_user_sessions(self, user_id: int, now: float) -> Optional[list]:
+        """Get a user's live sessions as (session_id, data), trimming expired index entries."""
         try:
-            return self._redis_client.get(f"session:{user_id}")
+            index_key = f"user_sessions:{user_id}"
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.zremrangebyscore(index_key, "-inf", f"({now}")
+            pipe.zrange(index_key, 0, -1)
+            _, session_ids = pipe.execute()
+            if not session_ids:
+                return []
+            
+            pipe = self._redis_client.pipeline(transaction=False)
+            for session_id in session_ids:
+                pipe.hgetall(f"session:{session_id}")
+            sessions = list(zip(session_ids, pipe.execute()))
+            
+            # Index entries whose hash was deleted are trimmed as well
+            gone = [session_id for session_id, data in sessions if not data]
+            if gone:
+                self._redis_client.zrem(index_key, *gone)
+            return [(session_id, data) for session_id, data in sessions if data]
         except Exception:
             return None
     
-    def delete_session(self, user_id: int, token: str) -> bool:
-        """Delete user session."""
+    def delete_session(self, user_id: int, session_id: str) -> bool:
+        """Delete a session and its index entry."""
         try:
-            self._redis_client.delete(f"session:{user_id}")
-            self._redis_client.srem(f"active_sessions:{user_id}", token)
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.delete(f"session:{session_id}")
+            pipe.zrem(f"user_sessions:{user_id}", session_id)
+            pipe.execute()
             return True
         except Exception:
             return False
     
-    def blacklist_token(self, token: str, expires: int = 3600) -> bool:
-        """Add token to blacklist."""
+    def delete_user_sessions(self, user_id: int) -> Optional[int]:
+        """Delete all sessions of a user, returning how many there were."""
+        try:
+            index_key = f"user_sessions:{user_id}"
+            session_ids = self._redis_client.zrange(index_key, 0, -1)
+            if not session_ids:
+                return 0
+            # Only the sessions read are removed, so a concurrent login keeps its entry
+            pipe = self._redis_client.pipeline(transaction=False)
+            for session_id in session_ids:
+                pipe.delete(f"session:{session_id}")
+            pipe.zrem(index_key, *session_ids)
+            return sum(pipe.execute()[:-1])
+        except Exception:
+            return None
+    
+    def blacklist_token(self, jti: str, expires_at: float) -> bool:
+        """Revoke a token until it expires and tell other workers about it."""
         try:
-            self._redis_client.setex(f"blacklist:{token}", expires, "1")
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.zadd("revoked:tokens", {jti: expires_at})
+            pipe.publish("revocations", f"token:{jti}")
+            pipe.execute()
             return True
         except Exception:
             return False
     
-    def is_token_blacklisted(self, token: str) -> bool:
-        """Check if token is blacklisted."""
+    def is_token_blacklisted(self, jti: str) -> Optional[bool]:
+        """Check if token is revoked, or None if Redis is unavailable."""
+        try:
+            return self._redis_client.zscore("revoked:tokens", jti) is not None
+        except Exception:
+            return None
+    
+    def revoke_user_tokens(self, user_id: int, issued_before: float) -> bool:
+        """Revoke every token of a user issued before a timestamp."""
         try:
-            return self._redis_client.exists(f"blacklist:{token}") > 0
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.zadd("revoked:users", {user_id: issued_before})
+            pipe.publish("revocations", f"user:{user_id}")
+            pipe.execute()
+            return True
         except Exception:
             return False
     
+    def get_user_tokens_revoked_before(self, user_id: int) -> Optional[float]:
+        """Get the cut-off of a user's last revoke-all, 0 if none, None if Redis is unavailable."""
+        try:
+            return self._redis_client.zscore("revoked:users", user_id) or 0.0
+        except Exception:
+            return None
+    
+    def get_revocations(self, now: float, token_lifetime: int) -> Optional[list]:
+        """Get revocations that still apply, as token:{jti} and user:{id} entries."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.zrangebyscore("revoked:tokens", now, "+inf")
+            pipe.zrangebyscore("revoked:users", now - token_lifetime, "+inf")
+            jtis, user_ids = pipe.execute()
+            return [f"token:{jti}" for jti in jtis] + [f"user:{user_id}" for user_id in user_ids]
+        except Exception:
+            return None
+    
+    def trim_revocations(self, now: float, token_lifetime: int) -> int:
+        """Drop revocations of tokens that have expired anyway."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.zremrangebyscore("revoked:tokens", "-inf", f"({now}")
+            pipe.zremrangebyscore("revoked:users", "-inf", f"({now - token_lifetime}")
+            return sum(pipe.execute())
+        except Exception:
+            return 0
+    
     # Timeline Caching
     def cache_timeline(self, user_id: int, page: int, timeline_data: list, expires: int = 300) -> bool:
         """Cache user timeline."""
         try:
             key = f"timeline:{user_id}:{page}"
-            self._redis_client.setex(key, expires, json.dumps(timeline_data, default=str))
+            self._redis_client.setex(key, expires, self._codec.encode(timeline_data))
             return True
         except Exception:
             return False
@@ -91,18 +386,63 @@ class RedisService:
         """Get cached timeline."""
         try:
             key = f"timeline:{user_id}:{page}"
-            data = self._redis_client.get(key)
-            return json.loads(data) if data else None
+            data = self._get_bytes(key)
+            return decode_cached(data) if data else None
         except Exception:
             return None
     
     def invalidate_timeline_cache(self, user_id: int) -> bool:
         """Invalidate all timeline cache for user."""
         try:
+            # SCAN walks the keyspace incrementally instead of blocking like KEYS
             pattern = f"timeline:{user_id}:*"
-            keys = self._redis_client.keys(pattern)
+            keys = []
+            for key in self._redis_client.scan_iter(match=pattern, count=1000):
+                keys.append(key)
+                if len(keys) >= 500:
+                    self._redis_client.unlink(*keys)
+                    keys = []
             if keys:
-                self._redis_client.delete(*keys)
+                self._redis_client.unlink(*keys)
+            return True
+        except Exception:
+            return False
+    
+    def bump_timeline_generation(self) -> Optional[int]:
+        """Advance the timeline generation after a post is created, edited or deleted."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            # Start from the clock so a flushed Redis never reuses old generations
+            pipe.set("timeline_generation", time.time_ns() // 1000, nx=True)
+            pipe.incr("timeline_generation")
+            return pipe.execute()[-1]
+        except Exception:
+            return None
+    
+    def get_timeline_generation(self) -> Optional[int]:
+        """Get the timeline generation, or None if Redis is unavailable."""
+        try:
+            generation = self._redis_client.get("timeline_generation")
+            return int(generation) if generation is not None else self.bump_timeline_generation()
+        except Exception:
+            return None
+    
+    # Response Caching
+    def get_response_variants(self, key: str, encodings: list) -> Optional[dict]:
+        """Get the cached bodies of a response by content coding ("identity" is the raw body)."""
+        try:
+            values = self._redis_client.execute_command(
+                "HMGET", f"response:{key}", *encodings, **{NEVER_DECODE: True}
+            )
+            return {encoding: value for encoding, value in zip(encodings, values) if value is not None}
+        except Exception:
+            return None
+    
+    def cache_response_variants(self, key: str, variants: dict, expires: int) -> bool:
+        """Store bodies of a response by content coding next to the ones already cached."""
+        try:
+            pairs = [item for variant in variants.items() for item in variant]
+            self._redis_client.eval(_CACHE_VARIANTS_SCRIPT, 1, f"response:{key}", expires, *pairs)
             return True
         except Exception:
             return False
@@ -111,46 +451,156 @@ class RedisService:
     def increment_like_count(self, post_id: int) -> int:
         """Increment like count for post."""
         try:
-            return self._redis_client.hincrby(f"post:{post_id}", "likes", 1)
+            key, likes_field, _ = post_counter_fields(post_id)
+            return self._redis_client.hincrby(key, likes_field, 1)
         except Exception:
             return 0
     
     def decrement_like_count(self, post_id: int) -> int:
         """Decrement like count for post."""
         try:
-            return self._redis_client.hincrby(f"post:{post_id}", "likes", -1)
+            key, likes_field, _ = post_counter_fields(post_id)
+            return self._redis_client.hincrby(key, likes_field, -1)
         except Exception:
             return 0
     
     def increment_share_count(self, post_id: int) -> int:
         """Increment share count for post."""
         try:
-            return self._redis_client.hincrby(f"post:{post_id}", "shares", 1)
+            key, _, shares_field = post_counter_fields(post_id)
+            return self._redis_client.hincrby(key, shares_field, 1)
         except Exception:
             return 0
     
-    def get_post_counts(self, post_id: int) -> dict:
-        """Get like and share counts for post."""
+    def get_post_counts(self, post_id: int) -> Optional[dict]:
+        """Get like and share counts for post, or None if Redis has none."""
         try:
-            counts = self._redis_client.hgetall(f"post:{post_id}")
+            likes, shares = self._redis_client.hmget(*post_counter_fields(post_id))
+            if likes is None and shares is None:
+                return None
             return {
-                "likes": int(counts.get("likes", 0)),
-                "shares": int(counts.get("shares", 0))
+                "likes": int(likes or 0),
+                "shares": int(shares or 0)
             }
         except Exception:
-            return {"likes": 0, "shares": 0}
+            return None
     
     def set_post_counts(self, post_id: int, likes: int, shares: int) -> bool:
         """Set like and share counts for post."""
         try:
-            self._redis_client.hset(f"post:{post_id}", mapping={
-                "likes": likes,
-                "shares": shares
+            key, likes_field, shares_field = post_counter_fields(post_id)
+            self._redis_client.hset(key, mapping={
+                likes_field: likes,
+                shares_field: shares
             })
             return True
         except Exception:
             return False
     
+    def set_post_counts_bulk(self, counts: list) -> bool:
+        """Set like and share counts for many posts in one pipeline.
+        
+        counts is a list of (post_id, likes, shares).
+        """
+        try:
+            # Posts sharing a bucket are written with a single HSET
+            mappings = {}
+            for post_id, likes, shares in counts:
+                key, likes_field, shares_field = post_counter_fields(post_id)
+                mapping = mappings.setdefault(key, {})
+                mapping[likes_field] = likes
+                mapping[shares_field] = shares
+            pipe = self._redis_client.pipeline(transaction=False)
+            for key, mapping in mappings.items():
+                pipe.hset(key, mapping=mapping)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    def get_post_counts_bulk(self, post_ids: list) -> Optional[dict]:
+        """Get raw like and share counters for many posts in one pipeline.
+        
+        Maps post id to {"likes": int, "shares": int}, or to None when the
+        post has no counters in Redis.
+        """
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for post_id in post_ids:
+                pipe.hmget(*post_counter_fields(post_id))
+            counts = {}
+            for post_id, (likes, shares) in zip(post_ids, pipe.execute()):
+                if likes is None and shares is None:
+                    counts[post_id] = None
+                else:
+                    counts[post_id] = {"likes": int(likes or 0), "shares": int(shares or 0)}
+            return counts
+        except Exception:
+            return None
+    
+    def get_post_version(self, post_id: int) -> Optional[int]:
+        """Get the version of a post's public view, or None if Redis is unavailable."""
+        try:
+            return int(self._redis_client.get(f"post_version:{post_id}") or 0)
+        except Exception:
+            return None
+    
+    def bump_post_version(self, post_id: int, expires: int) -> Optional[int]:
+        """Advance a post's version after its caption or counters changed."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.incr(f"post_version:{post_id}")
+            pipe.expire(f"post_version:{post_id}", expires)
+            return pipe.execute()[0]
+        except Exception:
+            return None
+    
+    def publish_post_counts_changed(self, post_id: int) -> bool:
+        """Tell every worker that a post's like or share count changed."""
+        try:
+            self._redis_client.publish("post_counts", post_id)
+            return True
+        except Exception:
+            return False
+    
+    def repair_post_counts(self, repairs: list) -> int:
+        """Set counters that still hold an expected value.
+        
+        repairs is a list of (post_id, field, expected, value), where field is
+        "likes" or "shares" and expected is None for a counter missing from
+        Redis. Returns the number applied.
+        """
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for post_id, field, expected, value in repairs:
+                key, likes_field, shares_field = post_counter_fields(post_id)
+                pipe.eval(
+                    _COMPARE_AND_SET_FIELD_SCRIPT, 1, key,
+                    likes_field if field == "likes" else shares_field,
+                    "" if expected is None else expected, value
+                )
+            return sum(pipe.execute())
+        except Exception:
+            return 0
+    
+    def move_post_counters(self, moves: list) -> int:
+        """Move counters between layouts, adding them to any counters already there.
+        
+        moves is a list of (post_id, source, target), where source and target
+        are (key, likes_field, shares_field) locations. Returns the number of
+        posts that had counters to move.
+        """
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for post_id, source, target in moves:
+                pipe.eval(
+                    _MOVE_COUNTERS_SCRIPT, 2, source[0], target[0],
+                    source[1], source[2], target[1], target[2]
+                )
+            return sum(pipe.execute())
+        except Exception:
+            return 0
+    
     # User Like Tracking
     def add_user_like(self, user_id: int, post_id: int) -> bool:
         """Add post to user's liked posts."""
@@ -160,6 +610,20 @@ class RedisService:
         except Exception:
             return False
     
+    def add_user_likes_bulk(self, likes: list) -> bool:
+        """Add many (user_id, post_id) likes in one pipeline."""
+        try:
+            posts_by_user = {}
+            for user_id, post_id in likes:
+                posts_by_user.setdefault(user_id, []).append(post_id)
+            pipe = self._redis_client.pipeline(transaction=False)
+            for user_id, post_ids in posts_by_user.items():
+                pipe.sadd(f"user_likes:{user_id}", *post_ids)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+    
     def remove_user_like(self, user_id: int, post_id: int) -> bool:
         """Remove post from user's liked posts."""
         try:
@@ -168,45 +632,336 @@ class RedisService:
         except Exception:
             return False
     
-    def has_user_liked(self, user_id: int, post_id: int) -> bool:
-        """Check if user has liked post."""
+    def has_user_liked(self, user_id: int, post_id: int) -> Optional[bool]:
+        """Check if user has liked post, or None if Redis is unavailable."""
         try:
-            return self._redis_client.sismember(f"user_likes:{user_id}", post_id)
+            return bool(self._redis_client.sismember(f"user_likes:{user_id}", post_id))
         except Exception:
-            return False
+            return None
     
-    def get_user_liked_posts(self, user_id: int) -> set:
-        """Get all posts liked by user."""
+    def get_user_liked_posts(self, user_id: int) -> Optional[set]:
+        """Get all posts liked by user, or None if Redis is unavailable."""
         try:
             likes = self._redis_client.smembers(f"user_likes:{user_id}")
             return {int(post_id) for post_id in likes}
         except Exception:
-            return set()
+            return None
+    
+    def get_user_liked_posts_bulk(self, user_ids: list) -> Optional[dict]:
+        """Get liked post ids for many users in one pipeline."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.smembers(f"user_likes:{user_id}")
+            return {
+                user_id: {int(post_id) for post_id in likes}
+                for user_id, likes in zip(user_ids, pipe.execute())
+            }
+        except Exception:
+            return None
+    
+    def repair_user_likes(self, additions: dict, removals: dict) -> bool:
+        """Add and remove liked post ids, given as user id to post ids mappings."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for user_id, post_ids in additions.items():
+                if post_ids:
+                    pipe.sadd(f"user_likes:{user_id}", *post_ids)
+            for user_id, post_ids in removals.items():
+                if post_ids:
+                    pipe.srem(f"user_likes:{user_id}", *post_ids)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    # Home Feeds
+    def push_to_feeds(self, user_ids: list, post_id: int, score: float, max_length: int) -> bool:
+        """Add a post to the feeds of users, skipping feeds that are not built."""
+        try:
+            if user_ids:
+                keys = [f"feed:{user_id}" for user_id in user_ids]
+                self._redis_client.eval(
+                    _PUSH_TO_FEEDS_SCRIPT, len(keys), *keys, post_id, score, max_length
+                )
+            return True
+        except Exception:
+            return False
+    
+    def set_feed(self, user_id: int, entries: dict, expires: int) -> bool:
+        """Replace a user's feed with a mapping of post id to score."""
+        try:
+            key = f"feed:{user_id}"
+            pipe = self._redis_client.pipeline(transaction=True)
+            pipe.delete(key)
+            if entries:
+                pipe.zadd(key, entries)
+                pipe.expire(key, expires)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    def get_feed(self, user_id: int, start: int, stop: int, expires: int) -> Optional[tuple]:
+        """Get a slice of a user's feed as ([(post_id, score)], size), or None if not built."""
+        try:
+            key = f"feed:{user_id}"
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.zcard(key)
+            pipe.zrevrange(key, start, stop, withscores=True)
+            pipe.expire(key, expires)
+            size, entries, _ = pipe.execute()
+            if not size:
+                return None
+            return [(int(post_id), score) for post_id, score in entries], size
+        except Exception:
+            return None
+    
+    def remove_from_feed(self, user_id: int, post_ids: list) -> bool:
+        """Remove posts from a user's feed."""
+        try:
+            if post_ids:
+                self._redis_client.zrem(f"feed:{user_id}", *post_ids)
+            return True
+        except Exception:
+            return False
+    
+    def delete_feed(self, user_id: int) -> bool:
+        """Drop a user's feed so it is rebuilt on next read."""
+        try:
+            self._redis_client.delete(f"feed:{user_id}")
+            return True
+        except Exception:
+            return False
+    
+    # Trending
+    def set_trending_score(self, post_id: int, score: float) -> bool:
+        """Set the trending score of a post."""
+        try:
+            self._redis_client.zadd("trending:posts", {post_id: score})
+            return True
+        except Exception:
+            return False
+    
+    def set_trending_scores_bulk(self, scores: dict) -> bool:
+        """Set the trending scores of many posts ({post_id: score}) with one ZADD."""
+        try:
+            if scores:
+                self._redis_client.zadd("trending:posts", scores)
+            return True
+        except Exception:
+            return False
+    
+    def remove_from_trending(self, post_id: int) -> bool:
+        """Remove a post from the trending set."""
+        try:
+            self._redis_client.zrem("trending:posts", post_id)
+            return True
+        except Exception:
+            return False
+    
+    def get_trending(self, start: int, stop: int) -> Optional[tuple]:
+        """Get a slice of trending post ids and the trending set size."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.zrevrange("trending:posts", start, stop)
+            pipe.zcard("trending:posts")
+            post_ids, size = pipe.execute()
+            return [int(post_id) for post_id in post_ids], size
+        except Exception:
+            return None
+    
+    def trim_trending(self, max_size: int) -> int:
+        """Drop the lowest scoring posts beyond max_size."""
+        try:
+            return self._redis_client.zremrangebyrank("trending:posts", 0, -(max_size + 1))
+        except Exception:
+            return 0
+    
+    # Tags
+    def update_post_tags(self, post_id: int, tags: list, delta: int, max_length: int) -> bool:
+        """Add (delta=1) or remove (delta=-1) a post from tag indexes and counters."""
+        try:
+            if tags:
+                keys = [f"tag:{tag}" for tag in tags]
+                self._redis_client.eval(
+                    _UPDATE_TAGS_SCRIPT, len(keys), *keys, post_id, delta, max_length, *tags
+                )
+            return True
+        except Exception:
+            return False
+    
+    def set_tag_posts(self, tag: str, post_ids: list) -> bool:
+        """Build a tag index from post ids."""
+        try:
+            if post_ids:
+                self._redis_client.zadd(f"tag:{tag}", {post_id: post_id for post_id in post_ids})
+            return True
+        except Exception:
+            return False
+    
+    def get_tag_posts(self, tag: str, before_id: Optional[int], limit: int) -> Optional[tuple]:
+        """Get post ids of a tag older than before_id and the index size, or None if not built."""
+        try:
+            key = f"tag:{tag}"
+            max_score = f"({before_id}" if before_id else "+inf"
+            pipe = self._redis_client.pipeline(transaction=False)
+            pipe.zcard(key)
+            pipe.zrevrangebyscore(key, max_score, "-inf", start=0, num=limit)
+            size, post_ids = pipe.execute()
+            if not size:
+                return None
+            return [int(post_id) for post_id in post_ids], size
+        except Exception:
+            return None
+    
+    def set_top_tags(self, counts: dict) -> bool:
+        """Replace the top tags counter with a mapping of tag to post count."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=True)
+            pipe.delete("tags:top")
+            if counts:
+                pipe.zadd("tags:top", counts)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    def get_top_tags(self, limit: int) -> Optional[list]:
+        """Get [(tag, post_count)] of the most used tags, or None if not built."""
+        try:
+            if not self._redis_client.exists("tags:top"):
+                return None
+            top_tags = self._redis_client.zrevrange("tags:top", 0, limit - 1, withscores=True)
+            return [(tag, int(count)) for tag, count in top_tags]
+        except Exception:
+            return None
+    
+    # View Counting
+    def record_views(self, post_ids: list, viewer: str, shards: int, expires: int) -> bool:
+        """Record an impression of posts by a viewer."""
+        try:
+            if post_ids:
+                # A random shard per call keeps hot posts from contending on one key
+                raw_key = f"views:raw:{random.randrange(shards)}"
+                pipe = self._redis_client.pipeline(transaction=False)
+                for post_id in post_ids:
+                    pipe.pfadd(f"views:hll:{post_id}", viewer)
+                    pipe.expire(f"views:hll:{post_id}", expires)
+                    pipe.hincrby(raw_key, post_id, 1)
+                pipe.sadd("views:dirty", *post_ids)
+                pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    def get_unique_views(self, post_ids: list) -> Optional[dict]:
+        """Get estimated unique viewers per post."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for post_id in post_ids:
+                pipe.pfcount(f"views:hll:{post_id}")
+            return dict(zip(post_ids, pipe.execute()))
+        except Exception:
+            return None
+    
+    def pop_dirty_views(self, count: int) -> list:
+        """Take up to count post ids with unflushed impressions."""
+        try:
+            return [int(post_id) for post_id in self._redis_client.spop("views:dirty", count)]
+        except Exception:
+            return []
+    
+    def count_dirty_views(self) -> int:
+        """Number of posts with unflushed impressions."""
+        try:
+            return self._redis_client.scard("views:dirty")
+        except Exception:
+            return 0
+    
+    def restore_dirty_views(self, post_ids: list) -> bool:
+        """Mark popped post ids dirty again after a flush that did not complete."""
+        try:
+            if post_ids:
+                self._redis_client.sadd("views:dirty", *post_ids)
+            return True
+        except Exception:
+            return False
+    
+    def read_raw_views(self, post_ids: list, shards: int) -> Optional[list]:
+        """Read the raw impression counters of posts, as one {post_id: count} per shard."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for shard in range(shards):
+                pipe.hmget(f"views:raw:{shard}", post_ids)
+            return [
+                {post_id: int(count) for post_id, count in zip(post_ids, shard_counts) if count}
+                for shard_counts in pipe.execute()
+            ]
+        except Exception:
+            return None
+    
+    def release_raw_views(self, shard_counts: list) -> bool:
+        """Subtract flushed counts from the raw counters, keeping impressions recorded since the read."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for shard, counts in enumerate(shard_counts):
+                for post_id, count in counts.items():
+                    pipe.eval(_DECREMENT_FIELD_SCRIPT, 1, f"views:raw:{shard}", post_id, count)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
     
     # User Activity Tracking
-    def set_user_online(self, user_id: int, expires: int = 300) -> bool:
-        """Mark user as online."""
+    def set_user_online(self, user_id: int, last_seen: float) -> bool:
+        """Record a user's last-seen timestamp in the presence set."""
         try:
-            self._redis_client.setex(f"user_online:{user_id}", expires, "1")
+            self._redis_client.zadd("presence:online", {user_id: last_seen})
             return True
         except Exception:
             return False
     
-    def is_user_online(self, user_id: int) -> bool:
-        """Check if user is online."""
+    def is_user_online(self, user_id: int, since: float) -> bool:
+        """Check if user was seen at or after since."""
         try:
-            return self._redis_client.exists(f"user_online:{user_id}") > 0
+            last_seen = self._redis_client.zscore("presence:online", user_id)
+            return last_seen is not None and last_seen >= since
         except Exception:
             return False
     
+    def get_users_last_seen(self, user_ids: list) -> Optional[dict]:
+        """Get last-seen timestamps of many users in one round trip, None if never seen."""
+        try:
+            pipe = self._redis_client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.zscore("presence:online", user_id)
+            return dict(zip(user_ids, pipe.execute()))
+        except Exception:
+            return None
+    
+    def count_online_users(self, since: float) -> int:
+        """Count users seen at or after since."""
+        try:
+            return self._redis_client.zcount("presence:online", since, "+inf")
+        except Exception:
+            return 0
+    
+    def trim_presence(self, before: float) -> int:
+        """Drop users last seen before a timestamp."""
+        try:
+            return self._redis_client.zremrangebyscore("presence:online", "-inf", f"({before}")
+        except Exception:
+            return 0
+    
     # General Cache Methods
     def set_cache(self, key: str, value: Any, expires: Optional[int] = None) -> bool:
         """Set cache value."""
         try:
             if expires:
-                self._redis_client.setex(key, expires, json.dumps(value, default=str))
+                self._redis_client.setex(key, expires, self._codec.encode(value))
             else:
-                self._redis_client.set(key, json.dumps(value, default=str))
+                self._redis_client.set(key, self._codec.encode(value))
             return True
         except Exception:
             return False
@@ -214,11 +969,28 @@ class RedisService:
     def get_cache(self, key: str) -> Any:
         """Get cache value."""
         try:
-            data = self._redis_client.get(key)
-            return json.loads(data) if data else None
+            data = self._get_bytes(key)
+            return decode_cached(data) if data else None
         except Exception:
             return None
     
+    def acquire_lock(self, name: str, expires: int) -> Optional[str]:
+        """Take a named lock across workers, returning its token if acquired."""
+        try:
+            token = uuid.uuid4().hex
+            if self._redis_client.set(f"lock:{name}", token, nx=True, ex=expires):
+                return token
+            return None
+        except Exception:
+            return None
+    
+    def release_lock(self, name: str, token: str) -> bool:
+        """Release a lock if it is still held with token."""
+        try:
+            return self._redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token) == 1
+        except Exception:
+            return False
+    
     def delete_cache(self, key: str) -> bool:
         """Delete cache value."""
         try:
@@ -0,0 +1,30 @@
+import json
+from typing import Any
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class TrustedJSONResponse(JSONResponse):
+    """JSON response for content the app built itself in the shape of its response_model.
+    
+    Returning a Response skips FastAPI's response_model validation, and orjson
+    serializes datetimes natively in the same ISO format Pydantic uses, so large
+    timeline pages are encoded in a single pass. Only use it for dicts whose
+    fields and types already match the declared schema.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+else:
+    DefaultResponse = JSONResponse
\ No newline at end of file
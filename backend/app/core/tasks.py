@@ -0,0 +1,35 @@
+import asyncio
+from typing import Callable, List, Tuple
+from starlette.concurrency import run_in_threadpool
+
+# (name, interval in seconds, function) of registered background jobs
+_periodic_tasks: List[Tuple[str, float, Callable[[], object]]] = []
+_running: List[asyncio.Task] = []
+
+
+def register_periodic_task(name: str, interval_seconds: float, func: Callable[[], object]) -> None:
+    """Register a blocking function to run every interval_seconds in each worker."""
+    _periodic_tasks.append((name, interval_seconds, func))
+
+
+async def _run_periodically(name: str, interval_seconds: float, func: Callable[[], object]) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(func)
+        except Exception as e:
+            print(f"Periodic task {name} failed: {e}")
+
+
+def start_periodic_tasks() -> None:
+    """Start all registered periodic tasks on the running event loop."""
+    for name, interval_seconds, func in _periodic_tasks:
+        _running.append(asyncio.create_task(_run_periodically(name, interval_seconds, func)))
+
+
+async def stop_periodic_tasks() -> None:
+    """Cancel running periodic tasks."""
+    for task in _running:
+        task.cancel()
+    await asyncio.gather(*_running, return_exceptions=True)
+    _running.clear()
@@ -1,19 +1,61 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
 from app.core.database import engine, Base
-from app.api import auth, posts
+from app.core.metrics import MetricsMiddleware, instrument_engine, instrument_redis_pool, registry
+from app.core.profiling import ProfilingMiddleware
+from app.core.redis import redis_service
+from app.core.hashing import password_hasher
+from app.core.responses import DefaultResponse
+from app.core.tasks import register_periodic_task, start_periodic_tasks, stop_periodic_tasks
+from app.api import auth, health, posts, users, tags
+from app.services.trending_service import TrendingService
+from app.services.search_service import init_search_index
+from app.services.view_service import flush_views_job
+from app.services.presence_service import PresenceService
+from app.services.revocation_service import RevocationService, start_revocation_listener, stop_revocation_listener
+from app.services.live_count_service import start_live_counts, stop_live_counts
+from app.utils.redis_reconcile import reconcile_counters_job
 
+instrument_engine(engine)
+instrument_redis_pool(redis_service.client.connection_pool)
 Base.metadata.create_all(bind=engine)
+init_search_index(engine)
+
+register_periodic_task("trim_trending", settings.TRENDING_TRIM_INTERVAL_SECONDS, TrendingService.trim)
+register_periodic_task("flush_views", settings.VIEW_FLUSH_INTERVAL_SECONDS, flush_views_job)
+register_periodic_task("trim_presence", settings.PRESENCE_TRIM_INTERVAL_SECONDS, PresenceService.trim)
+register_periodic_task("refresh_revocations", settings.REVOCATION_REFRESH_SECONDS, RevocationService.refresh)
+if settings.RECONCILE_INTERVAL_SECONDS > 0:
+    register_periodic_task("reconcile_counters", settings.RECONCILE_INTERVAL_SECONDS, reconcile_counters_job)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_periodic_tasks()
+    start_revocation_listener()
+    start_live_counts()
+    password_hasher.start()
+    yield
+    password_hasher.shutdown()
+    await stop_live_counts()
+    stop_revocation_listener()
+    await stop_periodic_tasks()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="Vistagram API - A blend of Visit + Instagram style timeline",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=DefaultResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -23,11 +65,30 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+if settings.PROFILING_SECRET or settings.PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        secret=settings.PROFILING_SECRET,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval=settings.PROFILING_INTERVAL_SECONDS
+    )
+# Added last so it is outermost and times the other middleware too
+app.add_middleware(MetricsMiddleware)
 
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(posts.router, prefix="/api/v1")
+app.include_router(users.router, prefix="/api/v1")
+app.include_router(tags.router, prefix="/api/v1")
+app.include_router(health.router)
 
 
 @app.get("/")
@@ -43,4 +104,12 @@ def read_root():
 @app.get("/health")
 def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Metrics of this worker in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
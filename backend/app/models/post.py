@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -6,6 +6,10 @@ from app.core.database import Base
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Home feeds read the newest posts of a set of authors
+        Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -45,4 +49,13 @@ class Share(Base):
     
     # Relationships
     user = relationship("User", back_populates="shares")
-    post = relationship("Post", back_populates="shares") 
\ No newline at end of file
+    post = relationship("Post", back_populates="shares") 
+
+
+class PostStats(Base):
+    __tablename__ = "post_stats"
+    
+    post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+    unique_views = Column(Integer, default=0, nullable=False)
+    total_views = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(64), unique=True, index=True, nullable=False)
+    post_count = Column(Integer, default=0, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PostTag(Base):
+    __tablename__ = "post_tags"
+    __table_args__ = (
+        UniqueConstraint("post_id", "tag_id", name="uq_post_tags_post_tag"),
+        # Tag pages read the newest posts of a tag
+        Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
+    tag_id = Column(Integer, ForeignKey("tags.id"), nullable=False)
@@ -30,6 +30,7 @@ class PostResponse(BaseModel):
     caption: Optional[str] = None
     likes_count: int
     shares_count: int
+    views: int = 0
     created_at: datetime
     is_liked: bool = False
 
@@ -38,4 +39,9 @@ class TimelineResponse(BaseModel):
     posts: List[PostResponse]
     total: int
     page: int
-    per_page: int 
\ No newline at end of file
+    per_page: int 
+
+
+class CursorTimelineResponse(BaseModel):
+    posts: List[PostResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class TagCount(BaseModel):
+    tag: str
+    posts_count: int
+
+
+class TopTagsResponse(BaseModel):
+    tags: List[TagCount]
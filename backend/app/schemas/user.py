@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -34,4 +34,25 @@ class UserLogin(BaseModel):
 
 class Token(BaseModel):
     access_token: str
-    token_type: str
\ No newline at end of file
+    token_type: str
+
+
+class OnlineStatusResponse(BaseModel):
+    online: Dict[int, bool]
+
+
+class OnlineCountResponse(BaseModel):
+    online: int
+
+
+class SessionInfo(BaseModel):
+    id: str
+    created_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    user_agent: Optional[str] = None
+    ip_address: Optional[str] = None
+    current: bool = False
+
+
+class SessionListResponse(BaseModel):
+    sessions: List[SessionInfo]
\ No newline at end of file
@@ -0,0 +1,220 @@
+import time
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy import desc, func
+from sqlalchemy.exc import IntegrityError
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.user import User
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.redis import redis_service
+from fastapi import HTTPException
+from typing import List, Optional, Set, Tuple
+
+
+def feed_score(created_at: Optional[datetime]) -> float:
+    """Convert a post timestamp into a feed sort score."""
+    if created_at is None:
+        return datetime.now(timezone.utc).timestamp()
+    if created_at.tzinfo is None:
+        # SQLite hands back naive UTC timestamps
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.timestamp()
+
+
+class FeedService:
+    @staticmethod
+    def follow_user(db: Session, follower_id: int, followee_id: int) -> bool:
+        """Follow a user; returns False if they were already followed."""
+        if follower_id == followee_id:
+            raise HTTPException(status_code=400, detail="You cannot follow yourself")
+        
+        followee = db.query(User).filter(User.id == followee_id).first()
+        if not followee:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        existing_follow = db.query(Follow).filter(
+            Follow.follower_id == follower_id,
+            Follow.followee_id == followee_id
+        ).first()
+        if existing_follow:
+            return False
+        
+        try:
+            db.add(Follow(follower_id=follower_id, followee_id=followee_id))
+            db.commit()
+        except IntegrityError:
+            # A concurrent request followed them first
+            db.rollback()
+            return False
+        # The followee's backlog has to be merged in, so rebuild on next read
+        FeedService.invalidate_feed(follower_id)
+        return True
+    
+    @staticmethod
+    def unfollow_user(db: Session, follower_id: int, followee_id: int) -> bool:
+        """Unfollow a user; returns False if they were not followed."""
+        deleted = db.query(Follow).filter(
+            Follow.follower_id == follower_id,
+            Follow.followee_id == followee_id
+        ).delete()
+        db.commit()
+        if deleted:
+            FeedService.invalidate_feed(follower_id)
+        return bool(deleted)
+    
+    @staticmethod
+    def invalidate_feed(user_id: int) -> None:
+        """Drop a user's feed and the follows it was built from."""
+        redis_service.delete_feed(user_id)
+        redis_service.delete_cache(f"feed_sources:{user_id}")
+    
+    @staticmethod
+    def get_following_ids(db: Session, user_id: int) -> List[int]:
+        """Get ids of the users a user follows."""
+        rows = db.query(Follow.followee_id).filter(Follow.follower_id == user_id).all()
+        return [followee_id for followee_id, in rows]
+    
+    @staticmethod
+    def get_follower_count(db: Session, user_id: int) -> int:
+        """Get number of followers of a user."""
+        return db.query(Follow).filter(Follow.followee_id == user_id).count()
+    
+    @staticmethod
+    def get_celebrity_ids(db: Session, user_ids: List[int]) -> Set[int]:
+        """Get the users whose posts are pulled on read instead of fanned out."""
+        if not user_ids:
+            return set()
+        rows = db.query(Follow.followee_id)\
+            .filter(Follow.followee_id.in_(user_ids))\
+            .group_by(Follow.followee_id)\
+            .having(func.count(Follow.id) >= settings.FEED_CELEBRITY_THRESHOLD)\
+            .all()
+        return {followee_id for followee_id, in rows}
+    
+    @staticmethod
+    def get_feed_sources(db: Session, user_id: int) -> Optional[dict]:
+        """Get the celebrities a user follows and how many posts they add to the feed.
+        
+        The result is cached and rechecked every FEED_SOURCES_TTL_SECONDS, so
+        warm feed reads do not query follows. When the celebrities changed
+        the feed is dropped, so posts of authors who crossed the threshold
+        are neither missing nor counted twice. Returns None when the user
+        follows nobody.
+        """
+        key = f"feed_sources:{user_id}"
+        sources = redis_service.get_cache(key)
+        if sources is not None and sources["checked_at"] + settings.FEED_SOURCES_TTL_SECONDS >= time.time():
+            return sources if sources["follows"] else None
+        
+        following_ids = FeedService.get_following_ids(db, user_id)
+        celebrity_ids = sorted(FeedService.get_celebrity_ids(db, following_ids))
+        celebrity_posts = db.query(Post).filter(Post.user_id.in_(celebrity_ids)).count() if celebrity_ids else 0
+        fresh = {
+            "follows": bool(following_ids),
+            "celebrity_ids": celebrity_ids,
+            "celebrity_posts": min(celebrity_posts, settings.FEED_MAX_LENGTH),
+            "checked_at": time.time()
+        }
+        if sources is None or sources["celebrity_ids"] != celebrity_ids:
+            redis_service.delete_feed(user_id)
+        redis_service.set_cache(key, fresh, settings.FEED_TTL_SECONDS)
+        return fresh if fresh["follows"] else None
+    
+    @staticmethod
+    def fan_out_post(db: Session, post: Post) -> int:
+        """Push a new post into the feeds of its author and followers."""
+        score = feed_score(post.created_at)
+        redis_service.push_to_feeds([post.user_id], post.id, score, settings.FEED_MAX_LENGTH)
+        
+        if FeedService.get_follower_count(db, post.user_id) >= settings.FEED_CELEBRITY_THRESHOLD:
+            # Followers merge celebrity posts in at read time
+            return 0
+        
+        follower_ids = db.query(Follow.follower_id)\
+            .filter(Follow.followee_id == post.user_id)\
+            .yield_per(settings.FEED_FANOUT_BATCH_SIZE)
+        
+        pushed = 0
+        batch = []
+        for follower_id, in follower_ids:
+            batch.append(follower_id)
+            if len(batch) >= settings.FEED_FANOUT_BATCH_SIZE:
+                redis_service.push_to_feeds(batch, post.id, score, settings.FEED_MAX_LENGTH)
+                pushed += len(batch)
+                batch = []
+        if batch:
+            redis_service.push_to_feeds(batch, post.id, score, settings.FEED_MAX_LENGTH)
+            pushed += len(batch)
+        return pushed
+    
+    @staticmethod
+    def remove_post(post: Post) -> None:
+        """Remove a deleted post from its author's feed.
+        
+        Followers' feeds are cleaned lazily, by prune_feed when a page read
+        finds ids that no longer exist.
+        """
+        redis_service.remove_from_feed(post.user_id, [post.id])
+    
+    @staticmethod
+    def prune_feed(user_id: int, post_ids: List[int]) -> None:
+        """Remove ids of deleted posts from a user's feed."""
+        redis_service.remove_from_feed(user_id, post_ids)
+    
+    @staticmethod
+    def _get_recent_post_entries(db: Session, user_ids: List[int], limit: int) -> List[Tuple[int, float]]:
+        """Get (post_id, score) of the newest posts by a set of authors."""
+        if not user_ids or limit <= 0:
+            return []
+        rows = db.query(Post.id, Post.created_at)\
+            .filter(Post.user_id.in_(user_ids))\
+            .order_by(desc(Post.created_at))\
+            .limit(limit)\
+            .all()
+        return [(post_id, feed_score(created_at)) for post_id, created_at in rows]
+    
+    @staticmethod
+    def rebuild_feed(db: Session, user_id: int, author_ids: List[int]) -> List[Tuple[int, float]]:
+        """Rebuild a user's precomputed feed from the database."""
+        entries = FeedService._get_recent_post_entries(db, author_ids, settings.FEED_MAX_LENGTH)
+        redis_service.set_feed(user_id, dict(entries), settings.FEED_TTL_SECONDS)
+        return entries
+    
+    @staticmethod
+    def get_home_feed(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Optional[Tuple[List[int], int]]:
+        """Get a page of post ids for a user's home feed and the feed size.
+        
+        Returns None when the user follows nobody, so callers can fall back
+        to the global timeline.
+        """
+        sources = FeedService.get_feed_sources(db, user_id)
+        if sources is None:
+            return None
+        celebrity_ids = sources["celebrity_ids"]
+        
+        window = skip + limit
+        feed = redis_service.get_feed(user_id, 0, window - 1, settings.FEED_TTL_SECONDS)
+        record_cache("feed", "miss" if feed is None else "hit")
+        if feed is None:
+            following_ids = FeedService.get_following_ids(db, user_id)
+            author_ids = [uid for uid in following_ids if uid not in celebrity_ids] + [user_id]
+            entries = FeedService.rebuild_feed(db, user_id, author_ids)
+            feed = entries[:window], len(entries)
+        entries, total = feed
+        
+        if celebrity_ids:
+            celebrity_entries = FeedService._get_recent_post_entries(db, celebrity_ids, window)
+            total += sources["celebrity_posts"]
+            # A post fanned out just before its author crossed the threshold can be in both
+            merged = dict(entries)
+            merged.update(celebrity_entries)
+            entries = sorted(merged.items(), key=lambda entry: entry[1], reverse=True)
+        
+        return [post_id for post_id, _ in entries[skip:window]], total
\ No newline at end of file
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import db_pool_stats, redis_pool_stats
+from app.core.redis import redis_service
+
+_started_at = time.time()
+# Last readiness result and when it was taken, shared by all probes for HEALTH_CACHE_SECONDS
+_cached: Optional[Tuple[float, bool, dict]] = None
+_check_lock: Optional[asyncio.Lock] = None
+# Checks that outlived their timeout; a hanging dependency gets no second thread
+_pending: Dict[str, asyncio.Future] = {}
+
+
+def _check_database() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def _check_redis() -> None:
+    if not redis_service.ping():
+        raise RuntimeError("PING failed")
+
+
+async def _run_check(name: str, check: Callable[[], None]) -> dict:
+    """Run a blocking check in a thread, giving up on it after HEALTH_CHECK_TIMEOUT_SECONDS."""
+    started_at = time.perf_counter()
+    future = _pending.get(name)
+    if future is not None and not future.done():
+        return {"ok": False, "latency_ms": None, "error": "previous check still running"}
+    
+    # Unlike wait_for, wait does not wait for the thread to finish on timeout
+    future = _pending[name] = asyncio.get_running_loop().run_in_executor(None, check)
+    done, _ = await asyncio.wait({future}, timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    result = {"ok": False, "latency_ms": round((time.perf_counter() - started_at) * 1000, 2)}
+    if not done:
+        result["error"] = f"timed out after {settings.HEALTH_CHECK_TIMEOUT_SECONDS}s"
+    elif future.exception() is not None:
+        result["error"] = str(future.exception()) or type(future.exception()).__name__
+    else:
+        result["ok"] = True
+    return result
+
+
+class HealthService:
+    @staticmethod
+    def liveness() -> dict:
+        """The process is up and its event loop is answering."""
+        return {"status": "alive", "uptime_seconds": round(time.time() - _started_at, 1)}
+    
+    @staticmethod
+    async def readiness() -> Tuple[bool, dict]:
+        """Check the database and Redis, reusing results younger than HEALTH_CACHE_SECONDS."""
+        global _cached, _check_lock
+        if _check_lock is None:
+            _check_lock = asyncio.Lock()
+        
+        # Concurrent probes wait for one check instead of starting their own
+        async with _check_lock:
+            if _cached is not None and time.monotonic() - _cached[0] < settings.HEALTH_CACHE_SECONDS:
+                return _cached[1], _cached[2]
+            
+            database, redis = await asyncio.gather(
+                _run_check("database", _check_database),
+                _run_check("redis", _check_redis)
+            )
+            # Without Redis the app falls back to SQL, so it can be made optional
+            ready = database["ok"] and (redis["ok"] or not settings.HEALTH_REQUIRE_REDIS)
+            report = {
+                "status": "ready" if ready else "unavailable",
+                "checks": {"database": database, "redis": redis},
+                "pools": {
+                    "database": db_pool_stats(engine),
+                    "redis": redis_pool_stats(redis_service.client.connection_pool)
+                },
+                "redis_breaker": redis_service.breaker.state
+            }
+            _cached = (time.monotonic(), ready, report)
+            return ready, report
\ No newline at end of file
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+from fastapi import WebSocket
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.redis import redis_service
+
+CHANNEL = "post_counts"
+
+
+class LiveCountHub:
+    """Pushes like and share counts to the WebSocket connections watching a post.
+    
+    Each worker holds a single Redis subscription that only collects the ids
+    of changed posts. Once per flush interval the counts of changed posts
+    with local watchers are read in one pipeline and every connection gets
+    at most one frame, so idle connections cost no Redis or CPU time at all.
+    """
+    
+    def __init__(self):
+        self._watchers: Dict[int, Set[WebSocket]] = {}
+        self._watching: Dict[WebSocket, Set[int]] = {}
+        # Written by the listener thread, swapped out by the event loop
+        self._changed: Set[int] = set()
+        self._changed_lock = threading.Lock()
+    
+    @property
+    def connections(self) -> int:
+        return len(self._watching)
+    
+    def connect(self, websocket: WebSocket) -> None:
+        self._watching[websocket] = set()
+    
+    def disconnect(self, websocket: WebSocket) -> None:
+        for post_id in self._watching.pop(websocket, ()):
+            self._unwatch(websocket, post_id)
+    
+    def subscribe(self, websocket: WebSocket, post_ids: Iterable[int]) -> List[int]:
+        """Watch posts, up to LIVE_COUNTS_MAX_POSTS per connection; returns the ids added."""
+        watching = self._watching.get(websocket)
+        if watching is None:
+            return []
+        added = []
+        for post_id in post_ids:
+            if len(watching) >= settings.LIVE_COUNTS_MAX_POSTS:
+                break
+            if post_id not in watching:
+                watching.add(post_id)
+                self._watchers.setdefault(post_id, set()).add(websocket)
+                added.append(post_id)
+        return added
+    
+    def unsubscribe(self, websocket: WebSocket, post_ids: Iterable[int]) -> None:
+        watching = self._watching.get(websocket, set())
+        for post_id in post_ids:
+            if post_id in watching:
+                watching.discard(post_id)
+                self._unwatch(websocket, post_id)
+    
+    def _unwatch(self, websocket: WebSocket, post_id: int) -> None:
+        watchers = self._watchers.get(post_id)
+        if watchers is not None:
+            watchers.discard(websocket)
+            if not watchers:
+                del self._watchers[post_id]
+    
+    def mark_changed(self, post_id: int) -> None:
+        with self._changed_lock:
+            self._changed.add(post_id)
+    
+    async def flush(self) -> int:
+        """Send the counts of posts changed since the last flush; returns the frames sent."""
+        with self._changed_lock:
+            changed, self._changed = self._changed, set()
+        post_ids = [post_id for post_id in changed if post_id in self._watchers]
+        if not post_ids:
+            return 0
+        
+        counts = await run_in_threadpool(redis_service.get_post_counts_bulk, post_ids) or {}
+        frames: Dict[WebSocket, dict] = {}
+        for post_id in post_ids:
+            if counts.get(post_id) is None:
+                continue
+            for websocket in self._watchers.get(post_id, ()):
+                frames.setdefault(websocket, {})[str(post_id)] = counts[post_id]
+        
+        await asyncio.gather(*(
+            self._send(websocket, {"type": "counts", "posts": posts}) for websocket, posts in frames.items()
+        ))
+        return len(frames)
+    
+    async def _send(self, websocket: WebSocket, frame: dict) -> None:
+        try:
+            await asyncio.wait_for(websocket.send_json(frame), settings.LIVE_COUNTS_SEND_TIMEOUT)
+        except Exception:
+            # A slow or dead client must not hold up the frames of everyone else
+            self.disconnect(websocket)
+            try:
+                await websocket.close(code=1013)
+            except Exception:
+                pass
+
+
+live_count_hub = LiveCountHub()
+_stop_listener = threading.Event()
+_listener: Optional[threading.Thread] = None
+_flusher: Optional[asyncio.Task] = None
+
+
+def _listen() -> None:
+    """Collect the ids of posts whose counts changed on any worker."""
+    while not _stop_listener.is_set():
+        pubsub = None
+        try:
+            pubsub = redis_service.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            while not _stop_listener.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message:
+                    live_count_hub.mark_changed(int(message["data"]))
+        except Exception as e:
+            print(f"Live count listener disconnected: {e}")
+            _stop_listener.wait(settings.REDIS_BREAKER_RESET_SECONDS)
+        finally:
+            if pubsub is not None:
+                pubsub.close()
+
+
+async def _flush_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.LIVE_COUNTS_FLUSH_SECONDS)
+        try:
+            await live_count_hub.flush()
+        except Exception as e:
+            print(f"Live count flush failed: {e}")
+
+
+def start_live_counts() -> None:
+    """Start the count listener thread and the frame flusher on the running event loop."""
+    global _listener, _flusher
+    _stop_listener.clear()
+    _listener = threading.Thread(target=_listen, name="live-count-listener", daemon=True)
+    _listener.start()
+    _flusher = asyncio.create_task(_flush_periodically())
+
+
+async def stop_live_counts() -> None:
+    _stop_listener.set()
+    if _flusher is not None:
+        _flusher.cancel()
+        await asyncio.gather(_flusher, return_exceptions=True)
+    if _listener is not None:
+        _listener.join(timeout=2)
\ No newline at end of file
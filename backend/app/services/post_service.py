@@ -1,12 +1,24 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from app.models.post import Post, Like, Share
+from app.models.post import Post, Like, Share, PostStats
 from app.models.user import User
 from app.schemas.post import PostUpdate
 from app.utils.file_upload import save_image_file, delete_image_file, get_image_url
+from app.core.database import SessionLocal
+from app.core.hot_cache import hot_cache
 from app.core.redis import redis_service
+from app.services.feed_service import FeedService
+from app.services.trending_service import TrendingService
+from app.services.search_service import SearchService
+from app.services.tag_service import TagService
+from app.services.view_service import ViewService
 from fastapi import HTTPException
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+# Versions key hot cache entries, so they must outlive them: a version that
+# expired and restarted from 0 must not find an entry cached under 0 before.
+POST_VERSION_TTL_SECONDS = 24 * 3600
 
 
 def _get_post_or_404(db: Session, post_id: int) -> Post:
@@ -17,6 +29,138 @@ def _get_post_or_404(db: Session, post_id: int) -> Post:
     return post
 
 
+def _get_liked_post_ids(db: Session, user_id: int, post_ids: List[int]) -> set:
+    """Get which of the given posts a user has liked, from the database."""
+    if not post_ids:
+        return set()
+    rows = db.query(Like.post_id).filter(
+        Like.user_id == user_id,
+        Like.post_id.in_(post_ids)
+    ).all()
+    return {post_id for post_id, in rows}
+
+
+def _post_entry(post: Post, username: str) -> dict:
+    """Timeline fields of a post that come from SQL, in a form that can be cached."""
+    return {
+        "id": post.id,
+        "username": username,
+        "image_url": get_image_url(post.image_path),
+        "caption": post.caption,
+        "likes_count": post.likes_count,
+        "shares_count": post.shares_count,
+        # Serialized the way responses render it, whatever the cache codec
+        "created_at": post.created_at.isoformat()
+    }
+
+
+def _build_timeline(db: Session, rows: list, current_user_id: int) -> List[dict]:
+    """Build timeline entries from (post, username) rows."""
+    return _add_live_fields(db, [_post_entry(post, username) for post, username in rows], current_user_id)
+
+
+def _add_live_fields(db: Session, entries: List[dict], current_user_id: int) -> List[dict]:
+    """Build timeline entries from post entries with live counters, views and the user's likes."""
+    post_ids = [entry["id"] for entry in entries]
+    # Skip Redis entirely while its circuit breaker is open
+    use_redis = redis_service.available
+    
+    # Get user's liked posts from Redis, or from the database if Redis is down
+    user_liked_posts = redis_service.get_user_liked_posts(current_user_id) if use_redis else None
+    if user_liked_posts is None:
+        user_liked_posts = _get_liked_post_ids(db, current_user_id, post_ids)
+    views = ViewService.get_views(db, post_ids)
+    
+    timeline = []
+    for entry in entries:
+        # Get like and share counts from Redis if available, otherwise use database
+        redis_counts = redis_service.get_post_counts(entry["id"]) if use_redis else None
+        if redis_counts:
+            likes_count = redis_counts["likes"]
+            shares_count = redis_counts["shares"]
+        else:
+            likes_count = entry["likes_count"]
+            shares_count = entry["shares_count"]
+        
+        # Entries may be shared with other requests, so they are copied, not updated
+        timeline.append({
+            "id": entry["id"],
+            "username": entry["username"],
+            "image_url": entry["image_url"],
+            "caption": entry["caption"],
+            "likes_count": likes_count,
+            "shares_count": shares_count,
+            "views": views[entry["id"]],
+            "created_at": entry["created_at"],
+            "is_liked": entry["id"] in user_liked_posts
+        })
+    
+    return timeline
+
+
+def _load_global_page(skip: int, limit: int) -> dict:
+    """Load a page of the global timeline for the hot cache."""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            Post,
+            User.username
+        ).join(User, Post.user_id == User.id)\
+         .order_by(desc(Post.created_at))\
+         .offset(skip)\
+         .limit(limit)\
+         .all()
+        return {
+            "posts": [_post_entry(post, username) for post, username in rows],
+            "total": PostService.get_total_posts_count(db)
+        }
+    finally:
+        db.close()
+
+
+def _load_public_post(post_id: int) -> dict:
+    """Load the public view of a post and when it last changed, for the hot cache."""
+    db = SessionLocal()
+    try:
+        row = db.query(
+            Post,
+            User.username
+        ).join(User, Post.user_id == User.id)\
+         .filter(Post.id == post_id)\
+         .first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Post not found")
+        post, username = row
+        
+        # Counter changes touch the post row; views only count once flushed to post_stats
+        stats_updated_at = db.query(PostStats.updated_at).filter(PostStats.post_id == post.id).scalar()
+        last_modified = max(
+            value for value in (post.created_at, post.updated_at, stats_updated_at) if value is not None
+        )
+        entry = _post_entry(post, username)
+        entry["image_url"] = f"/uploads/{post.image_path}"
+        return {"post": entry, "last_modified": last_modified.isoformat()}
+    finally:
+        db.close()
+
+
+def _get_rows_by_ids(db: Session, post_ids: List[int]) -> list:
+    """Load (post, username) rows for post ids, keeping the order of the ids."""
+    if not post_ids:
+        return []
+    rows = db.query(
+        Post,
+        User.username
+    ).join(User, Post.user_id == User.id)\
+     .filter(Post.id.in_(post_ids))\
+     .all()
+    
+    # Ids of deleted posts simply drop out
+    positions = {post_id: index for index, post_id in enumerate(post_ids)}
+    rows.sort(key=lambda row: positions[row[0].id])
+    return rows
+
+
 class PostService:
     @staticmethod
     def create_post(
@@ -35,8 +179,15 @@ class PostService:
         )
         
         db.add(db_post)
+        db.flush()
+        SearchService.index_post(db, db_post)
+        added_tags, _ = TagService.sync_post_tags(db, db_post)
         db.commit()
         db.refresh(db_post)
+        
+        FeedService.fan_out_post(db, db_post)
+        TagService.publish_tag_changes(db_post.id, added_tags, set())
+        redis_service.bump_timeline_generation()
         return db_post
     
     @staticmethod
@@ -44,45 +195,96 @@ class PostService:
         """Get post by ID."""
         return db.query(Post).filter(Post.id == post_id).first()
     
+    @staticmethod
+    def get_public_post(post_id: int) -> Tuple[dict, datetime]:
+        """Get the public view of a post with live counters, and when it last changed."""
+        # Likes, shares and edits bump the post's version, so its Last-Modified is reloaded
+        version = redis_service.get_post_version(post_id)
+        cached = hot_cache.get_or_load(f"public_post:{post_id}:{version}", lambda: _load_public_post(post_id))
+        
+        post = dict(cached["post"])
+        redis_counts = redis_service.get_post_counts(post_id) if redis_service.available else None
+        if redis_counts:
+            post["likes_count"] = redis_counts["likes"]
+            post["shares_count"] = redis_counts["shares"]
+        return post, datetime.fromisoformat(cached["last_modified"])
+    
     @staticmethod
     def get_timeline(
         db: Session, 
         current_user_id: int,
         skip: int = 0, 
         limit: int = 20
-    ) -> List[dict]:
-        """Get timeline of posts with user information and like status."""
-        posts = db.query(
-            Post,
-            User.username
-        ).join(User, Post.user_id == User.id)\
-         .order_by(desc(Post.created_at))\
-         .offset(skip)\
-         .limit(limit)\
-         .all()
+    ) -> Tuple[List[dict], int]:
+        """Get the user's home feed, or the global timeline if they follow nobody.
+        
+        Returns the page of posts and the total number of posts in the feed.
+        """
+        feed = FeedService.get_home_feed(db, current_user_id, skip, limit)
+        
+        if feed is None:
+            # Every user following nobody reads the same pages, so they are cached
+            generation = redis_service.get_timeline_generation()
+            page = hot_cache.get_or_load(
+                f"global:{generation}:{skip}:{limit}", lambda: _load_global_page(skip, limit)
+            )
+            timeline = _add_live_fields(db, page["posts"], current_user_id)
+            total = page["total"]
+        else:
+            post_ids, total = feed
+            rows = _get_rows_by_ids(db, post_ids)
+            if len(rows) < len(post_ids):
+                # Followers' feeds keep ids of deleted posts until a read finds them
+                found = {post.id for post, _ in rows}
+                FeedService.prune_feed(current_user_id, [post_id for post_id in post_ids if post_id not in found])
+                post_ids, total = FeedService.get_home_feed(db, current_user_id, skip, limit) or ([], 0)
+                rows = _get_rows_by_ids(db, post_ids)
+            timeline = _build_timeline(db, rows, current_user_id)
         
-        # Get user's liked posts from Redis
-        user_liked_posts = redis_service.get_user_liked_posts(current_user_id)
-        
-        timeline = []
-        for post, username in posts:
-            # Get like and share counts from Redis if available, otherwise use database
-            redis_counts = redis_service.get_post_counts(post.id)
-            likes_count = redis_counts.get("likes", post.likes_count)
-            shares_count = redis_counts.get("shares", post.shares_count)
-            
-            timeline.append({
-                "id": post.id,
-                "username": username,
-                "image_url": get_image_url(post.image_path),
-                "caption": post.caption,
-                "likes_count": likes_count,
-                "shares_count": shares_count,
-                "created_at": post.created_at,
-                "is_liked": post.id in user_liked_posts
-            })
-        
-        return timeline
+        ViewService.record_impressions([post["id"] for post in timeline], f"user:{current_user_id}")
+        return timeline, total
+    
+    @staticmethod
+    def get_trending(
+        db: Session,
+        current_user_id: int,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[dict], int]:
+        """Get the most popular recent posts by time-decayed score."""
+        trending = TrendingService.get_trending_post_ids(skip, limit)
+        if trending is None:
+            return [], 0
+        
+        post_ids, total = trending
+        rows = _get_rows_by_ids(db, post_ids)
+        return _build_timeline(db, rows, current_user_id), total
+    
+    @staticmethod
+    def search_posts(
+        db: Session,
+        current_user_id: int,
+        query: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Full-text search over captions, best matches first."""
+        post_ids, next_cursor = SearchService.search_post_ids(db, query, cursor, limit)
+        rows = _get_rows_by_ids(db, post_ids)
+        return _build_timeline(db, rows, current_user_id), next_cursor
+    
+    @staticmethod
+    def get_tag_posts(
+        db: Session,
+        current_user_id: int,
+        tag: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get the newest posts with a hashtag or emoji tag."""
+        post_ids, next_cursor = TagService.get_tag_post_ids(db, tag, cursor, limit)
+        rows = _get_rows_by_ids(db, post_ids)
+        return _build_timeline(db, rows, current_user_id), next_cursor
     
     @staticmethod
     def get_total_posts_count(db: Session) -> int:
@@ -96,6 +298,9 @@ class PostService:
         
         # Check if user has already liked the post using Redis
         has_liked = redis_service.has_user_liked(user_id, post_id)
+        if has_liked is None:
+            # Redis is unavailable, so the database decides
+            has_liked = bool(_get_liked_post_ids(db, user_id, [post_id]))
         
         if has_liked:
             # Unlike the post
@@ -109,7 +314,12 @@ class PostService:
             if existing_like:
                 db.delete(existing_like)
                 post.likes_count = max(0, post.likes_count - 1)
+                TrendingService.update_post_score(
+                    post.id, post.likes_count, post.shares_count, post.created_at
+                )
                 db.commit()
+            redis_service.bump_post_version(post_id, POST_VERSION_TTL_SECONDS)
+            redis_service.publish_post_counts_changed(post_id)
             return False
         else:
             # Like the post
@@ -124,7 +334,12 @@ class PostService:
                 new_like = Like(user_id=user_id, post_id=post_id)
                 db.add(new_like)
                 post.likes_count += 1
+                TrendingService.update_post_score(
+                    post.id, post.likes_count, post.shares_count, post.created_at
+                )
                 db.commit()
+            redis_service.bump_post_version(post_id, POST_VERSION_TTL_SECONDS)
+            redis_service.publish_post_counts_changed(post_id)
             return True
     
     @staticmethod
@@ -138,7 +353,12 @@ class PostService:
         new_share = Share(user_id=user_id, post_id=post_id)
         db.add(new_share)
         post.shares_count += 1
+        TrendingService.update_post_score(
+            post.id, post.likes_count, post.shares_count, post.created_at
+        )
         db.commit()
+        redis_service.bump_post_version(post_id, POST_VERSION_TTL_SECONDS)
+        redis_service.publish_post_counts_changed(post_id)
         return True
     
     @staticmethod
@@ -154,9 +374,18 @@ class PostService:
         
         db.query(Like).filter(Like.post_id == post_id).delete()
         db.query(Share).filter(Share.post_id == post_id).delete()
+        db.query(PostStats).filter(PostStats.post_id == post_id).delete()
+        SearchService.remove_post(db, post_id)
+        removed_tags = TagService.remove_post_tags(db, post_id)
         delete_image_file(post.image_path)
         db.delete(post)
         db.commit()
+        
+        FeedService.remove_post(post)
+        TrendingService.remove_post(post_id)
+        TagService.publish_tag_changes(post_id, set(), removed_tags)
+        redis_service.bump_post_version(post_id, POST_VERSION_TTL_SECONDS)
+        redis_service.bump_timeline_generation()
         return True
     
     @staticmethod
@@ -175,9 +404,16 @@ class PostService:
         if not post:
             raise HTTPException(status_code=404, detail="Post not found")
         
+        added_tags, removed_tags = set(), set()
         if post_data.caption is not None:
             post.caption = post_data.caption
+            SearchService.index_post(db, post)
+            added_tags, removed_tags = TagService.sync_post_tags(db, post)
         
         db.commit()
         db.refresh(post)
+        
+        TagService.publish_tag_changes(post.id, added_tags, removed_tags)
+        redis_service.bump_post_version(post_id, POST_VERSION_TTL_SECONDS)
+        redis_service.bump_timeline_generation()
         return post 
\ No newline at end of file
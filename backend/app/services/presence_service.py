@@ -0,0 +1,49 @@
+import threading
+import time
+from typing import Dict, List
+from app.core.config import settings
+from app.core.redis import redis_service
+
+# Last heartbeat sent per user by this worker, so busy users cost one ZADD a minute
+_last_heartbeat: Dict[int, float] = {}
+_heartbeat_lock = threading.Lock()
+_MAX_TRACKED_USERS = 100000
+
+
+class PresenceService:
+    @staticmethod
+    def heartbeat(user_id: int, force: bool = False) -> bool:
+        """Mark a user as seen now, at most once per PRESENCE_REFRESH_SECONDS per worker."""
+        now = time.time()
+        with _heartbeat_lock:
+            if not force and now - _last_heartbeat.get(user_id, 0) < settings.PRESENCE_REFRESH_SECONDS:
+                return False
+            if len(_last_heartbeat) >= _MAX_TRACKED_USERS:
+                _last_heartbeat.clear()
+            _last_heartbeat[user_id] = now
+        return redis_service.set_user_online(user_id, now)
+    
+    @staticmethod
+    def is_online(user_id: int) -> bool:
+        """Check if a user was seen within PRESENCE_TIMEOUT_SECONDS."""
+        return redis_service.is_user_online(user_id, time.time() - settings.PRESENCE_TIMEOUT_SECONDS)
+    
+    @staticmethod
+    def get_online_status(user_ids: List[int]) -> Dict[int, bool]:
+        """Check which of many users are online, in one round trip."""
+        since = time.time() - settings.PRESENCE_TIMEOUT_SECONDS
+        last_seen = redis_service.get_users_last_seen(user_ids) or {}
+        return {
+            user_id: last_seen.get(user_id) is not None and last_seen[user_id] >= since
+            for user_id in user_ids
+        }
+    
+    @staticmethod
+    def count_online() -> int:
+        """Count users online right now."""
+        return redis_service.count_online_users(time.time() - settings.PRESENCE_TIMEOUT_SECONDS)
+    
+    @staticmethod
+    def trim() -> int:
+        """Drop users who went offline so the presence set stays small."""
+        return redis_service.trim_presence(time.time() - settings.PRESENCE_TIMEOUT_SECONDS)
\ No newline at end of file
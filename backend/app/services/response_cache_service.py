@@ -0,0 +1,41 @@
+from fastapi import Request, Response
+from app.core.compression import compress, negotiate_encoding
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.redis import redis_service
+from app.core.responses import TrustedJSONResponse
+
+
+class ResponseCacheService:
+    @staticmethod
+    def respond(request: Request, etag: str, content: dict, headers: dict) -> Response:
+        """Respond with a JSON body cached under its ETag, compressed at most once per coding.
+        
+        Identical pages share an ETag, so a hot page is serialized and
+        compressed once and then served as stored bytes. The response carries
+        its own Content-Encoding, which CompressionMiddleware leaves alone.
+        """
+        key = etag.removeprefix("W/").strip('"')
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        encodings = ["identity"] + ([encoding] if encoding else [])
+        cached = redis_service.get_response_variants(key, encodings) or {}
+        
+        new_variants = {}
+        body = cached.get("identity")
+        if body is None:
+            body = new_variants["identity"] = TrustedJSONResponse(content).body
+        
+        headers = {**headers, "Vary": "Accept-Encoding"}
+        if encoding and len(body) >= settings.COMPRESSION_MINIMUM_SIZE:
+            compressed = cached.get(encoding)
+            if compressed is None:
+                compressed = new_variants[encoding] = compress(
+                    body, encoding, settings.COMPRESSION_GZIP_LEVEL, settings.COMPRESSION_BROTLI_QUALITY
+                )
+            body = compressed
+            headers["Content-Encoding"] = encoding
+        
+        record_cache("response", "miss" if new_variants else "hit")
+        if new_variants:
+            redis_service.cache_response_variants(key, new_variants, settings.RESPONSE_CACHE_TTL_SECONDS)
+        return Response(body, media_type="application/json", headers=headers)
\ No newline at end of file
@@ -0,0 +1,159 @@
+import threading
+import time
+from typing import Optional
+from app.core.config import settings
+from app.core.redis import redis_service
+from app.utils.bloom_filter import BloomFilter
+
+CHANNEL = "revocations"
+
+
+class RevocationFilter:
+    """Local Bloom filter of revocations that still apply, kept in sync over pub/sub.
+    
+    Until it has been loaded (or after the subscription drops and messages
+    may have been missed) it reports every entry as possibly revoked, so
+    checks fall through to Redis rather than letting revoked tokens in.
+    """
+    
+    def __init__(self):
+        self._filter: Optional[BloomFilter] = None
+        self._building: Optional[BloomFilter] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+    
+    def add(self, entry: str) -> None:
+        with self._lock:
+            for bloom in (self._filter, self._building):
+                if bloom is not None:
+                    bloom.add(entry)
+    
+    def might_contain(self, entry: str) -> bool:
+        bloom = self._filter
+        return bloom is None or entry in bloom
+    
+    def reload(self) -> bool:
+        """Rebuild the filter from Redis so expired revocations drop out."""
+        bloom = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+        # Revocations published while loading go into the new filter too
+        with self._lock:
+            self._building = bloom
+        entries = redis_service.get_revocations(time.time(), _token_lifetime())
+        if entries is None:
+            with self._lock:
+                self._building = None
+            return False
+        if len(entries) > settings.REVOCATION_BLOOM_CAPACITY:
+            print(f"Revocation filter over capacity ({len(entries)} entries), expect more Redis checks")
+        for entry in entries:
+            bloom.add(entry)
+        with self._lock:
+            self._filter = bloom
+            self._building = None
+        return True
+    
+    def invalidate(self) -> None:
+        with self._lock:
+            self._filter = None
+
+
+revocation_filter = RevocationFilter()
+_stop_listener = threading.Event()
+_listener: Optional[threading.Thread] = None
+
+
+def _token_lifetime() -> int:
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+def _listen() -> None:
+    """Apply revocations published by any worker to the local filter."""
+    while not _stop_listener.is_set():
+        pubsub = None
+        try:
+            pubsub = redis_service.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            # Load after subscribing so nothing falls between the two
+            if not revocation_filter.reload():
+                raise RuntimeError("could not load revocations")
+            while not _stop_listener.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message:
+                    revocation_filter.add(message["data"])
+        except Exception as e:
+            revocation_filter.invalidate()
+            print(f"Revocation listener disconnected: {e}")
+            _stop_listener.wait(settings.REDIS_BREAKER_RESET_SECONDS)
+        finally:
+            if pubsub is not None:
+                pubsub.close()
+
+
+def start_revocation_listener() -> None:
+    """Start syncing the local revocation filter in a background thread."""
+    global _listener
+    _stop_listener.clear()
+    _listener = threading.Thread(target=_listen, name="revocation-listener", daemon=True)
+    _listener.start()
+
+
+def stop_revocation_listener() -> None:
+    """Stop the listener; checks go to Redis until it is started again."""
+    _stop_listener.set()
+    if _listener is not None:
+        _listener.join(timeout=2)
+    revocation_filter.invalidate()
+
+
+class RevocationService:
+    @staticmethod
+    def revoke_token(claims: dict) -> bool:
+        """Revoke a single access token until it expires."""
+        jti = claims.get("jti")
+        if not jti:
+            # Issued before tokens carried an id; it expires on its own shortly
+            return True
+        if not redis_service.blacklist_token(jti, claims["exp"]):
+            return False
+        revocation_filter.add(f"token:{jti}")
+        return True
+    
+    @staticmethod
+    def revoke_all(user_id: int) -> bool:
+        """Revoke every access token issued to a user so far."""
+        if not redis_service.revoke_user_tokens(user_id, time.time()):
+            return False
+        revocation_filter.add(f"user:{user_id}")
+        return True
+    
+    @staticmethod
+    def is_revoked(claims: dict, user_id: int) -> Optional[bool]:
+        """Check a token's claims, only asking Redis when the local filter might match.
+        
+        Returns None when Redis had to be asked but is unavailable.
+        """
+        unknown = False
+        jti = claims.get("jti")
+        if jti and revocation_filter.might_contain(f"token:{jti}"):
+            blacklisted = redis_service.is_token_blacklisted(jti)
+            if blacklisted:
+                return True
+            unknown = blacklisted is None
+        if revocation_filter.might_contain(f"user:{user_id}"):
+            revoked_before = redis_service.get_user_tokens_revoked_before(user_id)
+            if revoked_before and claims.get("iat", 0) < revoked_before:
+                return True
+            unknown = unknown or revoked_before is None
+        return None if unknown else False
+    
+    @staticmethod
+    def refresh() -> int:
+        """Drop expired revocations and rebuild the local filter without them."""
+        now = time.time()
+        trimmed = redis_service.trim_revocations(now, _token_lifetime())
+        if revocation_filter.ready:
+            revocation_filter.reload()
+        return trimmed
\ No newline at end of file
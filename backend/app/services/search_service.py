@@ -0,0 +1,157 @@
+import base64
+import hashlib
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.redis import redis_service
+from app.models.post import Post
+from fastapi import HTTPException
+from typing import List, Optional, Tuple
+
+# Full-text backend chosen at startup: "fts5", "postgres" or None (LIKE scan)
+_search_backend: Optional[str] = None
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_SEARCH_SQL = text("""
+    SELECT post_id, score FROM (
+        SELECT rowid AS post_id, bm25(posts_fts) AS score
+        FROM posts_fts WHERE posts_fts MATCH :query
+    )
+    WHERE score > :after_score OR (score = :after_score AND post_id > :after_id)
+    ORDER BY score, post_id
+    LIMIT :limit
+""")
+
+# Negated ts_rank so both backends sort best match first in ascending order
+_POSTGRES_SEARCH_SQL = text("""
+    SELECT post_id, score FROM (
+        SELECT posts.id AS post_id,
+               -ts_rank(to_tsvector('simple', coalesce(posts.caption, '')), query) AS score
+        FROM posts, plainto_tsquery('simple', :query) AS query
+        WHERE to_tsvector('simple', coalesce(posts.caption, '')) @@ query
+    ) AS matches
+    WHERE score > :after_score OR (score = :after_score AND post_id > :after_id)
+    ORDER BY score, post_id
+    LIMIT :limit
+""")
+
+
+def init_search_index(engine: Engine) -> Optional[str]:
+    """Create the caption full-text index for the database in use."""
+    global _search_backend
+    
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            try:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts "
+                    "USING fts5(caption, tokenize='unicode61 remove_diacritics 2')"
+                ))
+            except OperationalError:
+                print("SQLite was built without FTS5, caption search falls back to LIKE")
+                return None
+            # Backfill posts created before the index existed
+            if conn.execute(text("SELECT 1 FROM posts_fts LIMIT 1")).first() is None:
+                conn.execute(text(
+                    "INSERT INTO posts_fts (rowid, caption) "
+                    "SELECT id, caption FROM posts WHERE caption IS NOT NULL"
+                ))
+            _search_backend = "fts5"
+        elif dialect == "postgresql":
+            # An expression index is maintained by Postgres on every write
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_posts_caption_fts ON posts "
+                "USING GIN (to_tsvector('simple', coalesce(caption, '')))"
+            ))
+            _search_backend = "postgres"
+    return _search_backend
+
+
+def _build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query of quoted terms, prefix matching the last."""
+    terms = [f'"{term}"' for term in _TOKEN_RE.findall(query)]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _encode_cursor(score: float, post_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{score!r}:{post_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(score), int(post_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class SearchService:
+    @staticmethod
+    def index_post(db: Session, post: Post) -> None:
+        """Add or refresh a post's caption in the search index (before commit)."""
+        if _search_backend != "fts5":
+            return
+        db.execute(text("DELETE FROM posts_fts WHERE rowid = :id"), {"id": post.id})
+        if post.caption:
+            db.execute(
+                text("INSERT INTO posts_fts (rowid, caption) VALUES (:id, :caption)"),
+                {"id": post.id, "caption": post.caption}
+            )
+    
+    @staticmethod
+    def remove_post(db: Session, post_id: int) -> None:
+        """Remove a post from the search index (before commit)."""
+        if _search_backend != "fts5":
+            return
+        db.execute(text("DELETE FROM posts_fts WHERE rowid = :id"), {"id": post_id})
+    
+    @staticmethod
+    def search_post_ids(
+        db: Session,
+        query: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[int], Optional[str]]:
+        """Search captions, returning ranked post ids and the cursor of the next page."""
+        query = " ".join(_TOKEN_RE.findall(query.lower()))
+        if not query:
+            return [], None
+        
+        cache_key = "search:{}:{}:{}".format(
+            hashlib.sha1(query.encode()).hexdigest(), cursor or "", limit
+        )
+        cached = redis_service.get_cache(cache_key)
+        record_cache("search", "miss" if cached is None else "hit")
+        if cached is not None:
+            return cached["ids"], cached["next_cursor"]
+        
+        after_score, after_id = _decode_cursor(cursor) if cursor else (float("-inf"), 0)
+        params = {"after_score": after_score, "after_id": after_id, "limit": limit}
+        
+        if _search_backend == "fts5":
+            rows = db.execute(_SQLITE_SEARCH_SQL, {**params, "query": _build_match_query(query)}).all()
+        elif _search_backend == "postgres":
+            rows = db.execute(_POSTGRES_SEARCH_SQL, {**params, "query": query}).all()
+        else:
+            matches = db.query(Post.id)\
+                .filter(Post.caption.ilike(f"%{query}%"), Post.id > after_id)\
+                .order_by(Post.id)\
+                .limit(limit)\
+                .all()
+            rows = [(post_id, 0.0) for post_id, in matches]
+        
+        post_ids = [post_id for post_id, _ in rows]
+        next_cursor = _encode_cursor(rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+        
+        redis_service.set_cache(
+            cache_key, {"ids": post_ids, "next_cursor": next_cursor}, settings.SEARCH_CACHE_TTL_SECONDS
+        )
+        return post_ids, next_cursor
\ No newline at end of file
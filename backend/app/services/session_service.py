@@ -0,0 +1,70 @@
+import time
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException, status
+from app.core.redis import redis_service
+from app.services.revocation_service import RevocationService
+
+
+def _timestamp_to_datetime(value) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(float(value)) if value else None
+
+
+class SessionService:
+    @staticmethod
+    def create_session(user_id: int, claims: dict, user_agent: Optional[str], ip_address: Optional[str]) -> bool:
+        """Record the session of a newly issued token, keyed by its jti."""
+        return redis_service.set_session(user_id, claims["jti"], {
+            "created_at": claims["iat"],
+            "user_agent": (user_agent or "")[:256],
+            "ip_address": ip_address or "",
+        }, claims["exp"])
+    
+    @staticmethod
+    def list_sessions(user_id: int, current_session_id: Optional[str] = None) -> List[dict]:
+        """List a user's live sessions, newest first."""
+        sessions = redis_service.get_user_sessions(user_id, time.time())
+        if sessions is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Sessions are temporarily unavailable"
+            )
+        
+        result = [
+            {
+                "id": session_id,
+                "created_at": _timestamp_to_datetime(data.get("created_at")),
+                "expires_at": _timestamp_to_datetime(data.get("expires_at")),
+                "user_agent": data.get("user_agent") or None,
+                "ip_address": data.get("ip_address") or None,
+                "current": session_id == current_session_id
+            }
+            for session_id, data in sessions
+        ]
+        result.sort(key=lambda session: session["created_at"] or datetime.min, reverse=True)
+        return result
+    
+    @staticmethod
+    def revoke_session(user_id: int, session_id: str) -> bool:
+        """Revoke one session of a user: its token and its record."""
+        session = redis_service.get_session(session_id)
+        if not session or session.get("user_id") != str(user_id):
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        if not RevocationService.revoke_token({"jti": session_id, "exp": float(session["expires_at"])}):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Could not revoke session, please try again"
+            )
+        redis_service.delete_session(user_id, session_id)
+        return True
+    
+    @staticmethod
+    def revoke_all_sessions(user_id: int) -> int:
+        """Revoke every token of a user and delete their sessions."""
+        if not RevocationService.revoke_all(user_id):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Could not revoke sessions, please try again"
+            )
+        return redis_service.delete_user_sessions(user_id) or 0
\ No newline at end of file
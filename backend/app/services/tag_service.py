@@ -0,0 +1,142 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import desc
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.redis import redis_service
+from app.models.post import Post
+from app.models.tag import Tag, PostTag
+from app.utils.hashtags import extract_tags, normalize_tag
+from fastapi import HTTPException
+from typing import List, Optional, Set, Tuple
+
+
+def _get_or_create_tag(db: Session, name: str) -> Tag:
+    """Get a tag by name, creating it if needed."""
+    tag = db.query(Tag).filter(Tag.name == name).first()
+    if tag:
+        return tag
+    
+    try:
+        with db.begin_nested():
+            tag = Tag(name=name, post_count=0)
+            db.add(tag)
+        return tag
+    except IntegrityError:
+        # Created concurrently by another request
+        return db.query(Tag).filter(Tag.name == name).one()
+
+
+class TagService:
+    @staticmethod
+    def sync_post_tags(db: Session, post: Post) -> Tuple[Set[str], Set[str]]:
+        """Update a post's tag rows from its caption (before commit).
+        
+        Returns the added and removed tag names, to be passed to
+        publish_tag_changes once the transaction has committed.
+        """
+        current = {
+            name: post_tag
+            for post_tag, name in db.query(PostTag, Tag.name)
+                .join(Tag, PostTag.tag_id == Tag.id)
+                .filter(PostTag.post_id == post.id)
+                .all()
+        }
+        wanted = extract_tags(post.caption)
+        added = wanted - current.keys()
+        removed = current.keys() - wanted
+        
+        for name in added:
+            tag = _get_or_create_tag(db, name)
+            db.add(PostTag(post_id=post.id, tag_id=tag.id))
+            tag.post_count = Tag.post_count + 1
+        
+        for name in removed:
+            post_tag = current[name]
+            db.query(Tag).filter(Tag.id == post_tag.tag_id)\
+                .update({Tag.post_count: Tag.post_count - 1}, synchronize_session=False)
+            db.delete(post_tag)
+        
+        return added, removed
+    
+    @staticmethod
+    def remove_post_tags(db: Session, post_id: int) -> Set[str]:
+        """Delete a post's tag rows (before commit) and return the removed tag names."""
+        post_tags = db.query(PostTag, Tag.name)\
+            .join(Tag, PostTag.tag_id == Tag.id)\
+            .filter(PostTag.post_id == post_id)\
+            .all()
+        for post_tag, _ in post_tags:
+            db.query(Tag).filter(Tag.id == post_tag.tag_id)\
+                .update({Tag.post_count: Tag.post_count - 1}, synchronize_session=False)
+            db.delete(post_tag)
+        return {name for _, name in post_tags}
+    
+    @staticmethod
+    def publish_tag_changes(post_id: int, added: Set[str], removed: Set[str]) -> None:
+        """Apply committed tag changes to the Redis tag indexes and counters."""
+        redis_service.update_post_tags(post_id, sorted(added), 1, settings.TAG_INDEX_MAX_LENGTH)
+        redis_service.update_post_tags(post_id, sorted(removed), -1, settings.TAG_INDEX_MAX_LENGTH)
+    
+    @staticmethod
+    def _get_tag_post_ids_from_db(db: Session, tag_id: int, before_id: Optional[int], limit: int) -> List[int]:
+        query = db.query(PostTag.post_id).filter(PostTag.tag_id == tag_id)
+        if before_id:
+            query = query.filter(PostTag.post_id < before_id)
+        rows = query.order_by(desc(PostTag.post_id)).limit(limit).all()
+        return [post_id for post_id, in rows]
+    
+    @staticmethod
+    def get_tag_post_ids(
+        db: Session,
+        tag: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[int], Optional[str]]:
+        """Get the newest post ids of a tag and the cursor of the next page."""
+        name = normalize_tag(tag)
+        if not name:
+            raise HTTPException(status_code=400, detail="Invalid tag")
+        try:
+            before_id = int(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        cached = redis_service.get_tag_posts(name, before_id, limit)
+        if cached is not None:
+            post_ids, size = cached
+            if len(post_ids) == limit or size < settings.TAG_INDEX_MAX_LENGTH:
+                next_cursor = str(post_ids[-1]) if len(post_ids) == limit else None
+                return post_ids, next_cursor
+        
+        # Index not built yet, or the page reaches past the posts kept in Redis
+        tag_row = db.query(Tag).filter(Tag.name == name).first()
+        if not tag_row:
+            return [], None
+        
+        if cached is None and not before_id:
+            redis_service.set_tag_posts(
+                name,
+                TagService._get_tag_post_ids_from_db(db, tag_row.id, None, settings.TAG_INDEX_MAX_LENGTH)
+            )
+        
+        post_ids = TagService._get_tag_post_ids_from_db(db, tag_row.id, before_id, limit)
+        next_cursor = str(post_ids[-1]) if len(post_ids) == limit else None
+        return post_ids, next_cursor
+    
+    @staticmethod
+    def get_top_tags(db: Session, limit: int = 20) -> List[Tuple[str, int]]:
+        """Get the most used tags with their post counts."""
+        top_tags = redis_service.get_top_tags(limit)
+        if top_tags is not None:
+            return top_tags
+        
+        # Rebuild the counter from the incrementally maintained SQL counts
+        counts = {
+            name: post_count
+            for name, post_count in db.query(Tag.name, Tag.post_count)
+                .filter(Tag.post_count > 0)
+                .yield_per(5000)
+        }
+        redis_service.set_top_tags(counts)
+        return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
@@ -0,0 +1,39 @@
+import math
+from datetime import datetime, timezone
+from typing import Optional
+from app.core.config import settings
+from app.core.redis import redis_service
+from app.services.feed_service import feed_score
+
+# Scores are offsets from a fixed epoch so they never need global rescoring:
+# a newer post simply starts higher, and old posts sink as new ones arrive.
+TRENDING_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def trending_score(likes: int, shares: int, created_at: Optional[datetime]) -> float:
+    """Compute the time-decayed popularity score of a post."""
+    engagement = max(likes, 0) + settings.TRENDING_SHARE_WEIGHT * max(shares, 0)
+    age_offset = (feed_score(created_at) - TRENDING_EPOCH) / settings.TRENDING_DECAY_SECONDS
+    return math.log10(max(engagement, 1)) + age_offset
+
+
+class TrendingService:
+    @staticmethod
+    def update_post_score(post_id: int, likes: int, shares: int, created_at: Optional[datetime]) -> bool:
+        """Rescore a single post after its engagement changed."""
+        return redis_service.set_trending_score(post_id, trending_score(likes, shares, created_at))
+    
+    @staticmethod
+    def remove_post(post_id: int) -> bool:
+        """Remove a deleted post from trending."""
+        return redis_service.remove_from_trending(post_id)
+    
+    @staticmethod
+    def get_trending_post_ids(skip: int = 0, limit: int = 20) -> Optional[tuple]:
+        """Get a page of trending post ids and the trending set size."""
+        return redis_service.get_trending(skip, skip + limit - 1)
+    
+    @staticmethod
+    def trim() -> int:
+        """Keep the trending set bounded to TRENDING_MAX_SIZE posts."""
+        return redis_service.trim_trending(settings.TRENDING_MAX_SIZE)
\ No newline at end of file
@@ -3,15 +3,16 @@ from sqlalchemy.exc import IntegrityError
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.redis import redis_service
 from fastapi import HTTPException
 from typing import Optional
 
 
 class UserService:
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
-        """Create a new user."""
-        hashed_password = get_password_hash(user_data.password)
+    def create_user(db: Session, user_data: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Create a new user, hashing the password unless it was hashed already."""
+        hashed_password = hashed_password or get_password_hash(user_data.password)
         db_user = User(
             username=user_data.username,
             email=user_data.email,
@@ -35,6 +36,12 @@ class UserService:
             return None
         return user
     
+    @staticmethod
+    def update_password_hash(db: Session, user: User, hashed_password: str) -> None:
+        """Replace a user's password hash, e.g. after the bcrypt cost changed."""
+        user.hashed_password = hashed_password
+        db.commit()
+    
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
         """Get user by ID."""
@@ -65,10 +72,14 @@ class UserService:
         try:
             db.commit()
             db.refresh(user)
-            return user
         except IntegrityError:
             db.rollback()
             raise HTTPException(status_code=400, detail="Username or email already taken")
+        
+        if user_data.username is not None:
+            # Usernames are part of every timeline entry of the user's posts
+            redis_service.bump_timeline_generation()
+        return user
     
     @staticmethod
     def create_access_token_for_user(user: User) -> str:
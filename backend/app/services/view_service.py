@@ -0,0 +1,122 @@
+import hashlib
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.redis import redis_service
+from app.models.post import Post, PostStats
+from typing import Dict, List, Optional
+
+# A sketch that expired and restarted must not lower the unique count, and
+# concurrent flushes of a new post must not collide on inserting its row.
+_UPSERT_POST_STATS = text("""
+    INSERT INTO post_stats (post_id, unique_views, total_views, updated_at)
+    VALUES (:post_id, :unique_views, :total_views, CURRENT_TIMESTAMP)
+    ON CONFLICT (post_id) DO UPDATE SET
+        unique_views = CASE WHEN excluded.unique_views > post_stats.unique_views
+            THEN excluded.unique_views ELSE post_stats.unique_views END,
+        total_views = post_stats.total_views + excluded.total_views,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+
+def anonymous_viewer_id(client_host: Optional[str], user_agent: Optional[str]) -> str:
+    """Identify an unauthenticated viewer without storing their address."""
+    fingerprint = f"{client_host or ''}|{user_agent or ''}".encode()
+    return "anon:" + hashlib.sha1(fingerprint).hexdigest()[:16]
+
+
+class ViewService:
+    @staticmethod
+    def record_impressions(post_ids: List[int], viewer: str) -> bool:
+        """Count an impression of posts in Redis; SQL is only written by flush_views."""
+        return redis_service.record_views(
+            post_ids, viewer, settings.VIEW_COUNTER_SHARDS, settings.VIEW_HLL_TTL_SECONDS
+        )
+    
+    @staticmethod
+    def get_views(db: Session, post_ids: List[int]) -> Dict[int, int]:
+        """Get unique view counts, preferring live Redis estimates over flushed stats."""
+        if not post_ids:
+            return {}
+        
+        views = redis_service.get_unique_views(post_ids) or {}
+        # Posts whose sketch expired, or everything when Redis is unavailable
+        missing = [post_id for post_id in post_ids if not views.get(post_id)]
+        if missing:
+            rows = db.query(PostStats.post_id, PostStats.unique_views)\
+                .filter(PostStats.post_id.in_(missing))\
+                .all()
+            for post_id, unique_views in rows:
+                views[post_id] = max(views.get(post_id, 0), unique_views)
+        return {post_id: views.get(post_id, 0) for post_id in post_ids}
+    
+    @staticmethod
+    def flush_views(db: Session) -> int:
+        """Move buffered view counts from Redis into post_stats in batches.
+        
+        One worker flushes at a time, holding a Redis lock: raw counters are
+        read, written to SQL and only then decremented by the amounts read, so
+        a concurrent flush would count the same impressions twice. Posts
+        viewed again during the flush wait for the next run.
+        """
+        token = redis_service.acquire_lock("flush_views", settings.VIEW_FLUSH_INTERVAL_SECONDS)
+        if token is None:
+            return 0
+        try:
+            batches = -(-redis_service.count_dirty_views() // settings.VIEW_FLUSH_BATCH_SIZE)
+            flushed = 0
+            for _ in range(batches):
+                post_ids = redis_service.pop_dirty_views(settings.VIEW_FLUSH_BATCH_SIZE)
+                if not post_ids:
+                    break
+                flushed += ViewService._flush_batch(db, post_ids)
+            return flushed
+        finally:
+            redis_service.release_lock("flush_views", token)
+    
+    @staticmethod
+    def _flush_batch(db: Session, post_ids: List[int]) -> int:
+        """Write the buffered views of popped posts, marking them dirty again on failure."""
+        try:
+            unique_views = redis_service.get_unique_views(post_ids)
+            raw_views = redis_service.read_raw_views(post_ids, settings.VIEW_COUNTER_SHARDS)
+            if unique_views is None or raw_views is None:
+                raise RuntimeError("Redis unavailable")
+            
+            totals = dict.fromkeys(post_ids, 0)
+            for shard_counts in raw_views:
+                for post_id, count in shard_counts.items():
+                    totals[post_id] += count
+            # Skip posts deleted since they were viewed
+            existing_ids = {
+                post_id for post_id, in db.query(Post.id).filter(Post.id.in_(post_ids)).all()
+            }
+            if existing_ids:
+                db.execute(_UPSERT_POST_STATS, [
+                    {
+                        "post_id": post_id,
+                        "unique_views": unique_views.get(post_id, 0),
+                        "total_views": totals[post_id]
+                    }
+                    for post_id in existing_ids
+                ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            redis_service.restore_dirty_views(post_ids)
+            raise
+        
+        # If this fails the counts stay in Redis and are flushed again with
+        # the post's next impression: an overcount, but never a loss
+        redis_service.release_raw_views(raw_views)
+        return len(existing_ids)
+
+
+def flush_views_job() -> int:
+    """Periodic task entry point for flush_views."""
+    db = SessionLocal()
+    try:
+        return ViewService.flush_views(db)
+    finally:
+        db.close()
\ No newline at end of file
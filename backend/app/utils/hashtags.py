@@ -0,0 +1,39 @@
+import re
+import unicodedata
+from typing import Optional, Set
+
+MAX_TAG_LENGTH = 64
+MAX_TAGS_PER_POST = 30
+
+_HASHTAG_RE = re.compile(r"#(\w+)", re.UNICODE)
+
+# A pictographic emoji, optionally with a variation selector or skin tone,
+# joined with further emoji by zero-width joiners (e.g. 🚶‍♀️)
+_EMOJI_CHAR = "[\U0001F000-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF]"
+_EMOJI_MODIFIERS = "[\uFE0F\U0001F3FB-\U0001F3FF]*"
+_EMOJI_RE = re.compile(
+    f"{_EMOJI_CHAR}{_EMOJI_MODIFIERS}(?:\u200D{_EMOJI_CHAR}{_EMOJI_MODIFIERS})*"
+)
+
+
+def normalize_tag(tag: str) -> Optional[str]:
+    """Normalize a hashtag or emoji so variants map to the same tag."""
+    tag = unicodedata.normalize("NFKC", tag.strip().lstrip("#")).casefold()
+    # Emoji are stored without the presentation selector
+    tag = tag.replace("\uFE0F", "")
+    if not tag or len(tag) > MAX_TAG_LENGTH:
+        return None
+    return tag
+
+
+def extract_tags(caption: Optional[str]) -> Set[str]:
+    """Extract normalized hashtags and emoji tags from a caption."""
+    if not caption:
+        return set()
+    
+    tags = []
+    for raw_tag in _HASHTAG_RE.findall(caption) + _EMOJI_RE.findall(caption):
+        tag = normalize_tag(raw_tag)
+        if tag and tag not in tags:
+            tags.append(tag)
+    return set(tags[:MAX_TAGS_PER_POST])
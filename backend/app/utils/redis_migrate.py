@@ -0,0 +1,104 @@
+import argparse
+import re
+from typing import Iterator, List
+from app.core.config import settings
+from app.core.redis import redis_service, post_counter_fields, COUNTER_LAYOUTS
+
+DEFAULT_SCAN_COUNT = 1000
+DEFAULT_PIPELINE_SIZE = 500
+
+_HASH_KEY = re.compile(r"^post:(\d+)$")
+_BUCKET_KEY = re.compile(r"^postc:\d+$")
+_BUCKET_FIELD = re.compile(r"^(\d+):[ls]$")
+
+
+def _scan_post_ids(layout: str, scan_count: int) -> Iterator[List[int]]:
+    """Yield batches of post ids that have counters in a layout."""
+    if layout == "hash":
+        for keys in _scan_batches("post:*", scan_count):
+            yield [int(match.group(1)) for match in map(_HASH_KEY.match, keys) if match]
+    else:
+        for keys in _scan_batches("postc:*", scan_count):
+            pipe = redis_service.client.pipeline(transaction=False)
+            buckets = [key for key in keys if _BUCKET_KEY.match(key)]
+            for key in buckets:
+                pipe.hkeys(key)
+            post_ids = set()
+            for fields in pipe.execute():
+                post_ids.update(int(match.group(1)) for match in map(_BUCKET_FIELD.match, fields) if match)
+            yield sorted(post_ids)
+
+
+def _scan_batches(pattern: str, scan_count: int) -> Iterator[list]:
+    """Yield batches of keys matching a pattern from an incremental SCAN."""
+    cursor = 0
+    while True:
+        cursor, keys = redis_service.client.scan(cursor=cursor, match=pattern, count=scan_count)
+        if keys:
+            yield keys
+        if cursor == 0:
+            return
+
+
+def migrate_post_counters(
+    source_layout: str,
+    target_layout: str = None,
+    source_bucket_size: int = None,
+    target_bucket_size: int = None,
+    scan_count: int = DEFAULT_SCAN_COUNT,
+    pipeline_size: int = DEFAULT_PIPELINE_SIZE
+) -> int:
+    """Move post counters from one layout to another.
+    
+    Switch REDIS_COUNTER_LAYOUT first, then run the migration: counters are
+    added to whatever the app already wrote in the new layout, and each post
+    moves atomically, so the migration can be interrupted and re-run.
+    Returns the number of posts moved.
+    """
+    target_layout = target_layout or settings.REDIS_COUNTER_LAYOUT
+    source_bucket_size = source_bucket_size or settings.REDIS_COUNTER_BUCKET_SIZE
+    target_bucket_size = target_bucket_size or settings.REDIS_COUNTER_BUCKET_SIZE
+    for layout in (source_layout, target_layout):
+        if layout not in COUNTER_LAYOUTS:
+            raise ValueError(f"Unknown counter layout: {layout}")
+    
+    moved = 0
+    moves = []
+    for post_ids in _scan_post_ids(source_layout, scan_count):
+        for post_id in post_ids:
+            source = post_counter_fields(post_id, source_layout, source_bucket_size)
+            target = post_counter_fields(post_id, target_layout, target_bucket_size)
+            # Posts that land in the same place in both layouts stay put
+            if source != target:
+                moves.append((post_id, source, target))
+        if len(moves) >= pipeline_size:
+            moved += redis_service.move_post_counters(moves)
+            moves = []
+    if moves:
+        moved += redis_service.move_post_counters(moves)
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move post counters between Redis layouts")
+    parser.add_argument("--from", dest="source", choices=COUNTER_LAYOUTS, required=True,
+                        help="layout the counters are currently stored in")
+    parser.add_argument("--to", dest="target", choices=COUNTER_LAYOUTS, default=settings.REDIS_COUNTER_LAYOUT,
+                        help="layout to move the counters to (default: REDIS_COUNTER_LAYOUT)")
+    parser.add_argument("--from-bucket-size", type=int, default=settings.REDIS_COUNTER_BUCKET_SIZE)
+    parser.add_argument("--to-bucket-size", type=int, default=settings.REDIS_COUNTER_BUCKET_SIZE)
+    parser.add_argument("--scan-count", type=int, default=DEFAULT_SCAN_COUNT)
+    parser.add_argument("--pipeline-size", type=int, default=DEFAULT_PIPELINE_SIZE)
+    args = parser.parse_args()
+    redis_service.use_batch_client()
+    
+    print(f"🔄 Moving post counters from {args.source} to {args.target} layout...")
+    moved = migrate_post_counters(
+        args.source, args.target, args.from_bucket_size, args.to_bucket_size,
+        args.scan_count, args.pipeline_size
+    )
+    print(f"✅ Moved counters of {moved} posts")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,249 @@
+import argparse
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Set
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import record_reconcile
+from app.core.redis import redis_service
+from app.models.post import Post, Like, Share
+from app.models.user import User
+
+REPORT_KEY = "reconcile:last_report"
+LOCK_NAME = "reconcile"
+
+
+class WriteLimiter:
+    """Token bucket that caps repair writes per second."""
+    
+    def __init__(self, max_per_second: int):
+        self.max_per_second = max_per_second
+        self._allowance = float(max_per_second)
+        self._last = time.monotonic()
+    
+    def acquire(self, writes: int) -> None:
+        if self.max_per_second <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._allowance = min(
+                self.max_per_second, self._allowance + (now - self._last) * self.max_per_second
+            )
+            self._last = now
+            if self._allowance >= min(writes, self.max_per_second):
+                self._allowance -= writes
+                return
+            time.sleep((writes - self._allowance) / self.max_per_second)
+
+
+class DriftReport:
+    """Drift found (and repaired) by one reconciliation run."""
+    
+    FIELDS = (
+        "posts_checked", "redis_counters_missing",
+        "redis_likes_drift", "redis_shares_drift",
+        "sql_likes_drift", "sql_shares_drift",
+        "users_checked", "user_likes_missing", "user_likes_extra",
+        "redis_repairs", "sql_repairs",
+    )
+    
+    def __init__(self):
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+        # Sum of |expected - actual| over all drifting counters
+        self.absolute_drift = 0
+    
+    def add(self, field: str, amount: int = 1) -> None:
+        self.counts[field] += amount
+    
+    def as_dict(self) -> dict:
+        return {**self.counts, "absolute_drift": self.absolute_drift}
+
+
+_LIKES_COUNT = select(func.count(Like.id)).where(Like.post_id == Post.id).scalar_subquery()
+_SHARES_COUNT = select(func.count(Share.id)).where(Share.post_id == Post.id).scalar_subquery()
+
+
+def _count_by_post(db: Session, model, first_id: int, last_id: int) -> Dict[int, int]:
+    """Aggregate rows of likes or shares per post for a range of post ids."""
+    rows = db.query(model.post_id, func.count(model.id))\
+        .filter(model.post_id.between(first_id, last_id))\
+        .group_by(model.post_id)\
+        .all()
+    return dict(rows)
+
+
+def reconcile_post_counters(db: Session, report: DriftReport, limiter: WriteLimiter,
+                            chunk_size: int, dry_run: bool = False) -> None:
+    """Compare posts' SQL and Redis counters against Like/Share aggregates and repair them."""
+    last_id = 0
+    while True:
+        posts = db.query(Post.id, Post.likes_count, Post.shares_count)\
+            .filter(Post.id > last_id)\
+            .order_by(Post.id)\
+            .limit(chunk_size)\
+            .all()
+        if not posts:
+            return
+        first_id, last_id = posts[0].id, posts[-1].id
+        
+        likes = _count_by_post(db, Like, first_id, last_id)
+        shares = _count_by_post(db, Share, first_id, last_id)
+        redis_counts = redis_service.get_post_counts_bulk([post.id for post in posts])
+        if redis_counts is None:
+            raise RuntimeError("Redis is unavailable")
+        
+        redis_repairs = []
+        sql_repairs = []
+        for post in posts:
+            expected = {"likes": likes.get(post.id, 0), "shares": shares.get(post.id, 0)}
+            cached = redis_counts.get(post.id)
+            if cached is None:
+                report.add("redis_counters_missing")
+            for field in ("likes", "shares"):
+                actual = None if cached is None else cached[field]
+                if actual != expected[field]:
+                    if actual is not None:
+                        report.add(f"redis_{field}_drift")
+                        report.absolute_drift += abs(actual - expected[field])
+                    redis_repairs.append((post.id, field, actual, expected[field]))
+            
+            drifted = False
+            if post.likes_count != expected["likes"]:
+                report.add("sql_likes_drift")
+                report.absolute_drift += abs((post.likes_count or 0) - expected["likes"])
+                drifted = True
+            if post.shares_count != expected["shares"]:
+                report.add("sql_shares_drift")
+                report.absolute_drift += abs((post.shares_count or 0) - expected["shares"])
+                drifted = True
+            if drifted:
+                sql_repairs.append(post.id)
+        
+        report.add("posts_checked", len(posts))
+        if dry_run:
+            continue
+        
+        if redis_repairs:
+            limiter.acquire(len(redis_repairs))
+            report.add("redis_repairs", redis_service.repair_post_counts(redis_repairs))
+        if sql_repairs:
+            limiter.acquire(len(sql_repairs))
+            # Counted again in the UPDATE, so likes and shares committed since
+            # the chunk was read are not overwritten by the stale aggregates
+            result = db.execute(
+                update(Post)
+                .where(Post.id.in_(sql_repairs))
+                .values(likes_count=_LIKES_COUNT, shares_count=_SHARES_COUNT)
+            )
+            db.commit()
+            report.add("sql_repairs", result.rowcount)
+
+
+def reconcile_user_likes(db: Session, report: DriftReport, limiter: WriteLimiter,
+                         chunk_size: int, dry_run: bool = False) -> None:
+    """Compare user_likes sets in Redis against Like rows and repair them."""
+    last_id = 0
+    while True:
+        user_ids = [
+            user_id for user_id, in db.query(User.id)
+                .filter(User.id > last_id)
+                .order_by(User.id)
+                .limit(chunk_size)
+                .all()
+        ]
+        if not user_ids:
+            return
+        last_id = user_ids[-1]
+        
+        expected: Dict[int, Set[int]] = defaultdict(set)
+        for user_id, post_id in db.query(Like.user_id, Like.post_id)\
+                .filter(Like.user_id.between(user_ids[0], last_id))\
+                .yield_per(5000):
+            expected[user_id].add(post_id)
+        
+        cached = redis_service.get_user_liked_posts_bulk(user_ids)
+        if cached is None:
+            raise RuntimeError("Redis is unavailable")
+        
+        additions: Dict[int, List[int]] = {}
+        removals: Dict[int, List[int]] = {}
+        for user_id in user_ids:
+            missing = expected[user_id] - cached[user_id]
+            extra = cached[user_id] - expected[user_id]
+            if missing:
+                additions[user_id] = sorted(missing)
+                report.add("user_likes_missing", len(missing))
+            if extra:
+                removals[user_id] = sorted(extra)
+                report.add("user_likes_extra", len(extra))
+        
+        report.add("users_checked", len(user_ids))
+        if dry_run or not (additions or removals):
+            continue
+        
+        writes = len(additions) + len(removals)
+        limiter.acquire(writes)
+        if redis_service.repair_user_likes(additions, removals):
+            report.add("redis_repairs", writes)
+
+
+def reconcile_counters(
+    chunk_size: int = None,
+    max_writes_per_second: int = None,
+    dry_run: bool = False
+) -> DriftReport:
+    """Run a full reconciliation pass and store its drift report in Redis."""
+    chunk_size = chunk_size or settings.RECONCILE_CHUNK_SIZE
+    limiter = WriteLimiter(
+        settings.RECONCILE_MAX_WRITES_PER_SECOND if max_writes_per_second is None else max_writes_per_second
+    )
+    report = DriftReport()
+    started_at = time.monotonic()
+    
+    db = SessionLocal()
+    try:
+        reconcile_post_counters(db, report, limiter, chunk_size, dry_run)
+        reconcile_user_likes(db, report, limiter, chunk_size, dry_run)
+    finally:
+        db.close()
+    
+    record_reconcile(report.as_dict(), dry_run)
+    redis_service.set_cache(REPORT_KEY, {
+        **report.as_dict(),
+        "dry_run": dry_run,
+        "duration_seconds": round(time.monotonic() - started_at, 3),
+        "finished_at": datetime.utcnow().isoformat(),
+    })
+    return report
+
+
+def reconcile_counters_job() -> None:
+    """Periodic task entry point; one worker runs a pass per interval."""
+    # The lock is left to expire so other workers skip the rest of the interval
+    if not redis_service.acquire_lock(LOCK_NAME, max(settings.RECONCILE_INTERVAL_SECONDS - 1, 1)):
+        return
+    report = reconcile_counters()
+    print(f"Counter reconciliation: {report.as_dict()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile Redis and SQL counters against likes and shares")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without repairing it")
+    parser.add_argument("--chunk-size", type=int, default=settings.RECONCILE_CHUNK_SIZE,
+                        help="posts or users compared per round trip")
+    parser.add_argument("--max-writes-per-second", type=int, default=settings.RECONCILE_MAX_WRITES_PER_SECOND,
+                        help="repair write budget, 0 for unlimited")
+    args = parser.parse_args()
+    redis_service.use_batch_client()
+    
+    print("🔍 Reconciling counters...")
+    report = reconcile_counters(args.chunk_size, args.max_writes_per_second, args.dry_run)
+    for field, value in report.as_dict().items():
+        print(f"  {field}: {value}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,58 +1,217 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import SessionLocal
 from app.core.redis import redis_service
-from app.models.post import Post, Like, Share
-from app.models.user import User
+from app.models.post import Post, Like
 
+# Rows fetched per database round trip and commands sent per Redis pipeline
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_PIPELINE_SIZE = 2000
 
-def sync_post_counters_to_redis(db: Session):
-    """Sync post like/share counters from database to Redis."""
-    posts = db.query(Post).all()
-    synced_count = 0
+WATERMARK_KEY = "sync:watermark"
+# Rows committed just before a sync started may carry an older timestamp
+WATERMARK_OVERLAP = timedelta(minutes=1)
+
+
+class SyncProgress:
+    """Thread-safe row counter that reports throughput while a sync runs."""
+    
+    def __init__(self, name: str, report_every: int = 50000):
+        self.name = name
+        self.report_every = report_every
+        self.rows = 0
+        self.started_at = time.monotonic()
+        self._next_report = report_every
+        self._lock = threading.Lock()
     
-    for post in posts:
-        redis_service.set_post_counts(post.id, post.likes_count, post.shares_count)
-        synced_count += 1
+    def add(self, rows: int) -> None:
+        with self._lock:
+            self.rows += rows
+            if self.rows >= self._next_report:
+                self._next_report += self.report_every
+                print(f"   {self.name}: {self.rows} rows ({self.rate:.0f} rows/s)")
     
-    print(f"✅ Synced {synced_count} post counters to Redis")
-    return synced_count
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+    
+    @property
+    def rate(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _id_ranges(db: Session, id_column, workers: int) -> List[Tuple[int, int]]:
+    """Split the id space of a table into contiguous ranges, one per worker."""
+    min_id, max_id = db.query(func.min(id_column), func.max(id_column)).one()
+    if min_id is None:
+        return []
+    step = max((max_id - min_id + 1) // workers + 1, 1)
+    return [(start, min(start + step - 1, max_id)) for start in range(min_id, max_id + 1, step)]
+
 
+def _stream_to_redis(query, write: Callable[[list], bool], pipeline_size: int, progress: SyncProgress) -> int:
+    """Stream query rows into Redis, one pipeline per pipeline_size rows."""
+    synced = 0
+    chunk = []
+    for row in query:
+        chunk.append(tuple(row))
+        if len(chunk) >= pipeline_size:
+            if not write(chunk):
+                raise RuntimeError("Redis pipeline failed")
+            synced += len(chunk)
+            progress.add(len(chunk))
+            chunk = []
+    if chunk:
+        if not write(chunk):
+            raise RuntimeError("Redis pipeline failed")
+        synced += len(chunk)
+        progress.add(len(chunk))
+    return synced
 
-def sync_user_likes_to_redis(db: Session):
-    """Sync user likes from database to Redis."""
-    likes = db.query(Like).all()
-    synced_count = 0
+
+def sync_post_counters_to_redis(
+    db: Session,
+    id_range: Optional[Tuple[int, int]] = None,
+    since: Optional[datetime] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pipeline_size: int = DEFAULT_PIPELINE_SIZE,
+    progress: Optional[SyncProgress] = None
+) -> int:
+    """Sync post like/share counters from database to Redis."""
+    query = db.query(Post.id, Post.likes_count, Post.shares_count)
+    if id_range:
+        query = query.filter(Post.id.between(*id_range))
+    if since:
+        query = query.filter(or_(Post.created_at >= since, Post.updated_at >= since))
+    query = query.order_by(Post.id).yield_per(batch_size)
     
-    for like in likes:
-        redis_service.add_user_like(like.user_id, like.post_id)
-        synced_count += 1
+    return _stream_to_redis(
+        query, redis_service.set_post_counts_bulk, pipeline_size,
+        progress or SyncProgress("post counters")
+    )
+
+
+def sync_user_likes_to_redis(
+    db: Session,
+    id_range: Optional[Tuple[int, int]] = None,
+    since: Optional[datetime] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pipeline_size: int = DEFAULT_PIPELINE_SIZE,
+    progress: Optional[SyncProgress] = None
+) -> int:
+    """Sync user likes from database to Redis.
     
-    print(f"✅ Synced {synced_count} user likes to Redis")
-    return synced_count
+    Likes deleted since the watermark are not removed by an incremental
+    sync; the reconciliation job repairs those.
+    """
+    query = db.query(Like.user_id, Like.post_id)
+    if id_range:
+        query = query.filter(Like.id.between(*id_range))
+    if since:
+        query = query.filter(Like.created_at >= since)
+    query = query.order_by(Like.id).yield_per(batch_size)
+    
+    return _stream_to_redis(
+        query, redis_service.add_user_likes_bulk, pipeline_size,
+        progress or SyncProgress("user likes")
+    )
 
 
-def sync_all_data_to_redis():
-    """Sync all relevant data from database to Redis."""
-    db = next(get_db())
+def _sync_table(sync_func, id_column, name: str, workers: int, **kwargs) -> int:
+    """Run a table sync, optionally split across workers by id range."""
+    progress = SyncProgress(name)
+    db = SessionLocal()
+    try:
+        if workers <= 1:
+            synced = sync_func(db, progress=progress, **kwargs)
+        else:
+            ranges = _id_ranges(db, id_column, workers)
+            
+            def run(id_range):
+                worker_db = SessionLocal()
+                try:
+                    return sync_func(worker_db, id_range=id_range, progress=progress, **kwargs)
+                finally:
+                    worker_db.close()
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                synced = sum(executor.map(run, ranges))
+    finally:
+        db.close()
+    
+    print(f"✅ Synced {synced} {name} in {progress.elapsed:.1f}s ({progress.rate:.0f} rows/s)")
+    return synced
+
+
+def get_sync_watermark() -> Optional[datetime]:
+    """Get the start time of the last successful sync."""
+    watermark = redis_service.get_cache(WATERMARK_KEY)
+    return datetime.fromisoformat(watermark) if watermark else None
+
+
+def sync_all_data_to_redis(
+    incremental: bool = False,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pipeline_size: int = DEFAULT_PIPELINE_SIZE
+):
+    """Sync all relevant data from database to Redis.
+    
+    An incremental sync only streams rows created or updated since the
+    watermark stored by the previous successful sync, and falls back to a
+    full sync when there is none.
+    """
+    started_at = datetime.utcnow()
+    since = get_sync_watermark() if incremental else None
+    if incremental and since is None:
+        print("ℹ️  No sync watermark found, running a full sync")
     
     try:
-        print("🔄 Starting Redis sync...")
+        print(f"🔄 Starting {'incremental' if since else 'full'} Redis sync...")
+        options = {"since": since, "batch_size": batch_size, "pipeline_size": pipeline_size}
         
         # Sync post counters
-        post_count = sync_post_counters_to_redis(db)
+        post_count = _sync_table(sync_post_counters_to_redis, Post.id, "post counters", workers, **options)
         
         # Sync user likes
-        likes_count = sync_user_likes_to_redis(db)
+        likes_count = _sync_table(sync_user_likes_to_redis, Like.id, "user likes", workers, **options)
         
+        redis_service.set_cache(WATERMARK_KEY, (started_at - WATERMARK_OVERLAP).isoformat())
         print(f"✅ Redis sync completed! Posts: {post_count}, Likes: {likes_count}")
         return True
-        
+    
     except Exception as e:
         print(f"❌ Redis sync failed: {e}")
         return False
-    finally:
-        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync database counters and likes to Redis")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only sync rows changed since the last successful sync")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parallel workers, each syncing a range of ids")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="rows fetched per database round trip")
+    parser.add_argument("--pipeline-size", type=int, default=DEFAULT_PIPELINE_SIZE,
+                        help="commands per Redis pipeline")
+    args = parser.parse_args()
+    redis_service.use_batch_client()
+    
+    ok = sync_all_data_to_redis(
+        incremental=args.incremental,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        pipeline_size=args.pipeline_size
+    )
+    raise SystemExit(0 if ok else 1)
 
 
 if __name__ == "__main__":
-    sync_all_data_to_redis() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import argparse
+from sqlalchemy.exc import IntegrityError
+from app.core.database import SessionLocal
+from app.core.redis import redis_service
+from app.models.post import Post
+from app.services.tag_service import TagService
+
+LOCK_NAME = "tag_backfill"
+LOCK_SECONDS = 3600
+
+
+def backfill_post_tags(batch_size: int = 1000, after_id: int = 0) -> int:
+    """Index the tags of existing posts; safe to run again.
+    
+    Only posts whose caption contains a "#" can have tags, so databases
+    without hashtags are not scanned post by post. Returns the posts synced.
+    """
+    token = redis_service.acquire_lock(LOCK_NAME, LOCK_SECONDS)
+    if token is None and redis_service.available:
+        print("ℹ️  Another tag backfill is running")
+        return 0
+    
+    db = SessionLocal()
+    try:
+        indexed = 0
+        last_id = after_id
+        while True:
+            posts = db.query(Post)\
+                .filter(Post.id > last_id, Post.caption.like("%#%"))\
+                .order_by(Post.id)\
+                .limit(batch_size)\
+                .all()
+            if not posts:
+                break
+            last_id = posts[-1].id
+            try:
+                for post in posts:
+                    TagService.sync_post_tags(db, post)
+                db.commit()
+                indexed += len(posts)
+            except IntegrityError as e:
+                # A post edited meanwhile already got its tags from the request
+                db.rollback()
+                print(f"⚠️  Skipped posts up to {last_id}: {e.orig}")
+        return indexed
+    finally:
+        db.close()
+        if token is not None:
+            redis_service.release_lock(LOCK_NAME, token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index hashtags of posts created before tags existed")
+    parser.add_argument("--batch-size", type=int, default=1000, help="posts synced per commit")
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this post id")
+    args = parser.parse_args()
+    redis_service.use_batch_client()
+    
+    print("🏷️ Backfilling post tags...")
+    indexed = backfill_post_tags(args.batch_size, args.after_id)
+    print(f"✅ Synced tags of {indexed} posts")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Reproducible load test of the API hot paths
+Runs the app in process against a scratch SQLite database (or --database-url)
+and fakeredis (or --redis-url), seeds users and posts through the API, then
+drives each scenario with concurrent clients and reports RPS and p50/p95/p99
+latency. Results are saved as JSON so runs on two commits can be compared:
+
+    python benchmarks/api_load.py --concurrency 32 --duration 10
+    python benchmarks/api_load.py --compare benchmarks/results/<previous>.json
+
+Requests skip the HTTP server and network, so the numbers compare commits
+on one machine rather than predict production capacity.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from PIL import Image
+from benchmarks.login_throughput import percentile
+
+API = "/api/v1"
+PASSWORD = "benchmark-password"
+SCENARIOS = ("timeline", "like", "share", "upload", "login")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def configure_environment(args, scratch_dir: str) -> None:
+    """Point the app at scratch storage; must run before app modules are imported."""
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(scratch_dir, 'benchmark.db')}"
+    os.environ["UPLOAD_DIR"] = os.path.join(scratch_dir, "uploads")
+    os.environ["PASSWORD_BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+        return
+    
+    import fakeredis
+    from app.core.redis import redis_service
+    redis_service._redis_client = fakeredis.FakeRedis(decode_responses=True)
+
+
+def jpeg_bytes(size: int = 64) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (120, 80, 200)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class Scenario:
+    """One kind of request, issued with the token of the client sending it."""
+    
+    def __init__(self, name: str, fixtures: dict, rng: random.Random):
+        self.name = name
+        self.fixtures = fixtures
+        self.rng = rng
+    
+    def request(self, client: httpx.AsyncClient, token: str):
+        headers = {"Authorization": f"Bearer {token}"}
+        if self.name == "timeline":
+            page = self.rng.randint(1, self.fixtures["timeline_pages"])
+            return client.get(f"{API}/posts/timeline?page={page}", headers={**headers, "Accept-Encoding": "gzip"})
+        if self.name in ("like", "share"):
+            # Popular posts get most of the engagement, as on the real feed
+            post_id = self.rng.choices(self.fixtures["post_ids"], cum_weights=self.fixtures["post_weights"])[0]
+            return client.post(f"{API}/posts/{post_id}/{self.name}", headers=headers)
+        if self.name == "upload":
+            return client.post(
+                f"{API}/posts/", headers=headers,
+                files={"image": ("benchmark.jpg", self.fixtures["image"], "image/jpeg")},
+                data={"caption": "Load test upload #benchmark"}
+            )
+        return client.post(f"{API}/auth/login", data={
+            "username": self.rng.choice(self.fixtures["usernames"]), "password": PASSWORD
+        })
+
+
+async def seed(client: httpx.AsyncClient, users: int, posts: int, per_page: int) -> dict:
+    """Register users and upload posts through the API; returns what the scenarios need."""
+    usernames = [f"bench_load_{i}" for i in range(users)]
+    tokens = []
+    for username in usernames:
+        await client.post(f"{API}/auth/register", json={
+            "username": username, "email": f"{username}@example.com", "password": PASSWORD
+        })
+        response = await client.post(f"{API}/auth/login", data={"username": username, "password": PASSWORD})
+        response.raise_for_status()
+        tokens.append(response.json()["access_token"])
+    
+    image = jpeg_bytes()
+    post_ids = []
+    for i in range(posts):
+        response = await client.post(
+            f"{API}/posts/", headers={"Authorization": f"Bearer {tokens[i % users]}"},
+            files={"image": ("seed.jpg", image, "image/jpeg")}, data={"caption": f"Seed post {i} #benchmark"}
+        )
+        response.raise_for_status()
+        post_ids.append(response.json()["id"])
+    
+    # Cumulative 1/rank weights, newest post first
+    post_ids.reverse()
+    weights, total = [], 0.0
+    for rank in range(1, len(post_ids) + 1):
+        total += 1 / rank
+        weights.append(total)
+    return {
+        "usernames": usernames,
+        "tokens": tokens,
+        "post_ids": post_ids,
+        "post_weights": weights,
+        "image": image,
+        "timeline_pages": max(1, min(5, posts // per_page))
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, tokens: list, concurrency: int,
+                       warmup: float, duration: float) -> dict:
+    latencies, statuses = [], {}
+    
+    async def worker(index: int, deadline: float, record: bool) -> None:
+        token = tokens[index % len(tokens)]
+        while time.monotonic() < deadline:
+            started_at = time.perf_counter()
+            try:
+                status = (await scenario.request(client, token)).status_code
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started_at
+            if record:
+                latencies.append(elapsed)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+    
+    if warmup > 0:
+        deadline = time.monotonic() + warmup
+        await asyncio.gather(*(worker(i, deadline, False) for i in range(concurrency)))
+    
+    started_at = time.monotonic()
+    await asyncio.gather(*(worker(i, started_at + duration, True) for i in range(concurrency)))
+    elapsed = time.monotonic() - started_at
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0
+    }
+
+
+async def run_benchmark(args) -> dict:
+    from app.main import app
+    
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            fixtures = await seed(client, args.users, args.posts, 20)
+            results = {}
+            for name in args.scenarios:
+                scenario = Scenario(name, fixtures, rng)
+                results[name] = await run_scenario(
+                    client, scenario, fixtures["tokens"], args.concurrency, args.warmup, args.duration
+                )
+                if not args.json:
+                    print_scenario(name, results[name])
+    return results
+
+
+def print_scenario(name: str, result: dict) -> None:
+    errors = f", {result['errors']} errors {result['statuses']}" if result["errors"] else ""
+    print(
+        f"  {name:<9} {result['rps']:>8} req/s  p50 {result['p50_ms']:>7} ms  p95 {result['p95_ms']:>7} ms  "
+        f"p99 {result['p99_ms']:>7} ms  ({result['requests']} requests{errors})"
+    )
+
+
+def compare(current: dict, previous: dict, threshold: float) -> list:
+    """Print changes against a previous run; returns the scenarios that regressed."""
+    regressions = []
+    print(f"📊 Compared with {previous.get('commit', 'unknown')} ({previous.get('created_at', '?')})")
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            print(f"  {name:<9} no previous result")
+            continue
+        changes = []
+        regressed = False
+        for metric, higher_is_better in (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False)):
+            if not before[metric]:
+                continue
+            change = (result[metric] - before[metric]) / before[metric]
+            changes.append(f"{metric} {change:+.1%}")
+            if (-change if higher_is_better else change) > threshold:
+                regressed = True
+        print(f"  {name:<9} {', '.join(changes)}{'  ⚠️ regression' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API hot paths against local storage")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients per scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12, help="cost of the seeded password hashes")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for request choices")
+    parser.add_argument("--database-url", help="empty database to use instead of a scratch SQLite file")
+    parser.add_argument("--redis-url", help="Redis to use instead of fakeredis; it should be empty")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/api_load-<commit>.json)")
+    parser.add_argument("--compare", help="previous results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="change that counts as a regression")
+    parser.add_argument("--json", action="store_true", help="print machine readable output")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(prefix="vistagram-benchmark-") as scratch_dir:
+        configure_environment(args, scratch_dir)
+        if not args.json:
+            print(
+                f"🚀 {', '.join(args.scenarios)}: {args.concurrency} clients, {args.duration:.0f}s each, "
+                f"{args.users} users, {args.posts} posts"
+            )
+        scenarios = asyncio.run(run_benchmark(args))
+    
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            key: value for key, value in vars(args).items() if key not in ("output", "compare", "json")
+        },
+        "database": "custom" if args.database_url else "sqlite",
+        "redis": "custom" if args.redis_url else "fakeredis",
+        "scenarios": scenarios
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"api_load-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"💾 Saved {output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if compare(report, previous, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the Redis cache codecs on real timeline pages
+Encodes and decodes pages built from the database and reports time per
+page and payload size for each available codec:
+
+    python benchmarks/cache_codecs.py --per-page 100 --iterations 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+from itertools import cycle, islice
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import desc
+from app.core.cache_codec import available_codecs, get_codec, decode_cached
+from app.core.database import SessionLocal
+from app.models.post import Post
+from app.models.user import User
+from app.schemas.post import PostResponse
+from app.utils.file_upload import get_image_url
+
+
+def load_timeline_page(per_page: int) -> list:
+    """Build a timeline page shaped like PostService.get_timeline output."""
+    db = SessionLocal()
+    try:
+        rows = db.query(Post, User.username)\
+            .join(User, Post.user_id == User.id)\
+            .order_by(desc(Post.created_at))\
+            .limit(per_page)\
+            .all()
+    finally:
+        db.close()
+    if not rows:
+        print("❌ No posts found, seed the database first: python seed_data.py")
+        raise SystemExit(1)
+    
+    # Small databases repeat their posts to fill the page
+    return [
+        {
+            "id": post.id,
+            "username": username,
+            "image_url": get_image_url(post.image_path),
+            "caption": post.caption,
+            "likes_count": post.likes_count,
+            "shares_count": post.shares_count,
+            "views": 0,
+            "created_at": post.created_at,
+            "is_liked": False
+        }
+        for post, username in islice(cycle(rows), per_page)
+    ]
+
+
+def per_call_us(func, iterations: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started_at) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cache codecs on timeline pages")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    
+    page = load_timeline_page(args.per_page)
+    print(f"📦 Timeline page of {len(page)} posts, {args.iterations} iterations")
+    print(f"  {'codec':<8} {'bytes':>8} {'encode µs':>10} {'decode µs':>10} {'decode+validate µs':>19}")
+    
+    for name in available_codecs():
+        codec = get_codec(name)
+        data = codec.encode(page)
+        encode = per_call_us(lambda: codec.encode(page), args.iterations)
+        decode = per_call_us(lambda: decode_cached(data), args.iterations)
+        # What a cache hit costs before it can be served as PostResponse models
+        validate = per_call_us(
+            lambda: [PostResponse.model_validate(post) for post in decode_cached(data)], args.iterations
+        )
+        print(f"  {name:<8} {len(data):>8} {encode:>10.1f} {decode:>10.1f} {validate:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
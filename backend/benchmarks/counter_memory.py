@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the Redis post counter layouts
+Writes the same counters in the hash and bucketed layouts to an empty
+scratch database and compares used_memory:
+
+    python benchmarks/counter_memory.py --posts 1000000 --db 15
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import redis
+from app.core.config import settings
+from app.core.redis import post_counter_fields
+
+
+def used_memory(client) -> int:
+    return client.info("memory")["used_memory"]
+
+
+def write_counters(client, layout: str, posts: int, bucket_size: int, pipeline_size: int) -> None:
+    """Write counters for posts 1..posts the way set_post_counts_bulk does."""
+    rng = random.Random(42)
+    pipe = client.pipeline(transaction=False)
+    mappings = {}
+    for post_id in range(1, posts + 1):
+        key, likes_field, shares_field = post_counter_fields(post_id, layout, bucket_size)
+        mapping = mappings.setdefault(key, {})
+        mapping[likes_field] = rng.randint(0, 5000)
+        mapping[shares_field] = rng.randint(0, 500)
+        if len(mappings) >= pipeline_size:
+            for key, mapping in mappings.items():
+                pipe.hset(key, mapping=mapping)
+            pipe.execute()
+            mappings = {}
+    for key, mapping in mappings.items():
+        pipe.hset(key, mapping=mapping)
+    pipe.execute()
+
+
+def measure(client, layout: str, posts: int, bucket_size: int, pipeline_size: int) -> dict:
+    client.flushdb()
+    before = used_memory(client)
+    write_counters(client, layout, posts, bucket_size, pipeline_size)
+    used = used_memory(client) - before
+    sample_key = post_counter_fields(1, layout, bucket_size)[0]
+    result = {
+        "layout": layout,
+        "keys": client.dbsize(),
+        "bytes": used,
+        "bytes_per_post": used / posts,
+        "encoding": client.object("encoding", sample_key),
+    }
+    client.flushdb()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory used by the Redis counter layouts")
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--bucket-size", type=int, default=settings.REDIS_COUNTER_BUCKET_SIZE)
+    parser.add_argument("--pipeline-size", type=int, default=1000)
+    parser.add_argument("--redis-url", default=settings.REDIS_URL)
+    parser.add_argument("--db", type=int, default=15, help="scratch database, must be empty")
+    args = parser.parse_args()
+    
+    client = redis.Redis.from_url(args.redis_url, db=args.db, password=settings.REDIS_PASSWORD,
+                                  decode_responses=True)
+    if client.dbsize():
+        print(f"❌ Database {args.db} is not empty, pick an unused one with --db")
+        raise SystemExit(1)
+    
+    max_entries = client.config_get("hash-max-listpack-entries").get("hash-max-listpack-entries")
+    print(f"📦 {args.posts} posts, bucket size {args.bucket_size}, hash-max-listpack-entries {max_entries}")
+    
+    results = [
+        measure(client, layout, args.posts, args.bucket_size, args.pipeline_size)
+        for layout in ("hash", "bucketed")
+    ]
+    for result in results:
+        print(
+            f"  {result['layout']:<9} {result['keys']:>9} keys  {result['bytes'] / 1024 / 1024:>9.2f} MB  "
+            f"{result['bytes_per_post']:>6.1f} B/post  encoding={result['encoding']}"
+        )
+    print(f"💾 Bucketed layout uses {results[1]['bytes'] / results[0]['bytes']:.0%} of the hash layout")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark
+Runs a burst of concurrent logins against a running API while other clients
+read the timeline, and reports login throughput, rejected (429) logins and
+timeline latency during the burst:
+
+    uvicorn app.main:app --workers 1 &
+    python benchmarks/login_throughput.py --concurrency 32 --duration 10
+"""
+
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+
+import httpx
+
+PASSWORD = "benchmark-password"
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def prepare_users(client: httpx.Client, count: int) -> list:
+    """Register benchmark users, reusing them across runs."""
+    usernames = [f"bench_login_{i}" for i in range(count)]
+    for username in usernames:
+        client.post("/auth/register", json={
+            "username": username, "email": f"{username}@example.com", "password": PASSWORD
+        })
+    return usernames
+
+
+def login_worker(base_url: str, usernames: list, deadline: float, results: dict, lock: threading.Lock):
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        while time.monotonic() < deadline:
+            started_at = time.perf_counter()
+            response = client.post("/auth/login", data={
+                "username": random.choice(usernames), "password": PASSWORD
+            })
+            elapsed = time.perf_counter() - started_at
+            with lock:
+                results["statuses"][response.status_code] = results["statuses"].get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    results["login_latencies"].append(elapsed)
+
+
+def timeline_worker(base_url: str, token: str, deadline: float, results: dict, lock: threading.Lock):
+    headers = {"Authorization": f"Bearer {token}"}
+    with httpx.Client(base_url=base_url, timeout=30, headers=headers) as client:
+        while time.monotonic() < deadline:
+            started_at = time.perf_counter()
+            client.get("/posts/timeline")
+            elapsed = time.perf_counter() - started_at
+            with lock:
+                results["timeline_latencies"].append(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure login throughput and timeline latency under a login burst")
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--timeline-clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--json", action="store_true", help="print machine readable output")
+    args = parser.parse_args()
+    
+    with httpx.Client(base_url=args.base_url, timeout=30) as client:
+        usernames = prepare_users(client, args.users)
+        response = client.post("/auth/login", data={"username": usernames[0], "password": PASSWORD})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+    
+    results = {"statuses": {}, "login_latencies": [], "timeline_latencies": []}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=login_worker, args=(args.base_url, usernames, deadline, results, lock))
+        for _ in range(args.concurrency)
+    ] + [
+        threading.Thread(target=timeline_worker, args=(args.base_url, token, deadline, results, lock))
+        for _ in range(args.timeline_clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    logins, timeline = results["login_latencies"], results["timeline_latencies"]
+    summary = {
+        "logins_per_second": round(len(logins) / args.duration, 1),
+        "statuses": results["statuses"],
+        "login_p50_ms": round(percentile(logins, 0.5) * 1000, 1),
+        "login_p95_ms": round(percentile(logins, 0.95) * 1000, 1),
+        "timeline_requests": len(timeline),
+        "timeline_mean_ms": round(statistics.mean(timeline) * 1000, 1) if timeline else 0.0,
+        "timeline_p50_ms": round(percentile(timeline, 0.5) * 1000, 1),
+        "timeline_p95_ms": round(percentile(timeline, 0.95) * 1000, 1),
+        "timeline_p99_ms": round(percentile(timeline, 0.99) * 1000, 1),
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    
+    print(f"🔐 {args.concurrency} login clients, {args.timeline_clients} timeline clients, {args.duration:.0f}s")
+    print(f"  Logins: {summary['logins_per_second']}/s, statuses {summary['statuses']}")
+    print(f"  Login latency: p50 {summary['login_p50_ms']} ms, p95 {summary['login_p95_ms']} ms")
+    print(
+        f"  Timeline latency: p50 {summary['timeline_p50_ms']} ms, p95 {summary['timeline_p95_ms']} ms, "
+        f"p99 {summary['timeline_p99_ms']} ms over {summary['timeline_requests']} requests"
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark of timeline response serialization
+Compares FastAPI's default path (validate against TimelineResponse, dump,
+encode with JSONResponse) with TrustedJSONResponse on a real timeline page:
+
+    python benchmarks/response_serialization.py --per-page 100 --iterations 1000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.core.responses import TrustedJSONResponse
+from app.schemas.post import TimelineResponse
+from benchmarks.cache_codecs import load_timeline_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare timeline response serialization paths")
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    
+    content = {"posts": load_timeline_page(args.per_page), "total": 1000, "page": 1, "per_page": args.per_page}
+    field = create_model_field("Response_get_timeline", TimelineResponse, mode="serialization")
+    loop = asyncio.new_event_loop()
+    
+    def default_path() -> bytes:
+        # What FastAPI does with a dict returned from an endpoint with response_model
+        serialized = loop.run_until_complete(serialize_response(field=field, response_content=content))
+        return JSONResponse(serialized).body
+    
+    def trusted_path() -> bytes:
+        return TrustedJSONResponse(content).body
+    
+    assert default_path().replace(b" ", b"") == trusted_path().replace(b" ", b""), "bodies differ"
+    
+    print(f"📦 Timeline page of {args.per_page} posts, {args.iterations} iterations")
+    results = {}
+    for name, func in (("response_model + JSONResponse", default_path), ("TrustedJSONResponse", trusted_path)):
+        started_at = time.perf_counter()
+        for _ in range(args.iterations):
+            body = func()
+        results[name] = (time.perf_counter() - started_at) / args.iterations * 1e6
+        print(f"  {name:<30} {results[name]:>9.1f} µs/response  {len(body)} bytes")
+    print(f"⚡ Speedup: {results['response_model + JSONResponse'] / results['TrustedJSONResponse']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
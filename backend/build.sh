@@ -14,5 +14,6 @@ mkdir -p uploads
 # Initialize database
 echo "Initializing database..."
 python seed_data.py
+python -m app.utils.tag_backfill
 
 echo "Build completed successfully!" 
\ No newline at end of file
@@ -1,17 +1,71 @@
 #!/usr/bin/env python3
 """
 Redis Manager for Vistagram
-Development utility to manage Redis data
+Command line utility to inspect and manage Redis data
+
+Every command walks the keyspace with incremental SCAN, so it is safe to
+run against a production Redis. Examples:
+
+    python redis_manager.py ping
+    python redis_manager.py stats --depth 2
+    python redis_manager.py memory --samples 200
+    python redis_manager.py bigkeys --top 20
+    python redis_manager.py no-ttl --limit 50
+    python redis_manager.py sync --incremental --workers 4
+    python redis_manager.py migrate-counters --from hash --to bucketed
+    python redis_manager.py flush --yes
 """
 
+import argparse
+import heapq
+import json
+import random
+import re
 import sys
 import os
+import time
 
 # Add the app directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.core.redis import redis_service
 from app.utils.redis_sync import sync_all_data_to_redis
+from app.utils.redis_reconcile import reconcile_counters
+from app.utils.redis_migrate import migrate_post_counters
+from app.core.redis import COUNTER_LAYOUTS
+
+_ID_SEGMENT = re.compile(r"^-?\d+$")
+
+
+def namespace_of(key: str, depth: int = 1) -> str:
+    """Group a key into a namespace pattern, e.g. views:hll:42 -> views:*."""
+    parts = key.split(":")
+    namespace = ["*" if _ID_SEGMENT.match(part) else part for part in parts[:depth]]
+    if len(parts) > depth:
+        namespace.append("*")
+    return ":".join(namespace)
+
+
+def scan_keys(args):
+    """Yield batches of keys from an incremental SCAN."""
+    cursor = 0
+    while True:
+        cursor, keys = redis_service.client.scan(cursor=cursor, match=args.match, count=args.scan_count)
+        if keys:
+            yield keys
+        if cursor == 0:
+            return
+        if args.pause:
+            # Leave room for production traffic between SCAN calls
+            time.sleep(args.pause / 1000)
+
+
+def output(args, data: dict, lines: list):
+    """Print results as JSON for scripts or as readable text."""
+    if args.json:
+        print(json.dumps(data, indent=2, default=str))
+    else:
+        print("\n".join(lines))
 
 
 def check_redis_connection():
@@ -26,107 +80,244 @@ def check_redis_connection():
         return False
 
 
-def flush_redis_data():
-    """Flush all Redis data."""
-    print("⚠️  This will delete ALL Redis data!")
-    confirm = input("Are you sure? (y/N): ").lower()
-    
-    if confirm == 'y':
-        try:
-            redis_service.client.flushdb()
-            print("✅ Redis data flushed successfully")
-        except Exception as e:
-            print(f"❌ Failed to flush Redis: {e}")
-    else:
-        print("🚫 Operation cancelled")
+def cmd_ping(args):
+    return 0 if check_redis_connection() else 1
 
 
-def show_redis_stats():
-    """Show Redis statistics."""
-    if not check_redis_connection():
-        return
+def cmd_stats(args):
+    """Show Redis statistics and key counts per namespace."""
+    info = redis_service.client.info()
+    counts = {}
+    for keys in scan_keys(args):
+        for key in keys:
+            namespace = namespace_of(key, args.depth)
+            counts[namespace] = counts.get(namespace, 0) + 1
     
-    try:
-        info = redis_service.client.info()
-        
-        print("\n📊 Redis Statistics:")
-        print(f"  Memory used: {info.get('used_memory_human', 'N/A')}")
-        print(f"  Connected clients: {info.get('connected_clients', 'N/A')}")
-        print(f"  Total commands processed: {info.get('total_commands_processed', 'N/A')}")
-        print(f"  Uptime: {info.get('uptime_in_seconds', 'N/A')} seconds")
-        
-        # Get key counts
-        total_keys = redis_service.client.dbsize()
-        print(f"  Total keys: {total_keys}")
-        
-        # Get specific pattern counts
-        patterns = [
-            "session:*",
-            "timeline:*", 
-            "post:*",
-            "user_likes:*",
-            "blacklist:*",
-            "user_online:*"
-        ]
-        
-        print("\n🔑 Key Patterns:")
-        for pattern in patterns:
-            count = len(redis_service.client.keys(pattern))
-            print(f"  {pattern}: {count} keys")
-            
-    except Exception as e:
-        print(f"❌ Failed to get Redis stats: {e}")
+    data = {
+        "used_memory_human": info.get("used_memory_human"),
+        "connected_clients": info.get("connected_clients"),
+        "total_commands_processed": info.get("total_commands_processed"),
+        "uptime_in_seconds": info.get("uptime_in_seconds"),
+        "total_keys": redis_service.client.dbsize(),
+        "namespaces": dict(sorted(counts.items(), key=lambda item: item[1], reverse=True)),
+    }
+    lines = [
+        "📊 Redis Statistics:",
+        f"  Memory used: {data['used_memory_human']}",
+        f"  Connected clients: {data['connected_clients']}",
+        f"  Total commands processed: {data['total_commands_processed']}",
+        f"  Uptime: {data['uptime_in_seconds']} seconds",
+        f"  Total keys: {data['total_keys']}",
+        "",
+        "🔑 Key Patterns:",
+    ] + [f"  {namespace}: {count} keys" for namespace, count in data["namespaces"].items()]
+    output(args, data, lines)
+    return 0
+
+
+def cmd_memory(args):
+    """Estimate memory per namespace from MEMORY USAGE of sampled keys."""
+    counts = {}
+    samples = {}
+    for keys in scan_keys(args):
+        for key in keys:
+            namespace = namespace_of(key, args.depth)
+            seen = counts.get(namespace, 0) + 1
+            counts[namespace] = seen
+            # Reservoir sampling keeps a uniform sample of each namespace
+            reservoir = samples.setdefault(namespace, [])
+            if len(reservoir) < args.samples:
+                reservoir.append(key)
+            else:
+                index = random.randrange(seen)
+                if index < args.samples:
+                    reservoir[index] = key
+    
+    estimates = {}
+    for namespace, keys in samples.items():
+        pipe = redis_service.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.memory_usage(key)
+        sizes = [size for size in pipe.execute() if size is not None]
+        average = sum(sizes) / len(sizes) if sizes else 0
+        estimates[namespace] = {
+            "keys": counts[namespace],
+            "sampled": len(sizes),
+            "avg_bytes": round(average),
+            "estimated_bytes": round(average * counts[namespace]),
+        }
+    
+    estimates = dict(sorted(estimates.items(), key=lambda item: item[1]["estimated_bytes"], reverse=True))
+    lines = ["💾 Estimated memory per namespace:"] + [
+        f"  {namespace}: ~{est['estimated_bytes'] / 1024 / 1024:.2f} MB "
+        f"({est['keys']} keys, avg {est['avg_bytes']} B over {est['sampled']} samples)"
+        for namespace, est in estimates.items()
+    ]
+    output(args, estimates, lines)
+    return 0
+
+
+def cmd_bigkeys(args):
+    """List the keys using the most memory."""
+    biggest = []
+    for keys in scan_keys(args):
+        pipe = redis_service.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.memory_usage(key)
+        for key, size in zip(keys, pipe.execute()):
+            if size is None:
+                continue
+            if len(biggest) < args.top:
+                heapq.heappush(biggest, (size, key))
+            elif size > biggest[0][0]:
+                heapq.heapreplace(biggest, (size, key))
+    
+    biggest.sort(reverse=True)
+    pipe = redis_service.client.pipeline(transaction=False)
+    for _, key in biggest:
+        pipe.type(key)
+    types = pipe.execute()
+    
+    data = [{"key": key, "bytes": size, "type": key_type} for (size, key), key_type in zip(biggest, types)]
+    lines = [f"🐘 Top {len(data)} keys by memory:"] + [
+        f"  {entry['bytes']:>12} B  {entry['type']:<8} {entry['key']}" for entry in data
+    ]
+    output(args, data, lines)
+    return 0
 
 
-def sync_data():
+def cmd_no_ttl(args):
+    """Find keys without an expiry."""
+    counts = {}
+    examples = []
+    for keys in scan_keys(args):
+        pipe = redis_service.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        for key, ttl in zip(keys, pipe.execute()):
+            if ttl == -1:
+                namespace = namespace_of(key, args.depth)
+                counts[namespace] = counts.get(namespace, 0) + 1
+                if len(examples) < args.limit:
+                    examples.append(key)
+    
+    data = {
+        "namespaces": dict(sorted(counts.items(), key=lambda item: item[1], reverse=True)),
+        "examples": examples,
+    }
+    lines = ["⏳ Keys without a TTL per namespace:"] + [
+        f"  {namespace}: {count} keys" for namespace, count in data["namespaces"].items()
+    ] + ["", "Examples:"] + [f"  {key}" for key in examples]
+    output(args, data, lines)
+    return 0
+
+
+def cmd_sync(args):
     """Sync database data to Redis."""
     print("🔄 Syncing database data to Redis...")
-    if sync_all_data_to_redis():
+    if sync_all_data_to_redis(incremental=args.incremental, workers=args.workers):
         print("✅ Data sync completed successfully")
+        return 0
     else:
         print("❌ Data sync failed")
+        return 1
 
 
-def show_menu():
-    """Show the main menu."""
-    print("\n" + "="*50)
-    print("🚀 Vistagram Redis Manager")
-    print("="*50)
-    print("1. Check Redis connection")
-    print("2. Show Redis statistics")
-    print("3. Sync database data to Redis") 
-    print("4. Flush all Redis data")
-    print("5. Exit")
-    print("="*50)
+def cmd_reconcile(args):
+    """Reconcile Redis and SQL counters against likes and shares."""
+    report = reconcile_counters(dry_run=args.dry_run)
+    output(args, report.as_dict(), [f"  {field}: {value}" for field, value in report.as_dict().items()])
+    return 0
 
 
-def main():
-    """Main menu loop."""
-    while True:
-        show_menu()
-        choice = input("\nEnter your choice (1-5): ").strip()
-        
-        if choice == '1':
-            check_redis_connection()
-        elif choice == '2':
-            show_redis_stats()
-        elif choice == '3':
-            sync_data()
-        elif choice == '4':
-            flush_redis_data()
-        elif choice == '5':
-            print("👋 Goodbye!")
-            break
-        else:
-            print("❌ Invalid choice. Please enter 1-5.")
-        
-        input("\nPress Enter to continue...")
+def cmd_migrate_counters(args):
+    """Move post counters between the hash and bucketed layouts."""
+    print(f"🔄 Moving post counters from {args.source} to {args.target} layout...")
+    moved = migrate_post_counters(
+        args.source, args.target, args.from_bucket_size, args.to_bucket_size, args.scan_count
+    )
+    print(f"✅ Moved counters of {moved} posts")
+    return 0
+
+
+def cmd_flush(args):
+    """Flush all Redis data."""
+    if not args.yes:
+        print("⚠️  This will delete ALL Redis data! Re-run with --yes to confirm.")
+        return 1
+    try:
+        redis_service.client.flushdb(asynchronous=True)
+        print("✅ Redis data flushed successfully")
+        return 0
+    except Exception as e:
+        print(f"❌ Failed to flush Redis: {e}")
+        return 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="🚀 Vistagram Redis Manager")
+    parser.add_argument("--json", action="store_true", help="print machine readable output")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    scan_options = argparse.ArgumentParser(add_help=False)
+    scan_options.add_argument("--match", default="*", help="only scan keys matching this pattern")
+    scan_options.add_argument("--scan-count", type=int, default=1000, help="COUNT hint per SCAN call")
+    scan_options.add_argument("--pause", type=float, default=0, help="milliseconds to sleep between SCAN calls")
+    scan_options.add_argument("--depth", type=int, default=1, help="key segments that make up a namespace")
+    
+    subparsers.add_parser("ping", help="check the Redis connection").set_defaults(func=cmd_ping)
+    subparsers.add_parser("stats", parents=[scan_options], help="server info and keys per namespace")\
+        .set_defaults(func=cmd_stats)
+    
+    memory = subparsers.add_parser("memory", parents=[scan_options], help="estimate memory per namespace")
+    memory.add_argument("--samples", type=int, default=100, help="keys sampled per namespace")
+    memory.set_defaults(func=cmd_memory)
+    
+    bigkeys = subparsers.add_parser("bigkeys", parents=[scan_options], help="list the largest keys")
+    bigkeys.add_argument("--top", type=int, default=20)
+    bigkeys.set_defaults(func=cmd_bigkeys)
+    
+    no_ttl = subparsers.add_parser("no-ttl", parents=[scan_options], help="find keys without an expiry")
+    no_ttl.add_argument("--limit", type=int, default=20, help="example keys to list")
+    no_ttl.set_defaults(func=cmd_no_ttl)
+    
+    sync = subparsers.add_parser("sync", help="sync database data to Redis")
+    sync.add_argument("--incremental", action="store_true")
+    sync.add_argument("--workers", type=int, default=1)
+    sync.set_defaults(func=cmd_sync)
+    
+    reconcile = subparsers.add_parser("reconcile", help="repair counter drift between Redis and SQL")
+    reconcile.add_argument("--dry-run", action="store_true")
+    reconcile.set_defaults(func=cmd_reconcile)
+    
+    migrate = subparsers.add_parser("migrate-counters", help="move post counters to another layout")
+    migrate.add_argument("--from", dest="source", choices=COUNTER_LAYOUTS, required=True)
+    migrate.add_argument("--to", dest="target", choices=COUNTER_LAYOUTS, help="default: REDIS_COUNTER_LAYOUT")
+    migrate.add_argument("--from-bucket-size", type=int)
+    migrate.add_argument("--to-bucket-size", type=int)
+    migrate.add_argument("--scan-count", type=int, default=1000)
+    migrate.set_defaults(func=cmd_migrate_counters)
+    
+    flush = subparsers.add_parser("flush", help="delete ALL Redis data")
+    flush.add_argument("--yes", action="store_true", help="confirm the flush")
+    flush.set_defaults(func=cmd_flush)
+    
+    return parser
+
+
+def main(argv=None):
+    """Run a single command and return its exit code."""
+    args = build_parser().parse_args(argv)
+    redis_service.use_batch_client()
+    return args.func(args)
 
 
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
         print("\n\n👋 Goodbye!")
+        sys.exit(130)
     except Exception as e:
-        print(f"\n❌ Error: {e}") 
\ No newline at end of file
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
\ No newline at end of file
@@ -1,12 +1,25 @@
+import argparse
+import csv
+import io
 import os
 import random
+import time
+from collections import Counter
 from datetime import datetime, timedelta
+from sqlalchemy import func, select, text, update
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal, engine, Base
+from app.core.redis import redis_service
+from app.models.follow import Follow
 from app.models.user import User
 from app.models.post import Post, Like, Share
+from app.models.tag import Tag, PostTag
 from app.core.security import get_password_hash
+from app.services.search_service import init_search_index
+from app.services.trending_service import TrendingService, trending_score
 from app.utils.file_upload import settings
+from app.utils.hashtags import extract_tags
+from app.utils.redis_sync import SyncProgress
 
 # Sample data
 SAMPLE_USERS = [
@@ -162,8 +175,315 @@ def create_sample_images():
         img.save(file_path, 'JPEG', quality=85)
 
 
+
+# Large-scale synthetic data
+GENERATED_PASSWORD = "password123"
+
+# Listed from most to least popular; emoji in the captions are tags as well
+SAMPLE_HASHTAGS = [
+    "#travel", "#wanderlust", "#sunset", "#foodie", "#citylife",
+    "#nature", "#hiking", "#streetart", "#architecture", "#photography",
+]
+HASHTAG_SHARE = 0.6  # Share of generated captions with hashtags
+
+
+def zipf_cum_weights(n: int, s: float) -> list:
+    """Cumulative Zipf weights of ranks 1..n, for random.choices(cum_weights=...)."""
+    weights, total = [], 0.0
+    for rank in range(1, n + 1):
+        total += rank ** -s
+        weights.append(total)
+    return weights
+
+
+def zipf_counts(total: int, n: int, s: float, cap: int, rng: random.Random) -> list:
+    """Split total over n ranks following Zipf's law, at most cap per rank.
+    
+    Fractions are rounded at random so the long tail still gets its share;
+    the head is capped (a post cannot have more likers than there are users),
+    so the result may add up to less than total.
+    """
+    if n == 0:
+        return []
+    norm = total / zipf_cum_weights(n, s)[-1]
+    counts = []
+    for rank in range(1, n + 1):
+        expected = norm * rank ** -s
+        count = int(expected)
+        if rng.random() < expected - count:
+            count += 1
+        counts.append(min(count, cap))
+    return counts
+
+
+def _insert_rows(conn, table, columns: tuple, rows: list) -> None:
+    """Insert rows with COPY on PostgreSQL and a bulk executemany elsewhere."""
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        conn.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+    conn.commit()
+
+
+def _random_time_after(start: datetime, now: datetime, rng: random.Random) -> datetime:
+    return start + (now - start) * rng.random()
+
+
+def generate_users(conn, first_id: int, count: int, batch_size: int, now: datetime) -> None:
+    # Every generated user shares one hash; bcrypt per row would take hours
+    hashed_password = get_password_hash(GENERATED_PASSWORD)
+    columns = ("id", "username", "email", "hashed_password", "is_active", "created_at")
+    progress = SyncProgress("users")
+    for start in range(first_id, first_id + count, batch_size):
+        rows = [
+            (user_id, f"gen_user_{user_id}", f"gen_user_{user_id}@example.com", hashed_password, True, now)
+            for user_id in range(start, min(start + batch_size, first_id + count))
+        ]
+        _insert_rows(conn, User.__table__, columns, rows)
+        progress.add(len(rows))
+
+
+def generated_caption(hashtag_weights: list, rng: random.Random) -> str:
+    """A sample caption, often followed by a few Zipf-popular hashtags."""
+    caption = rng.choice(SAMPLE_CAPTIONS)
+    if rng.random() < HASHTAG_SHARE:
+        hashtags = set(rng.choices(SAMPLE_HASHTAGS, cum_weights=hashtag_weights, k=rng.randint(1, 3)))
+        caption += " " + " ".join(sorted(hashtags))
+    return caption
+
+
+def get_tag_ids(conn, names: set) -> dict:
+    """Get the ids of tags by name, creating the missing ones."""
+    tag_ids = dict(conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+    missing = sorted(names - tag_ids.keys())
+    if missing:
+        conn.execute(Tag.__table__.insert(), [{"name": name, "post_count": 0} for name in missing])
+        conn.commit()
+        tag_ids.update(conn.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing))).all())
+    return tag_ids
+
+
+def generate_posts(conn, first_id: int, count: int, authors: list, author_weights: list,
+                   likes: list, shares: list, days: int, batch_size: int, populate_redis: bool,
+                   search_backend: str, zipf_s: float, now: datetime, rng: random.Random) -> list:
+    """Insert posts spread over the last days, with their final like/share counts.
+    
+    Their tags are written to post_tags and, on SQLite, their captions to
+    the posts_fts search index, as creating them through the API would.
+    Returns each post's created_at, which likes and shares must follow.
+    """
+    columns = ("id", "user_id", "image_path", "caption", "likes_count", "shares_count", "created_at")
+    span = timedelta(days=days)
+    created = [now - span * (1 - index / count) for index in range(count)]
+    hashtag_weights = zipf_cum_weights(len(SAMPLE_HASHTAGS), zipf_s)
+    tag_ids = get_tag_ids(conn, set().union(*map(extract_tags, SAMPLE_CAPTIONS + SAMPLE_HASHTAGS)))
+    caption_tags = {}
+    tag_counts = Counter()
+    progress = SyncProgress("posts")
+    for start in range(0, count, batch_size):
+        end = min(start + batch_size, count)
+        post_authors = rng.choices(authors, cum_weights=author_weights, k=end - start)
+        rows = [
+            (
+                first_id + index, author, rng.choice(SAMPLE_IMAGES), generated_caption(hashtag_weights, rng),
+                likes[index], shares[index], created[index]
+            )
+            for index, author in zip(range(start, end), post_authors)
+        ]
+        _insert_rows(conn, Post.__table__, columns, rows)
+        
+        post_tags = []
+        for row in rows:
+            if row[3] not in caption_tags:
+                caption_tags[row[3]] = [tag_ids[name] for name in extract_tags(row[3])]
+            post_tags.extend((row[0], tag_id) for tag_id in caption_tags[row[3]])
+        _insert_rows(conn, PostTag.__table__, ("post_id", "tag_id"), post_tags)
+        tag_counts.update(tag_id for _, tag_id in post_tags)
+        if search_backend == "fts5":
+            conn.execute(
+                text("INSERT INTO posts_fts (rowid, caption) VALUES (:id, :caption)"),
+                [{"id": row[0], "caption": row[3]} for row in rows]
+            )
+            conn.commit()
+        if populate_redis:
+            redis_service.set_post_counts_bulk([(row[0], row[4], row[5]) for row in rows])
+            redis_service.set_trending_scores_bulk({
+                row[0]: trending_score(row[4], row[5], row[6]) for row in rows
+            })
+        progress.add(len(rows))
+    
+    for tag_id, tag_count in tag_counts.items():
+        conn.execute(update(Tag).where(Tag.id == tag_id).values(post_count=Tag.post_count + tag_count))
+    conn.commit()
+    if populate_redis:
+        # Tag indexes only track posts created once they were built, so rebuild them
+        for name in tag_ids:
+            redis_service.delete_cache(f"tag:{name}")
+        redis_service.delete_cache("tags:top")
+    return created
+
+
+def generate_engagement(conn, table, time_column: str, name: str, first_post_id: int, counts: list,
+                        created: list, user_ids: range, batch_size: int, populate_redis: bool,
+                        now: datetime, rng: random.Random) -> int:
+    """Insert counts[i] likes or shares of post i by distinct random users."""
+    columns = ("user_id", "post_id", time_column)
+    rows = []
+    progress = SyncProgress(name)
+    
+    def flush():
+        _insert_rows(conn, table, columns, rows)
+        if populate_redis and table is Like.__table__:
+            redis_service.add_user_likes_bulk([(user_id, post_id) for user_id, post_id, _ in rows])
+        progress.add(len(rows))
+        rows.clear()
+    
+    for index, count in enumerate(counts):
+        post_id = first_post_id + index
+        for user_id in rng.sample(user_ids, count):
+            rows.append((user_id, post_id, _random_time_after(created[index], now, rng)))
+        if len(rows) >= batch_size:
+            flush()
+    flush()
+    return progress.rows
+
+
+def generate_follows(conn, followees: list, counts: list, user_ids: range, batch_size: int,
+                     now: datetime, rng: random.Random) -> int:
+    """Insert counts[i] distinct followers of followees[i], so popular authors become celebrities."""
+    columns = ("follower_id", "followee_id", "created_at")
+    rows = []
+    progress = SyncProgress("follows")
+    for followee, count in zip(followees, counts):
+        followers = [user_id for user_id in rng.sample(user_ids, min(count + 1, len(user_ids))) if user_id != followee]
+        rows.extend((follower, followee, now) for follower in followers[:count])
+        if len(rows) >= batch_size:
+            _insert_rows(conn, Follow.__table__, columns, rows)
+            progress.add(len(rows))
+            rows = []
+    _insert_rows(conn, Follow.__table__, columns, rows)
+    progress.add(len(rows))
+    return progress.rows
+
+
+def generate_data(users: int, posts: int, likes: int, shares: int, follows: int, zipf_s: float = 1.1,
+                  days: int = 365, batch_size: int = 10000, populate_redis: bool = False, seed: int = 42) -> None:
+    """Generate a large synthetic dataset on top of whatever the database holds.
+    
+    Authors, liked/shared posts and followed users are drawn with Zipfian
+    popularity, so a few posts and creators get most of the engagement like
+    on a real feed. Rows are written in bulk (COPY on PostgreSQL) and post
+    counters match the generated likes and shares.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    started_at = time.monotonic()
+    
+    Base.metadata.create_all(bind=engine)
+    search_backend = init_search_index(engine)
+    create_sample_images()
+    if populate_redis and not redis_service.ping():
+        print("⚠️  Redis is not reachable, only the database will be populated")
+        populate_redis = False
+    
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            # The database can be regenerated, so trade durability for load speed
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        first_user_id = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        first_post_id = (conn.execute(select(func.max(Post.id))).scalar() or 0) + 1
+        user_ids = range(first_user_id, first_user_id + users)
+        
+        print(f"👥 Generating {users} users...")
+        generate_users(conn, first_user_id, users, batch_size, now)
+        
+        # The same creators are the most prolific and the most followed
+        creators = list(user_ids)
+        rng.shuffle(creators)
+        creator_weights = zipf_cum_weights(users, zipf_s)
+        
+        # Popular posts are spread over time rather than being the oldest ones
+        popularity = list(range(posts))
+        rng.shuffle(popularity)
+        like_counts, share_counts = [0] * posts, [0] * posts
+        for rank, (like_count, share_count) in enumerate(zip(
+            zipf_counts(likes, posts, zipf_s, users, rng), zipf_counts(shares, posts, zipf_s, users, rng)
+        )):
+            like_counts[popularity[rank]] = like_count
+            share_counts[popularity[rank]] = share_count
+        
+        print(f"📝 Generating {posts} posts...")
+        created = generate_posts(
+            conn, first_post_id, posts, creators, creator_weights, like_counts, share_counts,
+            days, batch_size, populate_redis, search_backend, zipf_s, now, rng
+        )
+        
+        print(f"❤️ Generating {sum(like_counts)} likes and {sum(share_counts)} shares...")
+        generate_engagement(
+            conn, Like.__table__, "created_at", "likes", first_post_id, like_counts, created,
+            user_ids, batch_size, populate_redis, now, rng
+        )
+        generate_engagement(
+            conn, Share.__table__, "shared_at", "shares", first_post_id, share_counts, created,
+            user_ids, batch_size, False, now, rng
+        )
+        
+        follow_counts = zipf_counts(follows, users, zipf_s, users - 1, rng)
+        print(f"🤝 Generating {sum(follow_counts)} follows...")
+        generate_follows(conn, creators, follow_counts, user_ids, batch_size, now, rng)
+        
+        if conn.dialect.name == "postgresql":
+            # Ids were written explicitly, so move the sequences past them
+            for table in ("users", "posts"):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+                )
+            conn.commit()
+    
+    if populate_redis:
+        TrendingService.trim()
+        redis_service.bump_timeline_generation()
+    
+    print(f"🎉 Generated data in {time.monotonic() - started_at:.1f}s")
+    print(f"🔑 Generated users log in as gen_user_<id> with password {GENERATED_PASSWORD}")
+
+
 def main():
     """Main function to seed the database."""
+    parser = argparse.ArgumentParser(description="Seed the database with sample or large synthetic data")
+    parser.add_argument("--generate", action="store_true",
+                        help="generate a large synthetic dataset instead of the sample data")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--posts", type=int, default=1000000)
+    parser.add_argument("--likes", type=int, default=5000000)
+    parser.add_argument("--shares", type=int, default=500000)
+    parser.add_argument("--follows", type=int, default=1000000)
+    parser.add_argument("--zipf", type=float, default=1.1,
+                        help="Zipf exponent of post and creator popularity; higher is more skewed")
+    parser.add_argument("--days", type=int, default=365, help="period the generated posts are spread over")
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per bulk insert")
+    parser.add_argument("--redis", action="store_true",
+                        help="also write post counters, user likes and trending scores to Redis")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, for reproducible datasets")
+    args = parser.parse_args()
+    
+    if args.generate:
+        redis_service.use_batch_client()
+        generate_data(
+            args.users, args.posts, args.likes, args.shares, args.follows, args.zipf,
+            args.days, args.batch_size, args.redis, args.seed
+        )
+        return
+    
     print("🌱 Starting database seeding...")
     
     # Create database tables
@@ -197,7 +517,7 @@ def main():
         print(f"   - Users: {len(users)}")
         print(f"   - Posts: {len(posts)}")
         print(f"   - Sample images: {len(SAMPLE_IMAGES)}")
-        
+    
     except Exception as e:
         print(f"❌ Error during seeding: {e}")
         db.rollback()
@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import tempfile
+
+# The app reads its settings at import, so point it at scratch storage first
+_scratch_dir = tempfile.mkdtemp(prefix="vistagram-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch_dir, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_scratch_dir, "uploads")
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["PASSWORD_BCRYPT_ROUNDS"] = "4"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy import text
+from app.core.redis import redis_service
+
+fake_redis = fakeredis.FakeRedis(decode_responses=True)
+redis_service._redis_client = fake_redis
+
+from app.core.database import Base, SessionLocal, engine
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def clean_storage():
+    fake_redis.flushall()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("DELETE FROM posts_fts"))
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def register(client):
+    """Register and log in a user; returns their Authorization header."""
+    
+    def register_user(username: str) -> dict:
+        client.post("/api/v1/auth/register", json={
+            "username": username, "email": f"{username}@example.com", "password": "password123"
+        })
+        response = client.post("/api/v1/auth/login", data={"username": username, "password": "password123"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    
+    return register_user
+
+
+@pytest.fixture
+def create_post(client):
+    def upload(headers: dict, caption: str = "A post") -> dict:
+        image = io.BytesIO()
+        Image.new("RGB", (4, 4)).save(image, "JPEG")
+        response = client.post(
+            "/api/v1/posts/", headers=headers,
+            files={"image": ("post.jpg", image.getvalue(), "image/jpeg")}, data={"caption": caption}
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+    
+    return upload
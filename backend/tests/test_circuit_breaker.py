@@ -0,0 +1,81 @@
+import time
+import pytest
+import redis
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.redis import CircuitOpenError, _guarded_call, redis_service
+from conftest import fake_redis
+
+
+def _fail(breaker: CircuitBreaker):
+    def unreachable():
+        raise redis.ConnectionError("connection refused")
+    
+    with pytest.raises(redis.ConnectionError):
+        _guarded_call(breaker, "GET", unreachable)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    _fail(breaker)
+    assert breaker.state == CircuitBreaker.CLOSED
+    _fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        _guarded_call(breaker, "GET", lambda: calls.append(1))
+    assert calls == []
+
+
+def test_error_replies_do_not_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    
+    def error_reply():
+        raise redis.ResponseError("WRONGTYPE")
+    
+    with pytest.raises(redis.ResponseError):
+        _guarded_call(breaker, "GET", error_reply)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    _fail(breaker)
+    time.sleep(0.06)
+    
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        _fail(breaker)
+    time.sleep(0.06)
+    
+    _fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_redis_is_available_while_half_open(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    monkeypatch.setattr(redis_service, "_breaker", breaker)
+    assert redis_service.available
+    
+    breaker.record_failure()
+    assert not redis_service.available
+    # Callers have to keep calling Redis, or the probe that closes the breaker never runs
+    time.sleep(0.06)
+    assert redis_service.available
+
+
+def test_command_line_tools_use_a_client_without_the_breaker(monkeypatch):
+    monkeypatch.setattr(redis_service, "_redis_client", fake_redis)
+    redis_service.use_batch_client()
+    
+    client = redis_service.client
+    assert type(client) is redis.Redis
+    assert client.connection_pool.connection_kwargs["socket_timeout"] == 60.0
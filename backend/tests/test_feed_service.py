@@ -0,0 +1,76 @@
+from app.core.config import settings
+from app.services.feed_service import FeedService
+from conftest import fake_redis
+
+
+def _user_id(client, headers: dict) -> int:
+    return client.get("/api/v1/auth/me", headers=headers).json()["id"]
+
+
+def _timeline(client, headers: dict, per_page: int = 20) -> dict:
+    response = client.get(f"/api/v1/posts/timeline?per_page={per_page}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_follow_and_unfollow_report_changes(client, register):
+    reader = register("feed_a")
+    author_id = _user_id(client, register("feed_b"))
+    
+    assert client.post(f"/api/v1/users/{author_id}/follow", headers=reader).json() == {"following": True, "changed": True}
+    assert client.post(f"/api/v1/users/{author_id}/follow", headers=reader).json() == {"following": True, "changed": False}
+    assert client.delete(f"/api/v1/users/{author_id}/follow", headers=reader).json() == {"following": False, "changed": True}
+    assert client.delete(f"/api/v1/users/{author_id}/follow", headers=reader).json() == {"following": False, "changed": False}
+
+
+def test_new_posts_are_fanned_out_to_built_feeds(client, register, create_post):
+    reader, author = register("feed_c"), register("feed_d")
+    client.post(f"/api/v1/users/{_user_id(client, author)}/follow", headers=reader)
+    first = create_post(author, "First")
+    assert [post["id"] for post in _timeline(client, reader)["posts"]] == [first["id"]]
+    
+    second = create_post(author, "Second")
+    assert fake_redis.zscore(f"feed:{_user_id(client, reader)}", second["id"]) is not None
+    assert [post["id"] for post in _timeline(client, reader)["posts"]] == [second["id"], first["id"]]
+
+
+def test_warm_reads_do_not_query_follows(client, register, create_post, monkeypatch):
+    reader, author = register("feed_e"), register("feed_f")
+    client.post(f"/api/v1/users/{_user_id(client, author)}/follow", headers=reader)
+    create_post(author)
+    _timeline(client, reader)
+    
+    def no_queries(*args):
+        raise AssertionError("follows were queried")
+    
+    monkeypatch.setattr(FeedService, "get_following_ids", no_queries)
+    monkeypatch.setattr(FeedService, "get_celebrity_ids", no_queries)
+    assert _timeline(client, reader)["total"] == 1
+
+
+def test_deleted_posts_are_pruned_and_the_page_refilled(client, register, create_post):
+    reader, author = register("feed_g"), register("feed_h")
+    client.post(f"/api/v1/users/{_user_id(client, author)}/follow", headers=reader)
+    posts = [create_post(author, f"Post {index}") for index in range(3)]
+    _timeline(client, reader, per_page=2)
+    
+    client.delete(f"/api/v1/posts/{posts[2]['id']}", headers=author)
+    page = _timeline(client, reader, per_page=2)
+    assert [post["id"] for post in page["posts"]] == [posts[1]["id"], posts[0]["id"]]
+    assert page["total"] == 2
+    assert fake_redis.zscore(f"feed:{_user_id(client, reader)}", posts[2]["id"]) is None
+
+
+def test_authors_crossing_the_celebrity_threshold_are_counted_once(client, register, create_post, monkeypatch):
+    reader, author = register("feed_i"), register("feed_j")
+    client.post(f"/api/v1/users/{_user_id(client, author)}/follow", headers=reader)
+    posts = [create_post(author, f"Post {index}") for index in range(2)]
+    assert _timeline(client, reader)["total"] == 2
+    
+    # The author now has enough followers for their posts to be pulled on read
+    monkeypatch.setattr(settings, "FEED_CELEBRITY_THRESHOLD", 1)
+    monkeypatch.setattr(settings, "FEED_SOURCES_TTL_SECONDS", -1)
+    page = _timeline(client, reader)
+    assert page["total"] == 2
+    assert [post["id"] for post in page["posts"]] == [posts[1]["id"], posts[0]["id"]]
+    assert fake_redis.zscore(f"feed:{_user_id(client, reader)}", posts[0]["id"]) is None
@@ -0,0 +1,16 @@
+from app.core.hashing import password_hasher
+
+
+def test_logins_beyond_the_pending_limit_get_a_429(client, register, monkeypatch):
+    register("hashing_a")
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    
+    response = client.post("/api/v1/auth/login", data={"username": "hashing_a", "password": "password123"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+
+def test_pending_hashes_are_released(client, register):
+    register("hashing_b")
+    client.post("/api/v1/auth/login", data={"username": "hashing_b", "password": "wrong password"})
+    assert password_hasher.pending == 0
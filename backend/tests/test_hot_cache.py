@@ -0,0 +1,80 @@
+import threading
+import time
+from app.core.hot_cache import HotCache
+from app.core.redis import redis_service
+
+
+def _cache() -> HotCache:
+    return HotCache(ttl=60, stale_ttl=60, lock_timeout=5, wait_timeout=1, poll_interval=0.01)
+
+
+def _wait_for_refreshes(cache: HotCache) -> None:
+    deadline = time.monotonic() + 2
+    while cache._inflight and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_concurrent_misses_load_once():
+    cache = _cache()
+    release = threading.Event()
+    loads = []
+    
+    def loader():
+        loads.append(1)
+        release.wait(2)
+        return "value"
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("key", loader))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    
+    assert results == ["value"] * 5
+    assert len(loads) == 1
+    assert cache.get_or_load("key", loader) == "value"
+    assert len(loads) == 1
+
+
+def test_stale_entries_are_served_while_one_refresh_runs():
+    cache = _cache()
+    redis_service.set_cache("hot:key", {"value": "old", "fresh_until": time.time() - 1}, 60)
+    loads = []
+    
+    def loader():
+        loads.append(1)
+        return "new"
+    
+    assert cache.get_or_load("key", loader) == "old"
+    _wait_for_refreshes(cache)
+    assert loads == [1]
+    assert cache.get_or_load("key", loader) == "new"
+    assert loads == [1]
+
+
+def test_refresh_is_left_to_the_worker_holding_the_lock():
+    cache = _cache()
+    redis_service.set_cache("hot:key", {"value": "old", "fresh_until": time.time() - 1}, 60)
+    token = redis_service.acquire_lock("hot:key", 5)
+    loads = []
+    
+    assert cache.get_or_load("key", lambda: loads.append(1)) == "old"
+    _wait_for_refreshes(cache)
+    assert loads == []
+    redis_service.release_lock("hot:key", token)
+
+
+def test_misses_wait_for_the_worker_holding_the_lock():
+    cache = _cache()
+    token = redis_service.acquire_lock("hot:key", 5)
+    
+    def other_worker():
+        time.sleep(0.05)
+        redis_service.set_cache("hot:key", {"value": "theirs", "fresh_until": time.time() + 60}, 60)
+    
+    threading.Thread(target=other_worker).start()
+    assert cache.get_or_load("key", lambda: "ours") == "theirs"
+    redis_service.release_lock("hot:key", token)
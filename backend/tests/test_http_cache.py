@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+from app.models.post import Post
+
+
+def _backdate(db, post_id: int, seconds: int = 10) -> None:
+    """Move a post's timestamps into a past second, so its Last-Modified is sent."""
+    past = datetime.utcnow() - timedelta(seconds=seconds)
+    db.query(Post).filter(Post.id == post_id).update({"created_at": past, "updated_at": past})
+    db.commit()
+
+
+def test_timeline_revalidates_despite_new_impressions(client, register, create_post):
+    headers = register("etag_a")
+    create_post(headers)
+    
+    first = client.get("/api/v1/posts/timeline", headers=headers)
+    assert first.status_code == 200
+    # The first read recorded an impression, which must not change the validator
+    second = client.get("/api/v1/posts/timeline", headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.headers["etag"] == first.headers["etag"]
+
+
+def test_timeline_etag_changes_with_likes(client, register, create_post):
+    headers = register("etag_b")
+    post = create_post(headers)
+    first = client.get("/api/v1/posts/timeline", headers=headers)
+    
+    client.post(f"/api/v1/posts/{post['id']}/like", headers=headers)
+    second = client.get("/api/v1/posts/timeline", headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()["posts"][0]["likes_count"] == 1
+
+
+def test_public_post_is_not_modified_until_it_is_liked(client, db, register, create_post):
+    headers = register("etag_c")
+    post = create_post(headers)
+    _backdate(db, post["id"])
+    
+    first = client.get(f"/api/v1/posts/{post['id']}/public")
+    last_modified = first.headers["last-modified"]
+    unchanged = client.get(f"/api/v1/posts/{post['id']}/public", headers={"If-Modified-Since": last_modified})
+    assert unchanged.status_code == 304
+    
+    client.post(f"/api/v1/posts/{post['id']}/like", headers=headers)
+    changed = client.get(f"/api/v1/posts/{post['id']}/public", headers={"If-Modified-Since": last_modified})
+    assert changed.status_code == 200
+    assert changed.json()["likes_count"] == 1
+    # Modified in the current second, so no date that could miss a second like is sent
+    assert "last-modified" not in changed.headers
+
+
+def test_public_post_etag_follows_live_counts(client, register, create_post):
+    headers = register("etag_d")
+    post = create_post(headers)
+    
+    first = client.get(f"/api/v1/posts/{post['id']}/public")
+    assert client.get(
+        f"/api/v1/posts/{post['id']}/public", headers={"If-None-Match": first.headers["etag"]}
+    ).status_code == 304
+    
+    client.post(f"/api/v1/posts/{post['id']}/share", headers=headers)
+    shared = client.get(f"/api/v1/posts/{post['id']}/public", headers={"If-None-Match": first.headers["etag"]})
+    assert shared.status_code == 200
+    assert shared.json()["shares_count"] == 1
+
+
+def test_new_posts_do_not_evict_cached_public_posts(client, register, create_post, monkeypatch):
+    headers = register("etag_e")
+    post = create_post(headers)
+    client.get(f"/api/v1/posts/{post['id']}/public")
+    loads = []
+    monkeypatch.setattr("app.services.post_service._load_public_post", lambda post_id: loads.append(post_id))
+    
+    create_post(headers, "Another post")
+    assert client.get(f"/api/v1/posts/{post['id']}/public").status_code == 200
+    assert loads == []
@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+from app.core.database import engine
+
+
+def test_metrics_are_not_served_by_default(client, monkeypatch):
+    assert client.get("/metrics").status_code == 404
+    
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "db_pool_connections" in response.text
+
+
+def test_failed_statements_do_not_leak_start_times():
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["query_started_at"] == []
+        
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_started_at"] == []
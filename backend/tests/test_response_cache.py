@@ -0,0 +1,32 @@
+from app.core.redis import redis_service
+from conftest import fake_redis
+
+
+def test_adding_a_coding_keeps_the_original_expiry():
+    assert redis_service.cache_response_variants("page", {"identity": b"body"}, 60)
+    assert 0 < fake_redis.ttl("response:page") <= 60
+    
+    fake_redis.expire("response:page", 10)
+    redis_service.cache_response_variants("page", {"gzip": b"\x1f\x8b compressed"}, 60)
+    assert fake_redis.ttl("response:page") <= 10
+    assert redis_service.get_response_variants("page", ["identity", "gzip"]) == {
+        "identity": b"body", "gzip": b"\x1f\x8b compressed"
+    }
+
+
+def test_timeline_pages_are_cached_compressed(client, register, create_post):
+    headers = register("compress_a")
+    for index in range(5):
+        create_post(headers, f"A caption long enough to make the page worth compressing, number {index}")
+    
+    first = client.get("/api/v1/posts/timeline", headers={**headers, "Accept-Encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    
+    keys = fake_redis.keys("response:*")
+    assert len(keys) == 1
+    assert fake_redis.ttl(keys[0]) > 0
+    assert set(fake_redis.hkeys(keys[0])) == {"identity", "gzip"}
+    
+    second = client.get("/api/v1/posts/timeline", headers={**headers, "Accept-Encoding": "gzip"})
+    assert second.json() == first.json()
@@ -0,0 +1,55 @@
+from app.core.config import settings
+from app.core.redis import redis_service
+from app.services.revocation_service import revocation_filter
+from app.utils.bloom_filter import BloomFilter
+
+
+def test_logout_revokes_the_token(client, register):
+    headers = register("revoke_a")
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+    
+    response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+
+def test_revoke_all_rejects_earlier_tokens(client, register):
+    headers = register("revoke_b")
+    client.post("/api/v1/auth/revoke-all", headers=headers)
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_tokens_are_rejected_while_revocations_cannot_be_checked(client, register, monkeypatch):
+    headers = register("revoke_c")
+    monkeypatch.setattr(redis_service, "is_token_blacklisted", lambda jti: None)
+    
+    response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
+    
+    monkeypatch.setattr(settings, "REVOCATION_FAIL_OPEN", True)
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+
+def test_loaded_filter_skips_redis_for_tokens_never_revoked(client, register, monkeypatch):
+    revoked, valid = register("revoke_d"), register("revoke_e")
+    client.post("/api/v1/auth/logout", headers=revoked)
+    monkeypatch.setattr(revocation_filter, "_filter", None)
+    assert revocation_filter.reload()
+    
+    # Redis is down, but the filter knows neither token was ever revoked
+    monkeypatch.setattr(redis_service, "is_token_blacklisted", lambda jti: None)
+    monkeypatch.setattr(redis_service, "get_user_tokens_revoked_before", lambda user_id: None)
+    assert client.get("/api/v1/auth/me", headers=valid).status_code == 200
+    assert client.get("/api/v1/auth/me", headers=revoked).status_code == 503
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    entries = [f"token:{index}" for index in range(1000)]
+    for entry in entries:
+        bloom.add(entry)
+    
+    assert all(entry in bloom for entry in entries)
+    false_positives = sum(f"other:{index}" in bloom for index in range(10000))
+    assert false_positives < 300
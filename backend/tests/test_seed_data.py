@@ -0,0 +1,26 @@
+from sqlalchemy import func, text
+from app.models.post import Post
+from app.models.tag import Tag, PostTag
+from app.utils.hashtags import extract_tags
+from seed_data import generate_data
+
+
+def test_generated_posts_are_searchable_and_tagged(client, db, register):
+    generate_data(users=20, posts=60, likes=100, shares=10, follows=30, batch_size=16, populate_redis=True)
+    
+    captions = dict(db.query(Post.id, Post.caption).all())
+    assert len(captions) == 60
+    assert db.execute(text("SELECT COUNT(*) FROM posts_fts")).scalar() == 60
+    assert any("#" in caption for caption in captions.values())
+    
+    expected = sum(len(extract_tags(caption)) for caption in captions.values())
+    assert db.query(PostTag).count() == expected
+    tag_counts = dict(db.query(PostTag.tag_id, func.count(PostTag.id)).group_by(PostTag.tag_id).all())
+    assert {tag.id: tag.post_count for tag in db.query(Tag).all() if tag.post_count} == tag_counts
+    
+    headers = register("seed_reader")
+    travel = [post_id for post_id, caption in captions.items() if "travel" in extract_tags(caption)]
+    response = client.get("/api/v1/tags/travel/posts?limit=100", headers=headers)
+    assert sorted(post["id"] for post in response.json()["posts"]) == sorted(travel)
+    search = client.get("/api/v1/posts/search?q=sunset", headers=headers)
+    assert search.json()["posts"]
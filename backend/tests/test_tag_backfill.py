@@ -0,0 +1,48 @@
+from app.core.redis import redis_service
+from app.models.post import Post
+from app.models.tag import Tag, PostTag
+from app.utils.tag_backfill import LOCK_NAME, backfill_post_tags
+
+
+def _forget_tags(db):
+    """Leave posts as they were before tags existed."""
+    db.query(PostTag).delete()
+    db.query(Tag).delete()
+    db.commit()
+
+
+def test_backfill_indexes_hashtags_and_can_run_again(db, register, create_post):
+    headers = register("tagger_a")
+    tagged = create_post(headers, "Sunset #beach #travel")
+    create_post(headers, "No hashtags here")
+    _forget_tags(db)
+    
+    assert backfill_post_tags() == 1
+    assert backfill_post_tags() == 1
+    names = {name for name, in db.query(Tag.name).join(PostTag).filter(PostTag.post_id == tagged["id"])}
+    assert names == {"beach", "travel"}
+    assert db.query(PostTag).count() == 2
+
+
+def test_backfill_skips_posts_without_hashtags(db, register, create_post, monkeypatch):
+    headers = register("tagger_b")
+    for i in range(3):
+        create_post(headers, f"Plain caption {i}")
+    synced = []
+    monkeypatch.setattr("app.utils.tag_backfill.TagService.sync_post_tags", lambda db, post: synced.append(post.id))
+    
+    assert backfill_post_tags() == 0
+    assert synced == []
+    assert db.query(Post).count() == 3
+
+
+def test_only_one_backfill_runs_at_a_time(db, register, create_post):
+    create_post(register("tagger_c"), "#solo")
+    _forget_tags(db)
+    token = redis_service.acquire_lock(LOCK_NAME, 60)
+    
+    assert backfill_post_tags() == 0
+    assert db.query(PostTag).count() == 0
+    
+    redis_service.release_lock(LOCK_NAME, token)
+    assert backfill_post_tags() == 1
@@ -0,0 +1,38 @@
+from app.core.redis import redis_service
+from conftest import fake_redis
+
+
+def _tag_post_ids(client, headers: dict, tag: str) -> list:
+    response = client.get(f"/api/v1/tags/{tag}/posts", headers=headers)
+    assert response.status_code == 200, response.text
+    return [post["id"] for post in response.json()["posts"]]
+
+
+def test_tag_indexes_follow_new_and_edited_posts(client, register, create_post):
+    headers = register("tags_a")
+    first = create_post(headers, "Sunset #Travel")
+    # Indexes are only maintained once a read has built them from SQL
+    assert not fake_redis.exists("tag:travel")
+    assert _tag_post_ids(client, headers, "travel") == [first["id"]]
+    
+    second = create_post(headers, "Another #travel day")
+    assert fake_redis.zrange("tag:travel", 0, -1) == [str(first["id"]), str(second["id"])]
+    
+    client.put(f"/api/v1/posts/{first['id']}", headers=headers, json={"caption": "Sunset"})
+    assert fake_redis.zrange("tag:travel", 0, -1) == [str(second["id"])]
+    assert _tag_post_ids(client, headers, "travel") == [second["id"]]
+
+
+def test_top_tags_counter_tracks_tag_use(client, register, create_post):
+    headers = register("tags_b")
+    first = create_post(headers, "#travel #food")
+    top_tags = client.get("/api/v1/tags/top").json()["tags"]
+    assert sorted((tag["tag"], tag["posts_count"]) for tag in top_tags) == [("food", 1), ("travel", 1)]
+    
+    second = create_post(headers, "#travel again")
+    assert redis_service.get_top_tags(1) == [("travel", 2)]
+    
+    client.delete(f"/api/v1/posts/{second['id']}", headers=headers)
+    client.put(f"/api/v1/posts/{first['id']}", headers=headers, json={"caption": "#travel"})
+    # Tags whose count drops to zero leave the counter
+    assert redis_service.get_top_tags(10) == [("travel", 1)]
@@ -0,0 +1,89 @@
+import pytest
+from app.core.config import settings
+from app.core.redis import redis_service
+from app.models.post import PostStats
+from app.services.view_service import ViewService
+from conftest import fake_redis
+
+
+def test_flush_moves_views_into_post_stats(db, register, create_post):
+    post = create_post(register("viewer_a"))
+    ViewService.record_impressions([post["id"]], "user:1")
+    ViewService.record_impressions([post["id"]], "user:2")
+    
+    assert ViewService.flush_views(db) == 1
+    stats = db.get(PostStats, post["id"])
+    assert (stats.unique_views, stats.total_views) == (2, 2)
+    assert fake_redis.scard("views:dirty") == 0
+    
+    # Later flushes add to the row instead of colliding with it
+    ViewService.record_impressions([post["id"]], "user:3")
+    ViewService.flush_views(db)
+    db.expire_all()
+    stats = db.get(PostStats, post["id"])
+    assert (stats.unique_views, stats.total_views) == (3, 3)
+
+
+def test_failed_commit_keeps_views_for_the_next_flush(db, register, create_post, monkeypatch):
+    post = create_post(register("viewer_b"))
+    ViewService.record_impressions([post["id"]], "user:1")
+    
+    def failing_commit():
+        raise RuntimeError("database is gone")
+    
+    monkeypatch.setattr(db, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        ViewService.flush_views(db)
+    monkeypatch.undo()
+    
+    assert fake_redis.sismember("views:dirty", post["id"])
+    assert ViewService.flush_views(db) == 1
+    assert db.get(PostStats, post["id"]).total_views == 1
+
+
+def test_unreadable_counters_are_not_drained(db, register, create_post, monkeypatch):
+    post = create_post(register("viewer_c"))
+    ViewService.record_impressions([post["id"]], "user:1")
+    monkeypatch.setattr(redis_service, "read_raw_views", lambda post_ids, shards: None)
+    
+    with pytest.raises(RuntimeError):
+        ViewService.flush_views(db)
+    monkeypatch.undo()
+    
+    assert fake_redis.sismember("views:dirty", post["id"])
+    ViewService.flush_views(db)
+    assert db.get(PostStats, post["id"]).total_views == 1
+
+
+def test_impressions_during_a_flush_are_kept(db, register, create_post, monkeypatch):
+    post = create_post(register("viewer_d"))
+    ViewService.record_impressions([post["id"]], "user:1")
+    read_raw_views = redis_service.read_raw_views
+    
+    def read_then_view(post_ids, shards):
+        counts = read_raw_views(post_ids, shards)
+        ViewService.record_impressions([post["id"]], "user:2")
+        return counts
+    
+    monkeypatch.setattr(redis_service, "read_raw_views", read_then_view)
+    ViewService.flush_views(db)
+    monkeypatch.undo()
+    
+    assert db.get(PostStats, post["id"]).total_views == 1
+    remaining = sum(
+        int(fake_redis.hget(f"views:raw:{shard}", post["id"]) or 0)
+        for shard in range(settings.VIEW_COUNTER_SHARDS)
+    )
+    assert remaining == 1
+
+
+def test_only_one_worker_flushes_at_a_time(db, register, create_post):
+    post = create_post(register("viewer_e"))
+    ViewService.record_impressions([post["id"]], "user:1")
+    token = redis_service.acquire_lock("flush_views", 60)
+    
+    assert ViewService.flush_views(db) == 0
+    assert fake_redis.sismember("views:dirty", post["id"])
+    
+    redis_service.release_lock("flush_views", token)
+    assert ViewService.flush_views(db) == 1